@@ -1,10 +1,17 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
 from services.arxiv_service import ArxivService
+from services.crawl_scheduler import CrawlScheduler, start_crawl_scheduler
+from services.job_service import start_embedded_worker
 from services.llm_service import LLMService
 from services.recommendation_service import RecommendationService
 from utils.database import DatabaseManager
+from utils.http_client import get_http_metrics
+from utils.status_hub import status_hub
+from config import Config
+import atexit
 import json
 import threading
+import time
 from datetime import datetime
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
@@ -15,14 +22,57 @@ arxiv_service = ArxivService()
 llm_service = LLMService()
 recommendation_service = RecommendationService()
 db = DatabaseManager()
-
-# 启动时在后台评估未评估的论文，减少用户请求等待时间
+job_service = recommendation_service.job_service
+# 进度推送（SSE）连接数上限：每个连接在等待期间占用一个请求线程
+status_stream_slots = threading.BoundedSemaphore(Config.STATUS_STREAM_MAX_CLIENTS)
+
+# 单进程部署时在本进程内执行后台任务；多进程部署（gunicorn 等）时关闭 EMBEDDED_WORKER，
+# 由独立的 worker.py 执行，避免每个 Web 进程导入时都启动评估
+embedded_worker = None
+crawl_scheduler = None
+if Config.EMBEDDED_WORKER:
+    embedded_worker = start_embedded_worker(job_service)
+    if Config.CRAWL_SCHEDULE_ENABLED:
+        crawl_scheduler = start_crawl_scheduler(job_service)
+
+# 启动时添加评估任务，在后台评估未评估的论文，减少用户请求等待时间
 try:
-    recommendation_service.start_background_evaluation(batch_size=10, delay=0.5)
+    recommendation_service.request_evaluation()
 except Exception:
-    # 忽略启动时的任何错误（例如 LLM 未配置）
+    # 忽略启动时的任何错误
     pass
 
+def _shutdown_background_work():
+    """进程退出时让后台任务收尾：已认领的论文评估完成或释放认领，避免等到租约过期才能重新处理"""
+    if crawl_scheduler is not None:
+        crawl_scheduler[0].set()
+    if embedded_worker is not None:
+        embedded_worker[0].set()
+    recommendation_service.stop_background_evaluation()
+    if embedded_worker is not None:
+        embedded_worker[1].join(Config.EVAL_DRAIN_TIMEOUT + 5)
+
+atexit.register(_shutdown_background_work)
+
+def _int_arg(name, default, maximum=None):
+    """解析正整数查询参数（超过 maximum 时截断），格式错误时抛出 ValueError（接口返回 400）"""
+    raw = request.args.get(name)
+    if raw in (None, ''):
+        return default
+    try:
+        value = max(1, int(raw))
+    except ValueError:
+        raise ValueError(f'参数 {name} 必须是整数')
+    return min(value, maximum) if maximum else value
+
+def _pagination_args(default_per_page):
+    """解析分页参数：page/per_page 与游标 cursor 二选一，include_total=0 时不返回总数"""
+    page = _int_arg('page', 1)
+    per_page = _int_arg('per_page', default_per_page, maximum=200)
+    cursor = request.args.get('cursor') or None
+    include_total = request.args.get('include_total', '1') not in ('0', 'false')
+    return page, per_page, cursor, include_total
+
 @app.route('/')
 def index():
     """主页"""
@@ -201,44 +251,100 @@ def favorite_summary():
 
 @app.route('/api/config/update-favorite-summary', methods=['POST'])
 def update_favorite_summary():
-    """更新收藏总结"""
+    """更新收藏总结（添加总结任务，通过 /api/jobs/<id> 查询结果）"""
     try:
-        # 触发增量总结
-        recommendation_service._trigger_incremental_summary()
-        
-        # 获取新的总结
-        new_summary = db.get_config('FAVORITE_SUMMARY', '')
-        
+        job_id = job_service.enqueue('summarize', dedupe_key='summarize')
         return jsonify({
             'success': True,
-            'message': '收藏总结已更新',
-            'data': {'summary': new_summary}
-        })
+            'message': '收藏总结任务已添加',
+            'data': {'job_id': job_id}
+        }), 202
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/config/update-favorite-summary/stream')
+def update_favorite_summary_stream():
+    """以 Server-Sent Events 流式更新收藏总结（event: delta 为增量文本，event: done 为新的总结）"""
+    return _sse_response(recommendation_service.stream_incremental_summary())
+
+def _sse_response(events):
+    """把 {'delta': 文本} / {'done': 结果} 事件流转换为 SSE 响应，出错时发送 event: failed"""
+    def generate():
+        try:
+            for event in events:
+                if 'delta' in event:
+                    yield f"event: delta\ndata: {json.dumps({'text': event['delta']}, ensure_ascii=False)}\n\n"
+                else:
+                    yield f"event: done\ndata: {json.dumps(event['done'], ensure_ascii=False)}\n\n"
+        except Exception as e:
+            yield f"event: failed\ndata: {json.dumps({'error': str(e)}, ensure_ascii=False)}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 # === 推荐API ===
 
 @app.route('/api/recommendation/next')
 def get_next_recommendation():
-    """获取下一条推荐"""
+    """获取下一条推荐
+
+    推荐队列为空时 wait=true 等待评估任务产生推荐论文，wait=false 立即返回；
+    仍有评估任务在排队/运行或有待评估论文时返回 status=pending，
+    前端在 retry_after 秒后重试。
+    """
     try:
-        paper = recommendation_service.get_next_recommendation()
+        wait = request.args.get('wait', 'true').lower() not in ('0', 'false')
+        paper = recommendation_service.get_next_recommendation(wait=wait)
         if paper:
             # 保持JSON字段为字符串，由前端解析
             return jsonify({
                 'success': True,
+                'status': 'ready',
                 'data': paper
             })
+        elif recommendation_service.is_evaluation_running or recommendation_service.get_pending_count() > 0:
+            return jsonify({
+                'success': True,
+                'status': 'pending',
+                'data': None,
+                'retry_after': 3,
+                'message': '正在评估新论文，请稍候'
+            })
         else:
             return jsonify({
                 'success': True,
+                'status': 'empty',
                 'data': None,
                 'message': '暂无更多推荐论文'
             })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/papers/<int:paper_id>/translate', methods=['POST'])
+def translate_paper(paper_id):
+    """即时翻译论文（用户打开尚无翻译的论文时调用），已有翻译时直接返回"""
+    try:
+        paper = db.get_paper(paper_id)
+        if paper is None:
+            return jsonify({'success': False, 'error': '论文不存在'}), 404
+        paper = recommendation_service.translate_paper(dict(paper))
+        if not paper.get('chinese_title'):
+            return jsonify({'success': False, 'error': '翻译失败'}), 500
+        return jsonify({
+            'success': True,
+            'data': {'chinese_title': paper['chinese_title'], 'chinese_abstract': paper.get('chinese_abstract', '')}
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/papers/<int:paper_id>/translate/stream')
+def translate_paper_stream(paper_id):
+    """以 Server-Sent Events 流式返回论文翻译（event: delta 为增量文本，event: done 为最终翻译）"""
+    paper = db.get_paper(paper_id)
+    if paper is None:
+        return jsonify({'success': False, 'error': '论文不存在'}), 404
+    return _sse_response(recommendation_service.stream_translation(dict(paper)))
+
 @app.route('/api/recommendation/feedback', methods=['POST'])
 def process_feedback():
     """处理用户反馈"""
@@ -266,15 +372,15 @@ def process_feedback():
 def get_favorites():
     """获取收藏列表"""
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-        
-        result = recommendation_service.get_favorites_list(page, per_page)
+        page, per_page, cursor, include_total = _pagination_args(default_per_page=10)
+        result = recommendation_service.get_favorites_list(page, per_page, cursor=cursor, include_total=include_total)
         # 保持JSON字段为字符串，由前端解析
         return jsonify({
             'success': True,
             'data': result
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -284,7 +390,8 @@ def get_favorites():
 def admin_last_crawl():
     try:
         last = db.get_config('LAST_CRAWL_DATE', '')
-        return jsonify({'success': True, 'data': {'last_crawl_date': last}})
+        next_run = db.get_config(CrawlScheduler.NEXT_RUN_KEY, '') if Config.CRAWL_SCHEDULE_ENABLED else ''
+        return jsonify({'success': True, 'data': {'last_crawl_date': last, 'next_scheduled_crawl': next_run}})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -295,11 +402,8 @@ def admin_last_crawl():
 def admin_crawl_now():
     try:
         data = request.get_json() or {}
-        categories = data.get('categories')
-        start_date = data.get('start_date')
-        end_date = data.get('end_date')
-        count = arxiv_service.crawl_recent_papers(force_categories=categories, start_date=start_date, end_date=end_date)
-        return jsonify({'success': True, 'message': f'成功爬取 {count} 篇论文', 'data': {'count': count}})
+        job_id = job_service.enqueue_crawl(data.get('categories'), data.get('start_date'), data.get('end_date'))
+        return jsonify({'success': True, 'message': '爬取任务已添加', 'data': {'job_id': job_id}}), 202
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -308,40 +412,33 @@ def admin_crawl_now():
 def admin_get_papers():
     try:
         status = request.args.get('status', 'all')
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 50))
+        page, per_page, cursor, include_total = _pagination_args(default_per_page=50)
+        result = recommendation_service.get_papers_by_status_list(status, page, per_page, cursor=cursor, include_total=include_total)
+        return jsonify({'success': True, 'data': result})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/search')
+def search_papers():
+    """全文检索论文（BM25 排序，返回高亮片段）"""
+    try:
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({'success': False, 'error': '检索关键词不能为空'}), 400
+        status = request.args.get('status', 'all')
+        page = _int_arg('page', 1)
+        per_page = _int_arg('per_page', 20, maximum=100)
         offset = (page - 1) * per_page
 
-        base_query = 'SELECT *, id as paper_id FROM papers'
-        where_clauses = []
-        params = []
-
-        if status == 'unassessed':
-            where_clauses.append('llm_evaluated = 0')
-        elif status == 'assessed':
-            where_clauses.append('llm_evaluated = 1')
-        elif status == 'unread':
-            # 已被LLM评估且被LLM推荐，但用户尚未对其进行任何标记（未收藏/未稍后/未标记为不喜欢）
-            where_clauses.append('(llm_evaluated = 1 AND is_recommended = 1 AND (favorite IS NULL OR favorite = 0) AND (maybe_later IS NULL OR maybe_later = 0) AND (disliked IS NULL OR disliked = 0))')
-        elif status == 'favorite':
-            where_clauses.append('favorite = 1')
-        elif status == 'disliked':
-            where_clauses.append('disliked = 1')
-        elif status == 'maybe_later':
-            where_clauses.append('maybe_later = 1')
-
-        where_sql = (' WHERE ' + ' AND '.join(where_clauses)) if where_clauses else ''
-
-        query = f"{base_query} {where_sql} ORDER BY published_date DESC LIMIT ? OFFSET ?"
-        params.extend([per_page, offset])
-        rows = db.execute_query(query, params)
-
-        # total
-        count_query = f"SELECT COUNT(*) as total FROM papers {where_sql}"
-        total_res = db.execute_query(count_query)
-        total = total_res[0]['total'] if total_res else 0
-
-        return jsonify({'success': True, 'data': {'papers': [dict(r) for r in rows], 'pagination': {'page': page, 'per_page': per_page, 'total': total}}})
+        # 多取一条用于判断是否还有下一页，避免对全部匹配结果计数
+        rows = db.search_papers(q, status=status, limit=per_page + 1, offset=offset)
+        papers = [dict(r) for r in rows[:per_page]]
+        return jsonify({'success': True, 'data': {'papers': papers, 'pagination': {'page': page, 'per_page': per_page, 'has_more': len(rows) > per_page}}})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -350,8 +447,10 @@ def admin_get_papers():
 def admin_delete_unprocessed():
     try:
         # 删除未处理的论文（未被评估且未被用户标记）
-        query = "DELETE FROM papers WHERE llm_evaluated = 0 AND (favorite IS NULL OR favorite = 0) AND (maybe_later IS NULL OR maybe_later = 0) AND (disliked IS NULL OR disliked = 0)"
+        query = "DELETE FROM papers WHERE llm_evaluated = 0 AND user_status = 'none'"
         res = db.execute_query(query)
+        # 批量操作后刷新推荐进度计数（计数由触发器在同一事务内维护）
+        status_hub.refresh()
         return jsonify({'success': True, 'data': {'deleted': res}})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -363,11 +462,26 @@ def admin_delete_others():
         # 删除除了收藏和稍后再说之外的所有论文
         query = "DELETE FROM papers WHERE (favorite IS NULL OR favorite = 0) AND (maybe_later IS NULL OR maybe_later = 0)"
         res = db.execute_query(query)
+        # 批量操作后刷新推荐进度计数（计数由触发器在同一事务内维护）
+        status_hub.refresh()
         return jsonify({'success': True, 'data': {'deleted': res}})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/admin/retry-failed-evaluations', methods=['POST'])
+def admin_retry_failed_evaluations():
+    try:
+        # 多次评估失败的论文恢复为待评估（清零尝试次数），并添加评估任务
+        res = db.reset_failed_evaluations()
+        status_hub.refresh()
+        if res:
+            recommendation_service.request_evaluation()
+        return jsonify({'success': True, 'data': {'updated': res}})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/admin/mark-unread-read', methods=['POST'])
 def admin_mark_unread_read():
     try:
@@ -375,8 +489,10 @@ def admin_mark_unread_read():
         # 已读的意思是：做了喜欢、不喜欢或稍后再说的任意一个标记
         # 所以，将未读论文标记为已读，就是将它们标记为不喜欢
         # 只处理处理过的论文（llm_evaluated = 1），未处理的论文不用管
-        query = "UPDATE papers SET disliked = 1 WHERE llm_evaluated = 1 AND (favorite IS NULL OR favorite = 0) AND (maybe_later IS NULL OR maybe_later = 0) AND (disliked IS NULL OR disliked = 0)"
+        query = "UPDATE papers SET disliked = 1 WHERE llm_evaluated = 1 AND user_status = 'none'"
         res = db.execute_query(query)
+        # 批量操作后刷新推荐进度计数（计数由触发器在同一事务内维护）
+        status_hub.refresh()
         return jsonify({'success': True, 'data': {'updated': res}})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -391,18 +507,13 @@ def admin_bulk_update():
         if not ids or not action:
             return jsonify({'success': False, 'error': '缺少参数'}), 400
 
-        for pid in ids:
-            if action == 'favorite':
-                db.mark_favorite(pid)
-            elif action == 'unfavorite':
-                db.unmark_favorite(pid)
-            elif action == 'maybe_later':
-                db.mark_maybe_later(pid)
-            elif action == 'unmaybe':
-                db.unmark_maybe_later(pid)
-            elif action == 'dislike':
-                db.mark_disliked(pid)
-        return jsonify({'success': True})
+        try:
+            res = db.bulk_update_status(ids, action)
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        # 批量操作后刷新推荐进度计数（计数由触发器在同一事务内维护）
+        status_hub.refresh()
+        return jsonify({'success': True, 'data': {'updated': res}})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -414,9 +525,12 @@ def admin_bulk_delete():
         ids = data.get('paper_ids', [])
         if not ids:
             return jsonify({'success': False, 'error': '缺少参数'}), 400
-        placeholders = ','.join(['?'] * len(ids))
-        query = f'DELETE FROM papers WHERE id IN ({placeholders})'
-        res = db.execute_query(query, ids)
+        try:
+            res = db.bulk_delete_papers(ids)
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        # 批量操作后刷新推荐进度计数（计数由触发器在同一事务内维护）
+        status_hub.refresh()
         return jsonify({'success': True, 'data': {'deleted': res}})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -434,19 +548,55 @@ def recommendation_status():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/recommendation/status/stream')
+def recommendation_status_stream():
+    """以 Server-Sent Events 推送推荐进度
+
+    连接建立时发送一次完整状态，之后只在计数器变化时发送变化的字段（event: status）；
+    空闲时定期发送注释行作为心跳。每个连接占用一个线程：同时最多 `STATUS_STREAM_MAX_CLIENTS` 个连接，
+    超出时返回 503（前端改为轮询）；连接最长保持 `STATUS_STREAM_MAX_SECONDS` 秒后关闭，由浏览器自动重连。
+    """
+    if not status_stream_slots.acquire(blocking=False):
+        return jsonify({'success': False, 'error': '推送连接过多，请改用轮询'}), 503, {'Retry-After': '30'}
+
+    def generate():
+        deadline = time.monotonic() + Config.STATUS_STREAM_MAX_SECONDS
+        version, last = status_hub.snapshot()
+        yield f"retry: {Config.STATUS_STREAM_RETRY_MS}\nevent: status\ndata: {json.dumps(last)}\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            version, current = status_hub.wait_for_change(version, timeout=min(Config.STATUS_STREAM_HEARTBEAT, remaining))
+            if current is None:
+                yield ': ping\n\n'
+                continue
+            delta = {key: value for key, value in current.items() if last.get(key) != value}
+            if delta:
+                yield f"event: status\ndata: {json.dumps(delta)}\n\n"
+            last = current
+            # 评估进行中计数器变化频繁，合并短时间内的多次变化
+            time.sleep(Config.STATUS_STREAM_MIN_INTERVAL)
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # 连接关闭（到期、客户端断开）时释放名额；生成器尚未开始执行时也会调用
+    response.call_on_close(status_stream_slots.release)
+    return response
+
 @app.route('/api/list/maybe-later')
 def get_maybe_later():
     """获取稍后再说列表"""
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-        
-        result = recommendation_service.get_maybe_later_list(page, per_page)
+        page, per_page, cursor, include_total = _pagination_args(default_per_page=10)
+        result = recommendation_service.get_maybe_later_list(page, per_page, cursor=cursor, include_total=include_total)
         # 保持JSON字段为字符串，由前端解析
         return jsonify({
             'success': True,
             'data': result
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -523,6 +673,8 @@ def clean_cache():
         else:
             days_old = int(days_param)
             deleted_count = recommendation_service.clean_old_papers(days_old=days_old, delete_all=False)
+        # 批量操作后刷新推荐进度计数（计数由触发器在同一事务内维护）
+        status_hub.refresh()
         return jsonify({
             'success': True,
             'message': f'已清理 {deleted_count} 篇旧论文',
@@ -531,6 +683,24 @@ def clean_cache():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/system/http-metrics')
+def http_metrics():
+    """获取按主机统计的HTTP请求指标"""
+    try:
+        return jsonify({'success': True, 'data': get_http_metrics()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/system/llm-usage')
+def llm_usage():
+    """获取按用途汇总的LLM token 用量（可选参数 days：只统计最近若干天）"""
+    try:
+        days = request.args.get('days', type=int)
+        rows = db.get_llm_usage_stats(days)
+        return jsonify({'success': True, 'data': [dict(row) for row in rows]})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/system/crawl-now', methods=['POST'])
 def crawl_now():
     """立即爬取"""
@@ -551,13 +721,55 @@ def crawl_now():
             if sd > ed:
                 return jsonify({'success': False, 'error': '起始日期不能晚于结束日期'}), 400
 
-        count = arxiv_service.crawl_recent_papers(force_categories=categories, start_date=start_date, end_date=end_date)
+        job_id = job_service.enqueue_crawl(categories, start_date, end_date)
         
         return jsonify({
             'success': True,
-            'message': f'成功爬取 {count} 篇论文',
-            'data': {'count': count}
-        })
+            'message': '爬取任务已添加',
+            'data': {'job_id': job_id}
+        }), 202
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# === 后台任务API ===
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """添加后台任务，立即返回任务ID"""
+    try:
+        data = request.get_json() or {}
+        job_id = job_service.enqueue(
+            data.get('type'),
+            data.get('payload') or {},
+            priority=data.get('priority'),
+            dedupe_key=data.get('dedupe_key')
+        )
+        return jsonify({'success': True, 'data': {'job_id': job_id}}), 202
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>')
+def get_job(job_id):
+    """查询任务状态与结果"""
+    try:
+        job = job_service.get_job(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': '任务不存在'}), 404
+        return jsonify({'success': True, 'data': job})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/jobs')
+def list_jobs():
+    """列出最近的任务，可按状态（queued/running/succeeded/failed）过滤"""
+    try:
+        status = request.args.get('status') or None
+        limit = _int_arg('limit', 50, maximum=200)
+        return jsonify({'success': True, 'data': job_service.list_jobs(status, limit)})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
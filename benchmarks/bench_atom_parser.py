@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Atom 解析性能对比：feedparser + parse_arxiv_entry vs. ArxivAtomParser
+
+使用 `fixtures/arxiv_feed.xml`（arXiv API 响应格式的样例）中的条目复制到指定数量，
+分别统计两种解析方式的耗时与峰值内存，并校验解析结果一致。
+
+用法：
+    python benchmarks/bench_atom_parser.py --entries 1000 --repeat 5
+"""
+
+import argparse
+import io
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedparser
+
+from services.arxiv_service import ArxivService
+from utils.atom_parser import ArxivAtomParser
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'arxiv_feed.xml')
+
+
+def build_feed(entries: int) -> bytes:
+    """将样例中的条目复制到 `entries` 条，生成一个完整的 Atom 响应"""
+    with open(FIXTURE_PATH, 'r', encoding='utf-8') as f:
+        fixture = f.read()
+
+    head = fixture[:fixture.index('<entry>')]
+    body = re.findall(r'<entry>.*?</entry>', fixture, re.S)
+
+    parts = [head]
+    for i in range(entries):
+        entry = body[i % len(body)]
+        # 保证复制出的条目 arxiv_id 唯一
+        parts.append(entry.replace('/abs/2602.', f'/abs/{2602 + i // len(body)}.'))
+        parts.append('\n')
+    parts.append('</feed>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+def parse_with_feedparser(data: bytes):
+    service = ArxivService.__new__(ArxivService)
+    feed = feedparser.parse(data)
+    return [service.parse_arxiv_entry(entry) for entry in feed.entries]
+
+
+def parse_with_iterparse(data: bytes):
+    return list(ArxivAtomParser(io.BytesIO(data)))
+
+
+def measure(func, data: bytes, repeat: int):
+    """返回 (最佳耗时秒数, 峰值内存字节, 解析结果)"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Atom 解析性能对比')
+    parser.add_argument('--entries', type=int, default=1000, help='响应中的条目数量')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数（取最佳耗时）')
+    args = parser.parse_args()
+
+    data = build_feed(args.entries)
+    print(f"响应大小: {len(data) / 1024:.1f} KB，条目数: {args.entries}")
+
+    fp_time, fp_peak, fp_result = measure(parse_with_feedparser, data, args.repeat)
+    it_time, it_peak, it_result = measure(parse_with_iterparse, data, args.repeat)
+
+    print(f"{'解析方式':<14}{'耗时(ms)':>12}{'峰值内存(MB)':>16}")
+    print(f"{'feedparser':<16}{fp_time * 1000:>12.1f}{fp_peak / 1024 / 1024:>16.2f}")
+    print(f"{'iterparse':<16}{it_time * 1000:>12.1f}{it_peak / 1024 / 1024:>16.2f}")
+    print(f"加速比: {fp_time / it_time:.1f}x")
+
+    if fp_result != it_result:
+        print("❌ 两种解析方式的结果不一致")
+        return False
+    print("✅ 两种解析方式的结果一致")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+全文检索性能测试：在合成的论文库上测量 `DatabaseManager.search_papers` 的查询耗时
+
+在临时目录（或 `--db` 指定的文件）中创建数据库，按 Zipf–Mandelbrot 分布从词表中生成标题和摘要
+（最常见的词约出现在一半的论文中，罕见词只匹配少数论文），通过 `bulk_insert_papers` 写入
+（FTS 索引由触发器维护），然后对几类典型查询分别统计 p50 / p95 / 最大耗时。
+
+用法：
+    python benchmarks/bench_search.py --papers 1000000 --repeat 20
+    python benchmarks/bench_search.py --papers 1000000 --db /tmp/bench_search.db  # 保留语料，再次运行时直接复用
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import DatabaseManager, segment_cjk
+
+TOPIC_WORDS = [
+    'transformer', 'diffusion', 'graph', 'reinforcement', 'quantum', 'compiler', 'retrieval', 'robot',
+    'segmentation', 'federated', 'contrastive', 'adversarial', 'bayesian', 'kernel', 'sparse', 'attention',
+    'protein', 'molecule', 'speech', 'translation', 'recommendation', 'privacy', 'causal', 'symbolic',
+]
+COMMON_WORDS = [
+    'model', 'learning', 'network', 'data', 'method', 'performance', 'training', 'task', 'results',
+    'framework', 'neural', 'deep', 'approach', 'language', 'image', 'large', 'efficient', 'benchmark',
+]
+
+QUERIES = {
+    '常见词': 'learning model',
+    '主题词': 'diffusion segmentation',
+    '罕见词': 'zyxw19042',
+    '中英混合': '图神经网络 graph',
+}
+
+
+def build_vocab(size: int):
+    words = COMMON_WORDS + TOPIC_WORDS + [f'zyxw{i:04d}' for i in range(size)]
+    # Zipf–Mandelbrot 分布：排名越靠前的词出现越频繁，偏移量去掉了停用词量级的高频头部
+    cum_weights, total = [], 0.0
+    for rank in range(len(words)):
+        total += 1.0 / (rank + 30)
+        cum_weights.append(total)
+    return words, cum_weights
+
+
+def generate_papers(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    words, cum_weights = build_vocab(20000)
+    for i in range(count):
+        title = ' '.join(rng.choices(words, cum_weights=cum_weights, k=8))
+        abstract = ' '.join(rng.choices(words, cum_weights=cum_weights, k=120))
+        paper = {
+            'arxiv_id': f'bench.{i:08d}',
+            'title': title,
+            'abstract': abstract,
+            'authors': json.dumps([f'Author {rng.randrange(50000)}' for _ in range(3)]),
+            'categories': '["cs.LG"]',
+            'published_date': f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+            'pdf_url': '',
+            'arxiv_url': '',
+        }
+        yield paper
+
+
+def populate(db: DatabaseManager, count: int, chunk: int = 20000):
+    start = time.perf_counter()
+    batch = []
+    for paper in generate_papers(count):
+        batch.append(paper)
+        if len(batch) >= chunk:
+            db.bulk_insert_papers(batch)
+            batch = []
+    if batch:
+        db.bulk_insert_papers(batch)
+    # 模拟真实数据：部分论文已评估或已收藏，用于测试状态过滤
+    db.execute_query('UPDATE papers SET llm_evaluated = 1 WHERE id % 3 = 0')
+    db.execute_query('UPDATE papers SET favorite = 1 WHERE id % 200 = 0')
+    prefix = '基于图神经网络的'
+    db.execute_query('UPDATE papers SET chinese_title = ? || title, chinese_title_fts = ? || title WHERE id % 20 = 0',
+                     (prefix, segment_cjk(prefix)))
+    db.execute_query("INSERT INTO papers_fts (papers_fts) VALUES ('optimize')")
+    return time.perf_counter() - start
+
+
+def measure(db: DatabaseManager, text: str, status: str, repeat: int):
+    timings = []
+    rows = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = db.search_papers(text, status=status, limit=21)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(len(timings) - 1, int(len(timings) * 0.95))], timings[-1], len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全文检索性能测试')
+    parser.add_argument('--papers', type=int, default=1000000, help='合成论文数量')
+    parser.add_argument('--repeat', type=int, default=20, help='每个查询的重复次数')
+    parser.add_argument('--target-ms', type=float, default=50.0, help='p95 耗时目标（毫秒）')
+    parser.add_argument('--db', help='语料数据库路径（已存在时直接复用，默认使用临时目录）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, 'bench.db')
+        reuse = os.path.exists(db_path)
+        db = DatabaseManager(db_path)
+        if reuse:
+            print(f"复用已有语料 {db_path}（{db.count_papers_by_status()} 篇论文）")
+        else:
+            elapsed = populate(db, args.papers)
+            print(f"写入 {args.papers} 篇论文（含 FTS 索引）耗时 {elapsed:.1f}s")
+
+        ok = True
+        print(f"{'查询':<10}{'状态':<12}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}{'结果数':>8}")
+        for label, text in QUERIES.items():
+            for status in ('all', 'favorite'):
+                p50, p95, worst, found = measure(db, text, status, args.repeat)
+                ok = ok and p95 <= args.target_ms
+                print(f"{label:<10}{status:<14}{p50:>10.1f}{p95:>10.1f}{worst:>10.1f}{found:>8}")
+        db.close_connection()
+
+    if not ok:
+        print(f"❌ 存在 p95 超过 {args.target_ms:.0f}ms 的查询")
+        return False
+    print(f"✅ 所有查询 p95 均在 {args.target_ms:.0f}ms 以内")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+本地模拟的 arXiv API（`/api/query`），返回合成的 Atom 响应，用于离线测试与可复现的爬取基准
+
+按查询中的 `cat:` 分类与 `lastUpdatedDate:[YYYYMMDD TO YYYYMMDD]` 日期范围生成论文：
+每个 (分类, 日期) 约 `--papers-per-day` 篇（按哈希在 50%~150% 之间浮动），内容由随机种子确定，
+重复请求得到相同结果。约 `--cross-list-rate` 比例的论文同时列在另一个分类下，可以检验跨分类去重。
+结果按 lastUpdatedDate 倒序排列，支持 `start=` / `max_results=` 分页（单页最多 `--max-page-size` 条），
+响应包含 `opensearch:totalResults`，格式与 `benchmarks/fixtures/arxiv_feed.xml` 一致。
+
+可以注入延迟（`--latency-ms`）与随机 503 错误（`--error-rate`）。
+
+用法：
+    python benchmarks/mock_arxiv_server.py --port 8002 --papers-per-day 300
+然后以 `ARXIV_API_BASE=http://127.0.0.1:8002/api/query` 环境变量启动服务或 worker。
+"""
+
+import argparse
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+CS_CATEGORIES = [
+    'cs.AI', 'cs.AR', 'cs.CC', 'cs.CE', 'cs.CG', 'cs.CL', 'cs.CR', 'cs.CV', 'cs.CY', 'cs.DB',
+    'cs.DC', 'cs.DL', 'cs.DM', 'cs.DS', 'cs.ET', 'cs.FL', 'cs.GL', 'cs.GR', 'cs.GT', 'cs.HC',
+    'cs.IR', 'cs.IT', 'cs.LG', 'cs.LO', 'cs.MA', 'cs.MM', 'cs.MS', 'cs.NA', 'cs.NE', 'cs.NI',
+    'cs.OH', 'cs.OS', 'cs.PF', 'cs.PL', 'cs.RO', 'cs.SC', 'cs.SD', 'cs.SE', 'cs.SI', 'cs.SY',
+]
+WORDS = [
+    'transformer', 'diffusion', 'graph', 'reinforcement', 'retrieval', 'robot', 'segmentation', 'federated',
+    'contrastive', 'adversarial', 'bayesian', 'sparse', 'attention', 'protein', 'speech', 'privacy', 'causal',
+    'model', 'learning', 'network', 'data', 'training', 'framework', 'neural', 'language', 'efficient',
+    'benchmark', 'reasoning', 'agent', 'alignment', 'inference', 'multimodal', 'scalable', 'robust', 'policy',
+]
+
+_CATEGORY_RE = re.compile(r'cat:([\w.\-]+)')
+_DATE_RANGE_RE = re.compile(r'lastUpdatedDate:\[(\d{8})\d*\s+TO\s+(\d{8})\d*\]')
+
+FEED_HEAD = '''<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <link href={link} rel="self" type="application/atom+xml"/>
+  <title type="html">ArXiv Query: {title}</title>
+  <id>http://arxiv.org/api/mock</id>
+  <updated>{updated}</updated>
+  <opensearch:totalResults xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{total}</opensearch:totalResults>
+  <opensearch:startIndex xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{start}</opensearch:startIndex>
+  <opensearch:itemsPerPage xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{per_page}</opensearch:itemsPerPage>
+'''
+
+
+class MockArxivServer(ThreadingHTTPServer):
+    """模拟 arXiv API；参数见模块说明，也可在同一进程中用 `start_server` 启动"""
+
+    daemon_threads = True
+
+    def __init__(self, address, papers_per_day=100, cross_list_rate=0.2, max_page_size=2000,
+                 latency_ms=0.0, error_rate=0.0, seed=0):
+        super().__init__(address, MockArxivHandler)
+        self.papers_per_day = papers_per_day
+        self.cross_list_rate = cross_list_rate
+        self.max_page_size = max_page_size
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        # 每个 (分类, 日期) 的论文列表与每个查询的排序结果只生成一次，分页请求直接切片
+        self.listing = lru_cache(maxsize=4096)(self._listing)
+        self.query = lru_cache(maxsize=256)(self._query)
+
+    def roll_error(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            return self.error_rate > 0 and self.rng.random() < self.error_rate
+
+    # === 合成数据 ===
+
+    def _count(self, category: str, day: date) -> int:
+        # 每个 (分类, 日期) 的论文数在平均值的 50%~150% 之间浮动
+        rng = random.Random(f'{self.seed}:count:{category}:{day}')
+        return int(self.papers_per_day * rng.uniform(0.5, 1.5))
+
+    def _cross_list(self, category: str, day: date, index: int):
+        """论文 (主分类, 日期, 序号) 交叉列出到的另一个分类，没有时返回 None"""
+        if category not in CS_CATEGORIES:
+            return None
+        rng = random.Random(f'{self.seed}:cross:{category}:{day}:{index}')
+        if rng.random() >= self.cross_list_rate:
+            return None
+        others = [c for c in CS_CATEGORIES if c != category]
+        return others[rng.randrange(len(others))]
+
+    def _listing(self, category: str, day: date):
+        """某分类某天列出的论文 [(主分类, 日期, 序号)]：本分类的论文加上其他分类交叉列出到这里的论文"""
+        papers = [(category, day, i) for i in range(self._count(category, day))]
+        for other in CS_CATEGORIES:
+            if other == category:
+                continue
+            papers.extend((other, day, i) for i in range(self._count(other, day))
+                          if self._cross_list(other, day, i) == category)
+        return papers
+
+    def paper_id(self, category: str, day: date, index: int) -> str:
+        # 同一月内唯一：日期、分类序号与论文序号组合成 arXiv 风格的编号
+        slot = (CS_CATEGORIES.index(category) if category in CS_CATEGORIES else len(CS_CATEGORIES))
+        number = ((day.day - 1) * (len(CS_CATEGORIES) + 1) + slot) * self.papers_per_day * 2 + index
+        return f'{day:%y%m}.{number:05d}'
+
+    def updated_at(self, category: str, day: date, index: int) -> datetime:
+        # 当天内按序号分布更新时间，保证排序稳定
+        seconds = (index * 7919 + (CS_CATEGORIES.index(category) if category in CS_CATEGORIES else 0) * 13) % 86400
+        return datetime(day.year, day.month, day.day) + timedelta(seconds=seconds)
+
+    def _query(self, categories: tuple, start_day: date, end_day: date):
+        """返回查询结果 [(主分类, 日期, 序号)]，按更新时间倒序；多分类查询中交叉列出的论文只出现一次"""
+        results, seen = [], set()
+        day = end_day
+        while day >= start_day:
+            for category in categories:
+                for paper in self.listing(category, day):
+                    if paper not in seen:
+                        seen.add(paper)
+                        results.append(paper)
+            day -= timedelta(days=1)
+        results.sort(key=lambda paper: (self.updated_at(*paper), self.paper_id(*paper)), reverse=True)
+        return results
+
+    def entry_xml(self, category: str, day: date, index: int) -> str:
+        rng = random.Random(f'{self.seed}:paper:{category}:{day}:{index}')
+        arxiv_id = self.paper_id(category, day, index)
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 10))).capitalize()
+        sentences = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(10, 18))) + '.' for _ in range(rng.randint(5, 9))]
+        authors = ''.join(
+            f'\n    <author>\n      <name>Author{rng.randrange(10000):04d} Surname{rng.randrange(100)}</name>\n    </author>'
+            for _ in range(rng.randint(1, 6))
+        )
+        categories = [category]
+        cross = self._cross_list(category, day, index)
+        if cross:
+            categories.append(cross)
+        category_tags = ''.join(
+            f'\n    <category term="{c}" scheme="http://arxiv.org/schemas/atom"/>' for c in categories
+        )
+        updated = self.updated_at(category, day, index)
+        published = updated - timedelta(days=rng.choice((0, 0, 0, 1, 7, 30)))
+        return f'''  <entry>
+    <id>http://arxiv.org/abs/{arxiv_id}v1</id>
+    <updated>{updated:%Y-%m-%dT%H:%M:%SZ}</updated>
+    <published>{published:%Y-%m-%dT%H:%M:%SZ}</published>
+    <title>{escape(title)}</title>
+    <summary>  {escape(chr(10).join(sentences))}
+</summary>{authors}
+    <link href="http://arxiv.org/abs/{arxiv_id}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}v1" rel="related" type="application/pdf"/>
+    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="{category}" scheme="http://arxiv.org/schemas/atom"/>{category_tags}
+  </entry>
+'''
+
+
+class MockArxivHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: MockArxivServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip('/') != '/api/query':
+            self._send(404, 'text/plain', b'not found')
+            return
+
+        server = self.server
+        if server.latency_ms:
+            time.sleep(server.latency_ms / 1000.0)
+        if server.roll_error():
+            self._send(503, 'text/plain', b'Service temporarily unavailable (mock)', {'Retry-After': '1'})
+            return
+
+        params = parse_qs(url.query)
+        search_query = params.get('search_query', [''])[0]
+        try:
+            start = max(0, int(params.get('start', ['0'])[0]))
+            max_results = max(0, int(params.get('max_results', ['10'])[0]))
+        except ValueError:
+            self._send(400, 'text/plain', b'start and max_results must be integers')
+            return
+        if max_results > server.max_page_size:
+            # 与真实 API 一样拒绝过大的分页
+            self._send(400, 'text/plain', f'max_results must not exceed {server.max_page_size}'.encode())
+            return
+
+        categories = list(dict.fromkeys(_CATEGORY_RE.findall(search_query)))
+        dates = _DATE_RANGE_RE.search(search_query)
+        if categories and dates:
+            start_day = datetime.strptime(dates.group(1), '%Y%m%d').date()
+            end_day = datetime.strptime(dates.group(2), '%Y%m%d').date()
+            results = server.query(tuple(categories), start_day, end_day)
+        else:
+            results = []
+
+        page = results[start:start + max_results]
+        head = FEED_HEAD.format(
+            link=quoteattr(f'http://arxiv.org/api/query?{url.query}'),
+            title=escape(f'search_query={search_query}&start={start}&max_results={max_results}'),
+            updated=f'{datetime.now(timezone.utc):%Y-%m-%dT%H:%M:%S}Z',
+            total=len(results), start=start, per_page=len(page)
+        )
+        body = head + ''.join(server.entry_xml(*paper) for paper in page) + '</feed>\n'
+        self._send(200, 'application/atom+xml; charset=utf-8', body.encode('utf-8'))
+
+    def _send(self, status, content_type, data, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_server(host='127.0.0.1', port=0, **options):
+    """在后台线程中启动模拟服务，返回 (服务器, API 地址)；用完后调用 `server.shutdown()`"""
+    server = MockArxivServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_port}/api/query'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟的 arXiv API（合成 Atom 响应）')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8002)
+    parser.add_argument('--papers-per-day', type=int, default=100, help='每个分类每天的平均论文数')
+    parser.add_argument('--cross-list-rate', type=float, default=0.2, help='同时列在另一个分类下的论文比例')
+    parser.add_argument('--max-page-size', type=int, default=2000, help='max_results 的上限')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='每个请求的固定延迟（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 503 的请求比例')
+    parser.add_argument('--seed', type=int, default=0, help='合成数据的随机种子')
+    args = parser.parse_args()
+
+    options = vars(args).copy()
+    host, port = options.pop('host'), options.pop('port')
+    server = MockArxivServer((host, port), **options)
+    print(f"模拟 arXiv API 已启动: http://{host}:{server.server_port}/api/query（Ctrl+C 停止）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"共处理 {server.requests} 个请求")
+
+
+if __name__ == '__main__':
+    main()
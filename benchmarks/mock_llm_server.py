@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+本地模拟的 OpenAI 兼容 LLM 服务，用于离线测试与可复现的吞吐量基准
+
+实现 `POST <任意前缀>/chat/completions`（支持 `stream: true` 与 `stream_options.include_usage`），
+按提示词识别请求类型并返回确定性的结果：
+  - 单篇/批量评估：返回 JSON，是否推荐由 arxiv_id（单篇为标题）的哈希决定，比例见 `--recommend-rate`
+  - 单篇/批量翻译：返回 JSON，中文标题为 “【译】+ 英文标题”；流式翻译返回 “标题\\n\\n摘要” 纯文本
+  - 兴趣精炼、收藏总结与合并：返回固定格式的文本
+响应包含 `usage` 字段（token 数按字符数估算）。
+
+可以注入：延迟分布（`--latency-dist`）、随机 500 错误（`--error-rate`）、随机 429（`--rate-limit-rate`）
+以及超过并发上限时的 429（`--max-concurrency`），429 响应带 `Retry-After`。
+`GET /stats` 返回按请求类型与状态码统计的请求数。
+
+用法：
+    python benchmarks/mock_llm_server.py --port 8001 --latency-ms 800 --latency-dist lognormal
+    python benchmarks/mock_llm_server.py --rate-limit-rate 0.05 --max-concurrency 8 --seed 1
+然后在设置页把 LLM Base URL 配置为 http://127.0.0.1:8001/v1（API Key 任意）。
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+_ARXIV_ID_RE = re.compile(r'arxiv_id: (\S+)')
+_TITLE_RE = re.compile(r'^\s*(?:英文)?标题: (.*)$', re.M)
+_BATCH_TRANSLATION_RE = re.compile(r'请将以下 \d+ 篇英文学术论文')
+
+
+def stable_fraction(key: str) -> float:
+    """把字符串确定性地映射到 [0, 1)，用于决定是否推荐（与进程、随机种子无关）"""
+    return int(hashlib.sha1(key.encode('utf-8')).hexdigest()[:8], 16) / 0x100000000
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """模拟 LLM 服务；参数见模块说明，也可在同一进程中用 `start_server` 启动"""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=200.0, latency_dist='lognormal', latency_sigma=0.5,
+                 stream_interval_ms=20.0, error_rate=0.0, rate_limit_rate=0.0, retry_after=1,
+                 max_concurrency=0, recommend_rate=0.3, seed=None):
+        super().__init__(address, MockLLMHandler)
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f'不支持的延迟分布: {latency_dist}')
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.stream_interval_ms = stream_interval_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.max_concurrency = max_concurrency
+        self.recommend_rate = recommend_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.stats = Counter()
+
+    def sample_latency(self) -> float:
+        """按配置的分布抽取一次响应延迟（秒），各分布的均值均为 `latency_ms`"""
+        mean = self.latency_ms / 1000.0
+        with self.lock:
+            if self.latency_dist == 'fixed' or mean <= 0:
+                return max(mean, 0.0)
+            if self.latency_dist == 'uniform':
+                return self.rng.uniform(0, 2 * mean)
+            if self.latency_dist == 'exponential':
+                return self.rng.expovariate(1 / mean)
+            # 对数正态：长尾，接近真实 LLM 接口的延迟分布
+            sigma = self.latency_sigma
+            return self.rng.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)
+
+    def roll(self, rate: float) -> bool:
+        with self.lock:
+            return rate > 0 and self.rng.random() < rate
+
+    def count(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.stats[key] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats, in_flight=self.in_flight)
+
+    # === 确定性回答 ===
+
+    def answer(self, prompt: str):
+        """返回 (请求类型, 回复文本)"""
+        if '逐篇判断论文是否值得推荐' in prompt:
+            items = [{'arxiv_id': arxiv_id, **self._evaluation(arxiv_id)} for arxiv_id in _ARXIV_ID_RE.findall(prompt)]
+            return 'evaluate_batch', json.dumps(items, ensure_ascii=False)
+        if '判断这篇论文是否值得推荐' in prompt:
+            title = _TITLE_RE.search(prompt)
+            return 'evaluate', json.dumps(self._evaluation(title.group(1) if title else prompt), ensure_ascii=False)
+        if _BATCH_TRANSLATION_RE.search(prompt):
+            items = [
+                {'arxiv_id': arxiv_id, **self._translation(title)}
+                for arxiv_id, title in zip(_ARXIV_ID_RE.findall(prompt), _TITLE_RE.findall(prompt))
+            ]
+            return 'translate_batch', json.dumps(items, ensure_ascii=False)
+        if '英文标题' in prompt:
+            title = _TITLE_RE.search(prompt)
+            translation = self._translation(title.group(1) if title else '')
+            if '第一行为中文标题' in prompt:
+                return 'translate_stream', f"{translation['chinese_title']}\n\n{translation['chinese_abstract']}"
+            return 'translate', json.dumps(translation, ensure_ascii=False)
+        if '精炼' in prompt:
+            return 'refine', '大语言模型的高效推理与对齐；图神经网络及其在推荐系统中的应用。'
+        if '兴趣总结' in prompt or '研究兴趣' in prompt:
+            digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]
+            return 'summarize', f'用户主要关注大语言模型、图神经网络与高效推理方向（模拟总结 {digest}）。'
+        return 'other', 'OK'
+
+    def _evaluation(self, key: str):
+        recommended = stable_fraction(key.strip()) < self.recommend_rate
+        reason = '与用户关注的方向高度相关（模拟）' if recommended else '与用户兴趣关联较弱（模拟）'
+        return {'is_recommended': recommended, 'reason': reason}
+
+    @staticmethod
+    def _translation(title: str):
+        title = title.strip()
+        return {'chinese_title': f'【译】{title}', 'chinese_abstract': f'这是论文《{title}》的模拟中文摘要。'}
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: MockLLMServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/stats'):
+            self._send_json(200, self.server.snapshot())
+        elif self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'mock-model', 'object': 'model'}]})
+        else:
+            self._send_json(404, {'error': {'message': 'not found'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length)
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found'}})
+            return
+        try:
+            body = json.loads(raw)
+            prompt = '\n'.join(str(m.get('content', '')) for m in body.get('messages', []))
+        except (ValueError, AttributeError):
+            self._send_json(400, {'error': {'message': 'invalid JSON body'}})
+            return
+
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            over_capacity = 0 < server.max_concurrency < server.in_flight
+        try:
+            kind, content = server.answer(prompt)
+            if over_capacity or server.roll(server.rate_limit_rate):
+                server.count('requests', f'{kind}:429', 'status_429')
+                self._send_json(429, {'error': {'message': 'Rate limit reached (mock)', 'type': 'rate_limit'}},
+                                {'Retry-After': str(server.retry_after)})
+                return
+            time.sleep(server.sample_latency())
+            if server.roll(server.error_rate):
+                server.count('requests', f'{kind}:500', 'status_500')
+                self._send_json(500, {'error': {'message': 'Internal error (mock)', 'type': 'server_error'}})
+                return
+            server.count('requests', kind, 'status_200')
+            usage = {'prompt_tokens': estimate_tokens(prompt), 'completion_tokens': estimate_tokens(content)}
+            usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+            if body.get('stream'):
+                include_usage = bool((body.get('stream_options') or {}).get('include_usage'))
+                self._send_stream(body.get('model'), content, usage if include_usage else None)
+            else:
+                self._send_json(200, {
+                    'id': f'chatcmpl-mock-{time.time_ns()}',
+                    'object': 'chat.completion',
+                    'model': body.get('model') or 'mock-model',
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                 'finish_reason': 'stop'}],
+                    'usage': usage
+                })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, model, content, usage):
+        """以 SSE（分块传输）逐段发送内容，每段约 8 个字符，段间隔 `stream_interval_ms`"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def send_event(payload):
+            data = f'data: {payload}\n\n'.encode('utf-8')
+            self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+            self.wfile.flush()
+
+        base = {'object': 'chat.completion.chunk', 'model': model or 'mock-model'}
+        for start in range(0, len(content), 8):
+            if start:
+                time.sleep(self.server.stream_interval_ms / 1000.0)
+            delta = {'content': content[start:start + 8]}
+            send_event(json.dumps({**base, 'choices': [{'index': 0, 'delta': delta}]}, ensure_ascii=False))
+        send_event(json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}))
+        if usage is not None:
+            send_event(json.dumps({**base, 'choices': [], 'usage': usage}))
+        send_event('[DONE]')
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+
+def start_server(host='127.0.0.1', port=0, **options):
+    """在后台线程中启动模拟服务，返回 (服务器, Base URL)；用完后调用 `server.shutdown()`"""
+    server = MockLLMServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_port}/v1'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟的 OpenAI 兼容 LLM 服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency-ms', type=float, default=200.0, help='平均响应延迟（毫秒）')
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTRIBUTIONS, default='lognormal', help='延迟分布')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='对数正态分布的 sigma（越大长尾越明显）')
+    parser.add_argument('--stream-interval-ms', type=float, default=20.0, help='流式响应相邻片段的间隔（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 500 的请求比例')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='随机返回 429 的请求比例')
+    parser.add_argument('--retry-after', type=int, default=1, help='429 响应的 Retry-After（秒）')
+    parser.add_argument('--max-concurrency', type=int, default=0, help='同时处理的请求上限，超出时返回 429（0 为不限制）')
+    parser.add_argument('--recommend-rate', type=float, default=0.3, help='评估结果为推荐的论文比例')
+    parser.add_argument('--seed', type=int, default=None, help='延迟与错误注入的随机种子')
+    args = parser.parse_args()
+
+    options = vars(args).copy()
+    host, port = options.pop('host'), options.pop('port')
+    server = MockLLMServer((host, port), **options)
+    print(f"模拟 LLM 服务已启动: http://{host}:{server.server_port}/v1（Ctrl+C 停止）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"请求统计: {json.dumps(server.snapshot(), ensure_ascii=False)}")
+
+
+if __name__ == '__main__':
+    main()
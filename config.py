@@ -8,10 +8,19 @@ class Config:
     # 数据库配置
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     DATABASE_PATH = os.path.join(BASE_DIR, 'data', 'arxiv_agent.db')
+    DB_BUSY_TIMEOUT = 10  # 等待写锁的超时时间（秒）
+    DB_CACHE_SIZE_KB = 20000  # SQLite 页缓存大小（KB）
+    DB_MMAP_SIZE = 256 * 1024 * 1024  # SQLite 内存映射大小（字节）
     
     # arXiv API配置
-    ARXIV_API_BASE = 'http://export.arxiv.org/api/query'
+    ARXIV_API_BASE = os.environ.get('ARXIV_API_BASE') or 'http://export.arxiv.org/api/query'  # 离线测试时可指向 benchmarks/mock_arxiv_server.py
     ARXIV_SEARCH_BASE = 'http://arxiv.org/search'
+    ARXIV_PAGE_SIZE = 200  # 分页抓取时每页条数
+    ARXIV_PAGE_DELAY = float(os.environ.get('ARXIV_PAGE_DELAY') or 3.0)  # 相邻两次请求之间的最小间隔（秒），遵守arXiv API的访问频率要求
+    ARXIV_PAGE_RETRIES = 3  # 单页请求的最多尝试次数（arXiv 会话不在连接层重试）
+    ARXIV_REQUEST_TIMEOUT = 30  # 单页请求超时时间（秒）
+    ARXIV_CRAWL_WORKERS = 4  # 按 (分类, 日期) 分片并行抓取时的线程数
+    CRAWL_CURSOR_TTL_DAYS = 14  # 分片断点超过该天数未更新即视为过期，在下次爬取开始时清理
     
     # 默认配置值
     DEFAULT_CATEGORIES = ['cs.AI', 'cs.LG', 'cs.CL']  # 默认关注的CS子分区
@@ -20,6 +29,96 @@ class Config:
     # LLM默认配置
     DEFAULT_LLM_BASE_URL = 'https://api.openai.com/v1'
     DEFAULT_LLM_MODEL = 'gpt-3.5-turbo'
+
+    # 推荐队列配置
+    READY_QUEUE_LOW_WATERMARK = 5  # 待展示的推荐论文少于该数量时启动后台评估补充
+    RECOMMENDATION_WAIT_SECONDS = 20  # 推荐队列为空时，请求等待评估任务产生推荐论文的最长时间
+
+    # 翻译配置（推荐论文不在评估时翻译，展示前才翻译）
+    TRANSLATION_PREFETCH = 5  # 预先翻译推荐队列最前面的论文数
+    TRANSLATION_BATCH_SIZE = 5  # 每次LLM请求翻译的论文数
+
+    # 推荐进度推送（SSE）配置
+    STATUS_STREAM_HEARTBEAT = 15  # 无变化时发送心跳的间隔（秒）
+    STATUS_STREAM_MIN_INTERVAL = 0.5  # 两次推送之间的最小间隔（秒）
+    STATUS_STREAM_MAX_CLIENTS = 20  # 同时保持的推送连接上限（每个连接占用一个线程），超出时返回 503，前端改为轮询
+    STATUS_STREAM_MAX_SECONDS = 300  # 单个推送连接的最长时间（秒），到期后关闭，由浏览器自动重连
+    STATUS_STREAM_RETRY_MS = 3000  # 连接关闭后浏览器重连前的等待时间（毫秒）
+
+    # HTTP客户端配置（LLM与arXiv共享）
+    HTTP_POOL_SIZE = 10  # 每个会话的连接池大小
+    HTTP_RETRIES = 3  # 连接错误与 429/5xx 响应的重试次数（429/5xx 只对 GET 等幂等请求重试，POST 只重试连接错误）
+    HTTP_BACKOFF_FACTOR = 0.5  # 重试的指数退避系数（秒）
+    HTTP_BACKOFF_JITTER = 0.5  # 重试退避的随机抖动上限（秒）
+
+    # 向量预筛选配置（在LLM评估前按与用户兴趣的相似度过滤论文）
+    PREFILTER_ENABLED = False  # 默认关闭：被淘汰的论文不会经过LLM评估，开启前应确认阈值适合自己的兴趣范围
+    EMBEDDING_MODEL = ''  # sentence-transformers 模型名；为空时使用离线的哈希 TF-IDF 向量
+    EMBEDDING_DIM = 2048  # 哈希 TF-IDF 向量维度
+    PREFILTER_TOP_FRACTION = 0.1  # 每批新论文中保留相似度最高的比例
+    PREFILTER_MIN_SCORE = 0.3  # 相似度不低于该值的论文总是保留
+    PREFILTER_MIN_CANDIDATES = 50  # 新论文少于该数量时不做预筛选
+    PREFILTER_BATCH_SIZE = 2000  # 每次读取并打分的论文数量（按批计算保留比例，内存占用与待评估总数无关）
+    PREFILTER_MAX_FAVORITES = 200  # 构建兴趣向量时使用的最近收藏论文数量
+
+    # 全文检索配置
+    SEARCH_RANK_WINDOW = 5000  # 匹配论文过多时，只对最新的这些匹配论文计算 BM25 排序
+
+    # 论文计数配置
+    STATS_CACHE_TTL = 2  # 计数缓存秒数：本进程写入后立即失效，其他进程的写入最多延迟这么久可见
+
+    # 批量操作配置
+    BULK_ID_CHUNK_SIZE = 5000  # 批量更新/删除时每条语句处理的论文ID数量（同一事务内分块执行）
+
+    # LLM响应缓存配置
+    LLM_CACHE_ENABLED = True
+    LLM_CACHE_TTL_SECONDS = 30 * 24 * 3600  # 缓存有效期（秒）
+    LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024  # 缓存总大小上限，超出后按最近最少使用淘汰
+    LLM_CACHE_TOUCH_INTERVAL = 300  # 命中时距上次更新超过该秒数才写回访问时间（LRU 淘汰的精度）
+    LLM_CACHE_STATS_TTL = 30  # 缓存条目数与大小的统计缓存秒数：本进程写入缓存后立即失效，其他进程的写入最多延迟这么久可见
+
+    # 提示词 token 预算（安装 tiktoken 时精确计数，否则按字符数估算）
+    LLM_TOKENIZER_ENCODING = 'cl100k_base'  # tiktoken 编码名称
+    LLM_ABSTRACT_TOKEN_BUDGET = 350  # 评估提示词中每篇论文摘要的 token 上限，超出时按句截断
+    LLM_INTERESTS_TOKEN_BUDGET = 400  # 评估提示词中用户兴趣点的 token 上限
+    LLM_FAVORITE_SUMMARY_TOKEN_BUDGET = 500  # 评估提示词中收藏总结的 token 上限
+    LLM_TRANSLATION_CHUNK_TOKEN_BUDGET = 1800  # 每次批量翻译请求中论文标题与摘要的 token 上限，超出时拆分为多次请求
+    LLM_TRANSLATION_MAX_TOKENS = 4000  # 批量翻译请求的回复 token 上限（按原文长度估算，不超过该值）
+    LLM_SUMMARY_ABSTRACT_TOKEN_BUDGET = 80  # 总结收藏时每篇论文摘要的 token 上限
+    LLM_SUMMARY_CHUNK_TOKEN_BUDGET = 3000  # 每次总结请求中论文列表的 token 上限，超出时分组总结后再合并
+    LLM_SUMMARY_MAX_WORKERS = 4  # 分组总结与合并时的最大并发请求数
+    LLM_SUMMARY_MERGE_FANIN = 4  # 逐层合并时每次最多合并的分组总结数量
+    LLM_STREAM_INCLUDE_USAGE = True  # 流式请求是否要求服务端在最后返回 token 用量（stream_options.include_usage）
+
+    # 后台评估配置
+    EVAL_MAX_WORKERS = 4  # 同时进行LLM评估的最大并发数
+    EVAL_PROMPT_BATCH_SIZE = 5  # 每次LLM请求中打包评估的论文数量
+    EVAL_CLAIM_LEASE_SECONDS = 300  # 论文评估认领的有效期（秒），超时后可被其他线程重新认领
+    EVAL_MAX_ATTEMPTS = 3  # 单篇论文最多尝试评估的次数（被限流或服务不可用不计），用尽后标记为评估失败、不再认领
+    EVAL_BACKOFF_BASE = 1.0  # 遇到 429/5xx 时的初始退避时间（秒）
+    EVAL_BACKOFF_MAX = 60.0  # 最大退避时间（秒）
+    EVAL_MAX_UNAVAILABLE = 5  # LLM 服务连续不可用（连接失败、超时、401/403、5xx）达到该次数时停止本轮评估，已认领论文释放且不计尝试次数
+    EVAL_ENGINE = 'async'  # 后台评估实现：'async'（asyncio + httpx 流水线）或 'threads'（线程池 + requests）
+    EVAL_ASYNC_QUEUE_SIZE = 8  # 异步流水线各阶段之间队列的容量（以批为单位），队列满时上游暂停
+    EVAL_DRAIN_TIMEOUT = 30  # 停止评估时等待已认领论文完成的秒数，超时后取消并释放认领
+    
+    # 后台任务配置
+    EMBEDDED_WORKER = True  # 是否在 Web 进程内执行后台任务（单进程部署）；多进程部署时设为 False 并运行 worker.py
+    WORKER_PROCESSES = 2  # worker.py 默认启动的进程数
+    JOB_LEASE_SECONDS = 300  # 任务租约时长（秒），执行期间每 1/3 租约续约一次
+    JOB_MAX_ATTEMPTS = 3  # 任务最多执行次数（含重试）
+    JOB_RETRY_BASE_SECONDS = 30  # 任务失败后第一次重试前的等待秒数，之后每次翻倍
+    JOB_POLL_INTERVAL = 2  # 没有任务时检查新任务的间隔（秒）
+
+    # 定时爬取配置（按 arXiv 公告时间增量爬取，由 Web 进程内的 worker 或 worker.py 调度）
+    CRAWL_SCHEDULE_ENABLED = True
+    CRAWL_ANNOUNCE_TZ = 'America/New_York'  # arXiv 公告时间所在时区
+    CRAWL_ANNOUNCE_TIME = '20:00'  # 公告时间（当地时间）
+    CRAWL_ANNOUNCE_WEEKDAYS = (6, 0, 1, 2, 3)  # 有公告的日期（周一为 0）：周日至周四
+    CRAWL_DELAY_MINUTES = 30  # 公告后等待多久再爬取（API 数据同步有延迟）
+    CRAWL_SCHEDULER_POLL_SECONDS = 300  # 调度器检查执行时间的最长间隔（秒）
+    ARXIV_US_HOLIDAYS = True  # 跳过美国联邦节假日（元旦、阵亡将士纪念日、六月节、独立日、劳动节、感恩节、圣诞节，含调休日）
+    ARXIV_HOLIDAYS = []  # 额外的无公告日期（美东日期，YYYY-MM-DD，如年末停发），见 https://info.arxiv.org/help/availability.html
     
     # 系统配置键名
     CONFIG_KEYS = {
@@ -1,10 +1,15 @@
-import requests
-import feedparser
+import json
 from datetime import datetime, timedelta
 import time
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Iterator, Tuple, Callable
 from config import Config
 from utils.database import DatabaseManager
+from utils.rate_limiter import get_rate_limiter
+from utils.atom_parser import ArxivAtomParser
+from utils.http_client import get_session
+from utils.status_hub import status_hub
 
 class ArxivService:
     """arXiv论文爬虫服务"""
@@ -13,6 +18,13 @@ class ArxivService:
         self.config = Config()
         self.db = DatabaseManager()
         self.base_url = self.config.ARXIV_API_BASE
+        # 不在连接层重试：重试由 fetch_page 负责，每次重试都经过限流器
+        self.session = get_session('arxiv', pool_size=self.config.ARXIV_CRAWL_WORKERS, retries=0)
+        # 进程内所有 ArxivService 实例和抓取线程共享的限流器，保证整体请求频率不超过 arXiv 的要求。
+        # 跨进程的访问频率依赖于同一时间只有一个爬取任务在运行（见 `DatabaseManager.claim_job` 的爬取任务串行化）
+        self.rate_limiter = get_rate_limiter('arxiv', rate=1.0 / self.config.ARXIV_PAGE_DELAY, capacity=1)
+        # 最近一次爬取的分片报告
+        self.last_crawl_report = []
         
     def build_search_query(self, categories: List[str], start_date: str, end_date: str) -> str:
         """构建arXiv搜索查询"""
@@ -64,38 +76,195 @@ class ArxivService:
             'arxiv_url': f'http://arxiv.org/abs/{arxiv_id}'
         }
     
+    def build_page_url(self, search_params: str, start: int, page_size: int) -> str:
+        """构建单页请求的URL"""
+        return (f"{self.base_url}?{search_params}&sortBy=lastUpdatedDate&sortOrder=descending"
+                f"&start={start}&max_results={page_size}")
+
+    def fetch_page(self, search_params: str, start: int, page_size: int) -> Tuple[List[Dict], Optional[int]]:
+        """获取单页结果，返回 (论文列表, 总结果数)。
+
+        最多请求 `ARXIV_PAGE_RETRIES` 次，全部失败后抛出最后一次异常。重试只在这一层进行
+        （arXiv 会话不在连接层重试），每次请求都经过限流器；429/503 响应带 `Retry-After` 时按其等待。
+        """
+        url = self.build_page_url(search_params, start, page_size)
+        attempts = max(1, self.config.ARXIV_PAGE_RETRIES)
+
+        for attempt in range(attempts):
+            try:
+                self.rate_limiter.acquire()
+                with self.session.get(url, timeout=self.config.ARXIV_REQUEST_TIMEOUT, stream=True) as response:
+                    response.raise_for_status()
+                    response.raw.decode_content = True
+
+                    # 直接从响应流中增量解析 Atom 条目
+                    parser = ArxivAtomParser(response.raw)
+                    papers = list(parser)
+                return papers, parser.total_results
+            except Exception as e:
+                print(f"获取第 {start} 条起的论文失败（第 {attempt + 1}/{attempts} 次）: {e}")
+                if attempt + 1 >= attempts:
+                    raise
+                time.sleep(self._retry_delay(e, attempt))
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """第 `attempt` 次失败后的等待秒数：线性增加，服务端给出 `Retry-After` 时取两者较大值"""
+        delay = self.config.ARXIV_PAGE_DELAY * (attempt + 1)
+        response = getattr(error, 'response', None)
+        try:
+            return max(delay, float(response.headers.get('Retry-After')))
+        except (AttributeError, TypeError, ValueError):
+            return delay
+
+    def iter_paper_pages(self, categories: List[str], start_date: str, end_date: str,
+                         start: int = 0, page_size: Optional[int] = None) -> Iterator[Tuple[int, List[Dict]]]:
+        """按 `start=`/`max_results=` 逐页获取论文。
+
+        每次产出 (下一页的起始偏移, 当前页论文列表)，调用方可以据此保存断点。
+        """
+        page_size = page_size or self.config.ARXIV_PAGE_SIZE
+        search_params = self.build_search_query(categories, start_date, end_date)
+        offset = start
+
+        while True:
+            papers, total_results = self.fetch_page(search_params, offset, page_size)
+            if not papers:
+                break
+
+            offset += len(papers)
+            yield offset, papers
+
+            if len(papers) < page_size or (total_results is not None and offset >= total_results):
+                break
+
     def fetch_papers(self, categories: List[str], start_date: str, end_date: str, max_results: int = 1000) -> List[Dict]:
-        """获取指定时间段内的论文"""
+        """获取指定时间段内的论文（最多 `max_results` 篇）"""
         papers = []
-        
-        # 构建查询参数
-        search_params = self.build_search_query(categories, start_date, end_date)
-        url = f"{self.base_url}?{search_params}&sortBy=lastUpdatedDate&sortOrder=descending&max_results={max_results}"
-        
+        page_size = min(max_results, self.config.ARXIV_PAGE_SIZE)
+
         try:
-            # 发送请求
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            
-            # 解析RSS feed
-            feed = feedparser.parse(response.content)
-            
-            # 解析每个条目
-            for entry in feed.entries:
-                paper_data = self.parse_arxiv_entry(entry)
-                papers.append(paper_data)
-                
+            for _, page in self.iter_paper_pages(categories, start_date, end_date, page_size=page_size):
+                papers.extend(page)
+                if len(papers) >= max_results:
+                    break
         except Exception as e:
             print(f"获取论文时出错: {e}")
-            return []
-        
-        return papers
-    
+
+        return papers[:max_results]
+
+    def harvest_papers(self, categories: List[str], start_date: str, end_date: str,
+                       cursor_key: str = 'CRAWL_CURSOR',
+                       dedupe: Optional[Callable[[List[Dict]], List[Dict]]] = None) -> Tuple[int, bool]:
+        """分页抓取论文并逐页写入数据库，返回 (保存数量, 是否抓取完成)。
+
+        抓取进度（查询 + 偏移 + 日期窗口）保存在配置项 `cursor_key` 中：
+        如果上一次相同查询的抓取被中断，会从断点处继续；抓取完成后清除断点。
+        `dedupe` 可用于在写入前过滤掉其他分片已经处理过的论文。
+
+        注意：断点是按 `lastUpdatedDate` 倒序结果中的偏移量记录的。两次抓取之间如果有论文进入该日期窗口，
+        续抓时会重复读到少量论文（按 arxiv_id 忽略，无影响）；如果窗口内的论文发布了新版本而移出窗口，
+        后面的论文整体前移，续抓时会跳过相同数量的论文。分片按单日划分，已结束的日期很少变化，
+        因此只在中断后隔了较长时间才续抓时可能漏抓；需要完整数据时可删除断点后重新爬取该日期。
+        """
+        query = self.build_search_query(categories, start_date, end_date)
+        offset = 0
+
+        cursor_str = self.db.get_config(cursor_key)
+        if cursor_str:
+            try:
+                cursor = json.loads(cursor_str)
+                if (cursor.get('query') == query and cursor.get('start_date') == start_date
+                        and cursor.get('end_date') == end_date):
+                    offset = int(cursor.get('offset', 0))
+                    print(f"从断点继续抓取，偏移: {offset}")
+            except Exception as e:
+                print(f"解析抓取断点失败，将从头开始: {e}")
+
+        saved_count = 0
+        try:
+            for next_offset, papers in self.iter_paper_pages(categories, start_date, end_date, start=offset):
+                if dedupe:
+                    papers = dedupe(papers)
+                result = self.db.bulk_insert_papers(papers)
+                saved_count += result['inserted']
+                status_hub.refresh()
+
+                # 每页写入后保存断点
+                self.db.set_config(cursor_key, json.dumps({
+                    'query': query,
+                    'start_date': start_date,
+                    'end_date': end_date,
+                    'offset': next_offset
+                }))
+        except Exception as e:
+            print(f"抓取中断，已保存断点: {e}")
+            return saved_count, False
+
+        self.db.delete_config(cursor_key)
+        return saved_count, True
+
+    def plan_crawl_shards(self, categories: List[str], start_dt: datetime, end_dt: datetime) -> List[Tuple[str, str]]:
+        """将爬取请求拆分为 (分类, 日期) 分片，日期格式为 YYYYMMDD"""
+        shards = []
+        day = start_dt
+        while day.date() <= end_dt.date():
+            for category in categories:
+                shards.append((category, day.strftime('%Y%m%d')))
+            day += timedelta(days=1)
+        return shards
+
+    def crawl_shards(self, shards: List[Tuple[str, str]]) -> Tuple[int, bool]:
+        """通过有界线程池并行抓取所有分片，返回 (保存数量, 是否全部完成)。
+
+        所有请求共享 `self.rate_limiter`；不同分类之间交叉列出的论文按 `arxiv_id` 去重。
+        每个分片的耗时等统计信息保存在 `self.last_crawl_report` 中。
+        """
+        seen_ids = set()
+        seen_lock = threading.Lock()
+
+        def dedupe(papers: List[Dict]) -> List[Dict]:
+            with seen_lock:
+                unseen = [p for p in papers if p['arxiv_id'] not in seen_ids]
+                seen_ids.update(p['arxiv_id'] for p in unseen)
+            return unseen
+
+        def run_shard(shard: Tuple[str, str]) -> Dict:
+            category, day = shard
+            started = time.monotonic()
+            saved, completed = self.harvest_papers(
+                [category], day, day,
+                cursor_key=f'CRAWL_CURSOR:{category}:{day}',
+                dedupe=dedupe
+            )
+            return {
+                'category': category,
+                'date': day,
+                'saved': saved,
+                'completed': completed,
+                'seconds': round(time.monotonic() - started, 2)
+            }
+
+        with ThreadPoolExecutor(max_workers=self.config.ARXIV_CRAWL_WORKERS) as executor:
+            report = list(executor.map(run_shard, shards))
+
+        self.last_crawl_report = report
+        for item in report:
+            status = '完成' if item['completed'] else '中断'
+            print(f"分片 {item['category']} {item['date']}: 保存 {item['saved']} 篇，"
+                  f"耗时 {item['seconds']} 秒（{status}）")
+
+        saved_count = sum(item['saved'] for item in report)
+        completed = all(item['completed'] for item in report)
+        return saved_count, completed
+
     def crawl_recent_papers(self, force_categories: Optional[List[str]] = None, start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
         """爬取论文，支持可选的日期范围（YYYY-MM-DD）。
 
         如果提供 `start_date`/`end_date`，将使用该范围，否则使用基于 `LAST_CRAWL_DATE` 的默认逻辑。
+        有分片未抓取完成时抛出 RuntimeError（已保存的论文保留、断点已记录，由任务重试从断点继续），
+        已保存的数量见 `self.last_crawl_report`。
         """
+        self.last_crawl_report = []
         # 获取配置的分类
         categories_str = self.db.get_config('CATEGORIES', '')
         if force_categories:
@@ -141,31 +310,27 @@ class ArxivService:
         if start_dt > end_dt:
             start_dt = end_dt
 
-        # arXiv API 期望 YYYYMMDD 格式
-        start_date = start_dt.strftime('%Y%m%d')
-        end_date = end_dt.strftime('%Y%m%d')
-        
-        print(f"爬取时间范围: {start_date} 到 {end_date}")
+        print(f"爬取时间范围: {start_dt.strftime('%Y%m%d')} 到 {end_dt.strftime('%Y%m%d')}")
         print(f"关注分类: {categories}")
         
-        # 获取论文
-        papers = self.fetch_papers(categories, start_date, end_date)
-        
-        # 保存到数据库
-        saved_count = 0
-        for paper in papers:
-            result = self.db.insert_paper(paper)
-            try:
-                saved_count += int(result)
-            except Exception:
-                if result:
-                    saved_count += 1
-        
-        # 更新最后爬取日期（设置为昨天，因为我们已经抓取了昨天及之前的文章）
-        yesterday_str = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        self.db.set_config('LAST_CRAWL_DATE', yesterday_str)
+        # 按 (分类, 日期) 分片并行抓取，逐页保存到数据库
+        shards = self.plan_crawl_shards(categories, start_dt, end_dt)
+        # 清理过期的分片断点（对应的日期已不会再被爬取）
+        expired = self.db.delete_stale_configs('CRAWL_CURSOR:', self.config.CRAWL_CURSOR_TTL_DAYS)
+        if expired:
+            print(f"清理了 {expired} 个过期的分片断点")
+        saved_count, completed = self.crawl_shards(shards)
+
+        if completed:
+            # 更新最后爬取日期（设置为昨天，因为我们已经抓取了昨天及之前的文章）
+            yesterday_str = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+            self.db.set_config('LAST_CRAWL_DATE', yesterday_str)
         
         print(f"成功爬取并保存 {saved_count} 篇论文")
+        if not completed:
+            unfinished = [f"{item['category']} {item['date']}" for item in self.last_crawl_report if not item['completed']]
+            raise RuntimeError(f"{len(unfinished)} 个分片未抓取完成（已保存 {saved_count} 篇，重试时从断点继续）: "
+                               f"{', '.join(unfinished[:5])}")
         return saved_count
     
     def get_cs_categories(self) -> Dict[str, str]:
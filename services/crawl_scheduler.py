@@ -0,0 +1,150 @@
+import threading
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import FrozenSet, Optional
+
+from config import Config
+from utils.database import DatabaseManager
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = Exception
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """某月第 n 个星期 weekday（周一为 0）；n 为 -1 时为最后一个"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = (date(year, month + 1, 1) if month < 12 else date(year + 1, 1, 1)) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    """固定日期的节假日逢周六在周五补休，逢周日在周一补休"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def us_holidays(year: int) -> FrozenSet[date]:
+    """`year` 年 arXiv 不发布公告的美国联邦节假日（含补休日，元旦的补休日可能落在前一年的 12 月 31 日）"""
+    return frozenset({
+        _observed(date(year, 1, 1)),
+        _nth_weekday(year, 5, 0, -1),   # 阵亡将士纪念日：五月最后一个周一
+        _observed(date(year, 6, 19)),
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),    # 劳动节：九月第一个周一
+        _nth_weekday(year, 11, 3, 4),   # 感恩节：十一月第四个周四
+        _observed(date(year, 12, 25)),
+    })
+
+
+class CrawlScheduler:
+    """按 arXiv 公告时间定时添加增量爬取任务
+
+    arXiv 在美东时间周日至周四 20:00 发布新论文，周五、周六及节假日不发布
+    （美国联邦节假日按规则计算，`Config.ARXIV_HOLIDAYS` 补充其他停发日期）。
+    调度器在每次公告后 `Config.CRAWL_DELAY_MINUTES` 分钟添加一个爬取任务（爬取完成后由任务链式添加评估任务），
+    没有公告的日子跳过。下次执行时间保存在 config 表的 `NEXT_SCHEDULED_CRAWL` 中（UTC），
+    多个进程同时运行调度器时通过比较并更新该值保证每个时间点只添加一次任务；
+    服务停机期间错过的多个时间点在启动后合并为一次爬取。
+    """
+
+    NEXT_RUN_KEY = 'NEXT_SCHEDULED_CRAWL'
+    TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+    def __init__(self, job_service, db: DatabaseManager = None):
+        self.job_service = job_service
+        self.db = db or job_service.db
+        self.tz = self._load_timezone(Config.CRAWL_ANNOUNCE_TZ)
+        hour, minute = Config.CRAWL_ANNOUNCE_TIME.split(':')
+        self.announce_hour = int(hour)
+        self.announce_minute = int(minute)
+        self.holidays = {date.fromisoformat(day) for day in Config.ARXIV_HOLIDAYS}
+
+    @staticmethod
+    def _load_timezone(name: str):
+        if ZoneInfo is not None:
+            try:
+                return ZoneInfo(name)
+            except ZoneInfoNotFoundError:
+                pass
+        # 没有时区数据库时（如 Windows 未安装 tzdata）按美东标准时间近似，夏令时期间会晚一小时
+        print(f"无法加载时区 {name}，使用 UTC-5 代替")
+        return timezone(timedelta(hours=-5))
+
+    def is_announcement_day(self, day: date) -> bool:
+        """`day`（美东日期）当晚是否有 arXiv 公告"""
+        if day.weekday() not in Config.CRAWL_ANNOUNCE_WEEKDAYS or day in self.holidays:
+            return False
+        return not (Config.ARXIV_US_HOLIDAYS and (day in us_holidays(day.year) or day in us_holidays(day.year + 1)))
+
+    def next_run_after(self, now: datetime) -> datetime:
+        """返回 `now`（带时区）之后第一个公告时间加上延迟，结果为 UTC 时间"""
+        local_now = now.astimezone(self.tz)
+        day = local_now.date()
+        # 最多向后查找一年，避免节假日配置错误时死循环
+        for _ in range(366):
+            if self.is_announcement_day(day):
+                announce = datetime(day.year, day.month, day.day, self.announce_hour, self.announce_minute, tzinfo=self.tz)
+                run_at = announce + timedelta(minutes=Config.CRAWL_DELAY_MINUTES)
+                if run_at > local_now:
+                    return run_at.astimezone(timezone.utc)
+            day += timedelta(days=1)
+        raise ValueError('一年内没有 arXiv 公告日，请检查 CRAWL_ANNOUNCE_WEEKDAYS 与 ARXIV_HOLIDAYS 配置')
+
+    def next_run(self) -> Optional[datetime]:
+        """数据库中保存的下次执行时间（UTC），尚未初始化时为 None"""
+        value = self.db.get_config(self.NEXT_RUN_KEY)
+        if not value:
+            return None
+        return datetime.strptime(value, self.TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+    def tick(self, now: Optional[datetime] = None) -> Optional[int]:
+        """到达执行时间时添加爬取任务并返回任务ID，否则返回 None"""
+        now = now or datetime.now(timezone.utc)
+        current = self.db.get_config(self.NEXT_RUN_KEY)
+        if not current:
+            # 首次启动：等到下一次公告后再爬取（立即爬取可使用 crawl-now 接口）
+            self.db.compare_and_set_config(self.NEXT_RUN_KEY, None, self.next_run_after(now).strftime(self.TIME_FORMAT))
+            return None
+
+        due = datetime.strptime(current, self.TIME_FORMAT).replace(tzinfo=timezone.utc)
+        if now < due:
+            return None
+
+        # 先推进下次执行时间：只有更新成功的进程添加任务；错过的多个时间点合并为这一次
+        upcoming = self.next_run_after(now).strftime(self.TIME_FORMAT)
+        if not self.db.compare_and_set_config(self.NEXT_RUN_KEY, current, upcoming):
+            return None
+        job_id = self.job_service.enqueue_crawl()
+        print(f"定时爬取任务已添加（#{job_id}），下次执行时间: {upcoming} UTC")
+        return job_id
+
+    def run(self, stop_event):
+        """循环检查执行时间，直到 `stop_event` 被设置"""
+        while not stop_event.is_set():
+            try:
+                self.tick()
+                due = self.next_run()
+                wait = (due - datetime.now(timezone.utc)).total_seconds() if due else 0
+            except Exception as e:
+                print(f"定时爬取调度出错: {e}")
+                wait = Config.CRAWL_SCHEDULER_POLL_SECONDS
+            # 定期重新检查：其他进程可能已推进执行时间，系统时间也可能被调整
+            stop_event.wait(min(max(wait, 1), Config.CRAWL_SCHEDULER_POLL_SECONDS))
+
+
+def start_crawl_scheduler(job_service):
+    """在后台线程中运行调度器，返回 (停止用的 Event, 线程)"""
+    stop_event = threading.Event()
+    scheduler = CrawlScheduler(job_service)
+    t = threading.Thread(target=scheduler.run, args=(stop_event,), daemon=True)
+    t.start()
+    return stop_event, t
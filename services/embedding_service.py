@@ -0,0 +1,183 @@
+import re
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import Config
+from utils.database import DatabaseManager
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # 可选依赖，未安装时使用哈希 TF-IDF 向量
+    SentenceTransformer = None
+
+
+_WORD_RE = re.compile(r'[a-z][a-z0-9\-]+')
+_CJK_RE = re.compile(r'[一-鿿]+')
+_STOPWORDS = frozenset('''
+    a an and are as at be by for from has have in is it its of on or that the this to was were which with
+    we our us can via using based new show shows paper propose proposed approach method methods results
+'''.split())
+
+HASHED_TFIDF_MODEL = 'hashed-tfidf'
+
+
+class HashedTfidfEmbedder:
+    """离线可用的哈希 TF-IDF 向量
+
+    英文按单词和相邻词对、中文按相邻字对切分，用 crc32 哈希到固定维度（带符号以抵消冲突）。
+    `embed` 只返回 L2 归一化的词频向量，便于缓存；IDF 权重在打分时由当前候选集计算。
+    """
+
+    def __init__(self, dim: int = None):
+        self.dim = dim or Config.EMBEDDING_DIM
+        self.name = f'{HASHED_TFIDF_MODEL}-{self.dim}'
+
+    @staticmethod
+    def _tokens(text: str) -> List[str]:
+        text = (text or '').lower()
+        words = [w for w in _WORD_RE.findall(text) if w not in _STOPWORDS]
+        tokens = words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+        for run in _CJK_RE.findall(text):
+            tokens.extend(run[i:i + 2] for i in range(max(1, len(run) - 1)))
+        return tokens
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in self._tokens(text):
+                h = zlib.crc32(token.encode('utf-8'))
+                matrix[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        # 次线性词频，削弱高频词的影响
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        return _normalize(matrix)
+
+
+class SentenceTransformerEmbedder:
+    """基于 sentence-transformers 本地模型的向量（需要安装可选依赖）"""
+
+    def __init__(self, model_name: str):
+        self.model = SentenceTransformer(model_name)
+        self.name = model_name
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=64, show_progress_bar=False)
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def get_embedder():
+    """按配置返回向量模型：配置了 `EMBEDDING_MODEL` 且已安装 sentence-transformers 时使用本地模型"""
+    if Config.EMBEDDING_MODEL and SentenceTransformer is not None:
+        try:
+            return SentenceTransformerEmbedder(Config.EMBEDDING_MODEL)
+        except Exception as e:
+            print(f"加载向量模型 {Config.EMBEDDING_MODEL} 失败，改用哈希 TF-IDF: {e}")
+    return HashedTfidfEmbedder()
+
+
+class EmbeddingService:
+    """LLM评估前的向量预筛选
+
+    用用户兴趣、收藏总结和收藏论文构建兴趣向量，与待评估论文（标题+摘要）计算余弦相似度，
+    只把相似度最高的一部分论文交给LLM评估，其余论文直接标记为不推荐。
+    """
+
+    def __init__(self, db: DatabaseManager = None):
+        self.db = db or DatabaseManager()
+        self.embedder = get_embedder()
+
+    @staticmethod
+    def _paper_text(paper) -> str:
+        return f"{paper['title'] or ''}. {paper['abstract'] or ''}"
+
+    def embed_papers(self, papers) -> np.ndarray:
+        """返回论文向量矩阵，已保存的向量直接读取，其余计算后批量写入 `paper_embeddings`"""
+        ids = [paper['id'] for paper in papers]
+        stored = self.db.get_embeddings(ids, self.embedder.name)
+
+        missing = [paper for paper in papers if paper['id'] not in stored]
+        if missing:
+            vectors = self.embedder.embed([self._paper_text(paper) for paper in missing])
+            rows = []
+            for paper, vector in zip(missing, vectors):
+                stored[paper['id']] = vector.tobytes()
+                rows.append((paper['id'], self.embedder.name, stored[paper['id']]))
+            self.db.save_embeddings(rows)
+
+        return np.vstack([np.frombuffer(stored[paper_id], dtype=np.float32) for paper_id in ids])
+
+    def score_papers(self, papers) -> np.ndarray:
+        """返回每篇论文与用户兴趣向量的余弦相似度"""
+        user_interests = self.db.get_config('USER_INTERESTS', '')
+        favorite_summary = self.db.get_config('FAVORITE_SUMMARY', '')
+        favorites = [dict(row) for row in self.db.get_favorites(limit=Config.PREFILTER_MAX_FAVORITES)]
+
+        candidates = self.embed_papers(papers)
+        profile_texts = [text for text in (user_interests, favorite_summary) if text]
+        profile = self.embedder.embed(profile_texts) if profile_texts else np.zeros((0, candidates.shape[1]), dtype=np.float32)
+        if favorites:
+            # 收藏论文整体作为一个兴趣向量，避免数量多时淹没用户填写的兴趣点
+            favorite_vectors = self.embed_papers(favorites)
+            profile = np.vstack([profile, favorite_vectors.mean(axis=0, keepdims=True)])
+
+        if isinstance(self.embedder, HashedTfidfEmbedder):
+            # 以候选集为语料计算 IDF：所有论文都出现的词对区分度没有贡献
+            df = np.count_nonzero(candidates, axis=0)
+            idf = np.log((1 + len(papers)) / (1 + df)).astype(np.float32) + 1.0
+            candidates = _normalize(candidates * idf)
+            profile = _normalize(profile * idf)
+
+        # 每篇论文取与各兴趣向量相似度的最大值
+        return (candidates @ _normalize(profile).T).max(axis=1)
+
+    def prefilter_pending(self) -> Optional[Dict]:
+        """对尚未预筛选的待评估论文打分，淘汰相似度低的论文。
+
+        按ID顺序每次读取 `PREFILTER_BATCH_SIZE` 篇，逐批打分：保留每批中相似度排名前 `PREFILTER_TOP_FRACTION`
+        或相似度不低于 `PREFILTER_MIN_SCORE` 的论文，其余论文标记为已评估且不推荐（`evaluated_by = 'prefilter'`）。
+        不足 `PREFILTER_MIN_CANDIDATES` 篇的批次或用户兴趣为空时跳过；没有处理任何论文时返回 None，
+        否则返回 {'candidates', 'kept', 'rejected'}。
+        """
+        if not self.db.get_config('USER_INTERESTS', '') and not self.db.get_config('FAVORITE_SUMMARY', ''):
+            return None
+
+        batch_size = max(Config.PREFILTER_BATCH_SIZE, Config.PREFILTER_MIN_CANDIDATES)
+        totals = {'candidates': 0, 'kept': 0, 'rejected': 0}
+        after_id = 0
+        while True:
+            papers = self.db.get_unscored_pending_papers(after_id, batch_size)
+            if len(papers) < Config.PREFILTER_MIN_CANDIDATES:
+                break
+            after_id = papers[-1]['id']
+
+            scores = self.score_papers(papers)
+            keep_count = max(1, int(np.ceil(len(papers) * Config.PREFILTER_TOP_FRACTION)))
+            keep = scores >= Config.PREFILTER_MIN_SCORE
+            keep[np.argsort(-scores)[:keep_count]] = True
+
+            passed, rejected = [], []
+            for paper, score, kept in zip(papers, scores.tolist(), keep.tolist()):
+                score = round(score, 4)
+                if kept:
+                    passed.append((score, paper['id']))
+                else:
+                    rejected.append((score, f'向量预筛选未通过（相似度 {score:.2f}）', paper['id']))
+            self.db.apply_prefilter_results(passed, rejected)
+
+            totals['candidates'] += len(papers)
+            totals['kept'] += len(passed)
+            totals['rejected'] += len(rejected)
+            if len(papers) < batch_size:
+                break
+
+        if not totals['candidates']:
+            return None
+        print(f"向量预筛选：{totals['candidates']} 篇候选，保留 {totals['kept']} 篇交给LLM评估")
+        return totals
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+基于 asyncio 的论文评估引擎
+
+流水线：认领待评估论文 → 批量评估 → 写入数据库，阶段之间用有界队列连接，
+下游变慢时上游自动暂停。可以嵌入 Flask 进程（`Config.EVAL_ENGINE = 'async'` 时由
+`RecommendationService` 的后台评估使用），也可以作为独立进程运行：
+
+    python -m services.evaluation_engine --concurrency 8
+    python -m services.evaluation_engine --watch 60   # 持续运行，无待评估论文时每 60 秒检查一次
+
+收到 SIGINT/SIGTERM 后不再认领新论文，处理完已认领的论文后退出；再次收到信号时立即取消。
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, Optional
+
+if __name__ == '__main__':
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.llm_service import AsyncLLMService
+from utils.database import DatabaseManager
+from utils.http_client import httpx
+from utils.rate_limiter import AdaptiveBackoff
+from utils.status_hub import status_hub
+
+# 队列结束标记：上游阶段结束后向下游的每个协程发送一个
+_DONE = object()
+
+
+def async_engine_available() -> bool:
+    """是否安装了异步引擎依赖的 httpx"""
+    return httpx is not None
+
+
+class AsyncEvaluationEngine:
+    """asyncio 评估流水线
+
+    - 认领：一个生产者按 `batch_size` 认领待评估论文（认领租约保证不与其他进程重复），放入评估队列；
+    - 评估：`concurrency` 个协程各自发起批量评估请求，结果进入写入队列；
+    - 写入：一个协程把已到达的结果合并到一个事务中写入（SQLite 只有一个写入者）。
+
+    `stop()`（可在其他线程调用）后生产者停止认领，已认领的论文继续处理直到写入；
+    超过 `Config.EVAL_DRAIN_TIMEOUT` 秒或任务被取消时，尚未写入的论文释放认领，由下一轮重新评估。
+    LLM 服务连续 `Config.EVAL_MAX_UNAVAILABLE` 次不可用时同样停止认领，已认领的论文不再请求、直接释放。
+    统计字段与 `RecommendationService.evaluation_stats` 相同，可传入共享的 `stats` 字典及其锁。
+    """
+
+    def __init__(self, db: DatabaseManager = None, concurrency: int = None, batch_size: int = None,
+                 delay: float = 0.0, idle_wait: Optional[float] = None, backoff: AdaptiveBackoff = None,
+                 stats: Dict = None, stats_lock=None, latencies: deque = None):
+        self.db = db or DatabaseManager()
+        self.concurrency = max(1, concurrency or Config.EVAL_MAX_WORKERS)
+        self.batch_size = max(1, batch_size or Config.EVAL_PROMPT_BATCH_SIZE)
+        self.delay = delay
+        # 为 None 时没有待评估论文即结束；否则每隔 idle_wait 秒重新检查，直到 stop()
+        self.idle_wait = idle_wait
+        self.backoff = backoff or AdaptiveBackoff(Config.EVAL_BACKOFF_BASE, Config.EVAL_BACKOFF_MAX)
+        self.stats = stats if stats is not None else {
+            'max_workers': self.concurrency, 'in_flight': 0, 'evaluated': 0, 'failed': 0, 'throttled': 0, 'prefiltered': 0
+        }
+        self.stats_lock = stats_lock or threading.Lock()
+        self.latencies = latencies if latencies is not None else deque(maxlen=200)
+        self.worker_id = f'{socket.gethostname()}-{os.getpid()}-async-{uuid.uuid4().hex[:8]}'
+
+        self.llm = None
+        self._loop = None
+        self._stop = None
+        self._stop_requested = False
+        # LLM 服务连续不可用时置位，本轮不再发起请求
+        self._unavailable = False
+        # 已认领、尚未写入结果的论文 {paper_id: paper}
+        self._claimed: Dict[int, Dict] = {}
+
+    @property
+    def stop_requested(self) -> bool:
+        """是否已调用 `stop()`"""
+        return self._stop_requested
+
+    def stop(self):
+        """请求停止（线程安全）：不再认领新论文，处理完已认领的论文后结束"""
+        self._stop_requested = True
+        loop, stop = self._loop, self._stop
+        if loop is not None and stop is not None:
+            try:
+                loop.call_soon_threadsafe(stop.set)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+
+    async def run(self) -> Dict:
+        """运行一轮评估，返回统计信息"""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        if self._stop_requested:
+            self._stop.set()
+
+        self.llm = AsyncLLMService(max_connections=self.concurrency)
+        if not self.llm.api_key:
+            await self.llm.aclose()
+            print("LLM 未配置，跳过异步评估")
+            return self.snapshot()
+
+        pipeline = asyncio.ensure_future(self._pipeline())
+        stop_wait = asyncio.ensure_future(self._stop.wait())
+        try:
+            await asyncio.wait({pipeline, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+            if pipeline.done():
+                await pipeline
+            else:
+                print(f"评估引擎收到停止请求，等待 {len(self._claimed)} 篇已认领论文完成")
+                try:
+                    # 超时后 wait_for 会取消流水线
+                    await asyncio.wait_for(pipeline, Config.EVAL_DRAIN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    print("等待超时，已取消剩余评估")
+        finally:
+            stop_wait.cancel()
+            if not pipeline.done():
+                pipeline.cancel()
+                await asyncio.gather(pipeline, return_exceptions=True)
+            await self._release_unfinished()
+            await self.llm.aclose()
+        return self.snapshot()
+
+    async def _pipeline(self):
+        size = max(1, Config.EVAL_ASYNC_QUEUE_SIZE)
+        claimed = asyncio.Queue(maxsize=size)
+        to_persist = asyncio.Queue(maxsize=size * self.batch_size)
+
+        stages = [
+            self._stage(1, lambda: self._produce(claimed), claimed, self.concurrency),
+            self._stage(self.concurrency, lambda: self._evaluate(claimed, to_persist), to_persist, 1),
+            self._persist(to_persist),
+        ]
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # 任一阶段出错或流水线被取消时，其余阶段不能继续阻塞在队列上
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _stage(count: int, worker, outbox: asyncio.Queue, receivers: int):
+        """运行 `count` 个协程，全部结束后向下游的 `receivers` 个协程各发送一个结束标记"""
+        await asyncio.gather(*(worker() for _ in range(count)))
+        for _ in range(receivers):
+            await outbox.put(_DONE)
+
+    async def _produce(self, outbox: asyncio.Queue):
+        while not self._stop.is_set():
+            papers = await asyncio.to_thread(
+                self.db.claim_papers_for_evaluation, self.worker_id, self.batch_size, Config.EVAL_CLAIM_LEASE_SECONDS
+            )
+            if not papers:
+                if self._claimed:
+                    # 在途论文被限流时会释放认领，等它们完成后再确认是否还有待评估论文
+                    await asyncio.sleep(0.5)
+                    continue
+                if self.idle_wait is None:
+                    break
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.idle_wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            papers = [dict(row) for row in papers]
+            for paper in papers:
+                self._claimed[paper['id']] = paper
+            await outbox.put(papers)
+
+    async def _evaluate(self, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        while True:
+            papers = await inbox.get()
+            if papers is _DONE:
+                return
+            if self._unavailable:
+                # LLM 服务不可用，本轮不再请求：论文留在已认领列表中，结束时释放（不计入尝试次数）
+                continue
+
+            # 每批重新读取兴趣配置（--watch 模式下可能长时间运行）
+            user_interests, favorite_summary = await asyncio.to_thread(self._load_profile)
+            await self._backoff_wait()
+            started = time.monotonic()
+            self._count(in_flight=len(papers))
+            try:
+                results = await self.llm.evaluate_papers_batch_async(papers, user_interests, favorite_summary)
+            except Exception as e:
+                self._count(in_flight=-len(papers), failed=len(papers))
+                ids = [paper['id'] for paper in papers]
+                if self._record_error(e):
+                    # 被限流或服务不可用（连接失败、超时、鉴权失败等）的论文立即释放（不计入尝试次数），
+                    # 退避结束后重新认领；连续不可用达到上限时停止本轮评估
+                    await asyncio.to_thread(self.db.release_paper_claims, ids)
+                    if self.backoff.unavailable_streak >= Config.EVAL_MAX_UNAVAILABLE and not self._unavailable:
+                        self._unavailable = True
+                        print(f"LLM 服务连续 {self.backoff.unavailable_streak} 次不可用，停止本轮评估")
+                        self._stop.set()
+                else:
+                    # 其余失败（与具体论文有关，如响应无法解析）的论文保留认领，租约到期后再评估，
+                    # 避免反复请求同一批出错的论文；尝试次数用尽的论文标记为评估失败
+                    await asyncio.to_thread(self.db.fail_paper_claims, ids)
+                for paper in papers:
+                    self._claimed.pop(paper['id'], None)
+                    print(f"评估论文 ID={paper['id']} 时出错: {e}")
+                continue
+
+            self.backoff.success()
+            with self.stats_lock:
+                self.latencies.append(time.monotonic() - started)
+
+            for paper in papers:
+                result = results.get(paper['arxiv_id'], {})
+                await outbox.put((paper, bool(result.get('is_recommended', False)), result.get('reason', '')))
+
+            if self.delay and self.delay > 0:
+                await asyncio.sleep(self.delay)
+
+    async def _persist(self, inbox: asyncio.Queue):
+        done = False
+        while not done:
+            items = [await inbox.get()]
+            # 合并已经到达的结果，一个事务写入
+            while len(items) < 100 and not inbox.empty():
+                items.append(inbox.get_nowait())
+            if items[-1] is _DONE:
+                done = True
+                items.pop()
+            if not items:
+                continue
+
+            rows = [(is_recommended, reason, paper['id']) for paper, is_recommended, reason in items]
+            try:
+                await asyncio.to_thread(self.db.save_evaluation_results, rows)
+            except Exception as e:
+                self._count(in_flight=-len(items), failed=len(items))
+                print(f"保存 {len(items)} 篇论文的评估结果时出错: {e}")
+                continue
+            for paper, *_ in items:
+                self._claimed.pop(paper['id'], None)
+            self._count(in_flight=-len(items), evaluated=len(items))
+            await asyncio.to_thread(status_hub.refresh)
+
+    def _load_profile(self):
+        return self.db.get_config('USER_INTERESTS', ''), self.db.get_config('FAVORITE_SUMMARY', '')
+
+    async def _backoff_wait(self):
+        wait_time = self.backoff.remaining()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+    def _record_error(self, error: Exception) -> bool:
+        if not self.backoff.record_error(error):
+            return False
+        self._count(throttled=1)
+        return True
+
+    async def _release_unfinished(self):
+        if not self._claimed:
+            return
+        ids = list(self._claimed)
+        self._claimed.clear()
+        try:
+            await asyncio.to_thread(self.db.release_paper_claims, ids)
+            print(f"已释放 {len(ids)} 篇未完成评估的论文")
+        except Exception as e:
+            print(f"释放评估认领时出错: {e}")
+
+    def _count(self, **deltas):
+        with self.stats_lock:
+            for key, delta in deltas.items():
+                self.stats[key] += delta
+
+    def snapshot(self) -> Dict:
+        """返回当前统计信息的副本"""
+        with self.stats_lock:
+            return dict(self.stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='异步评估待评估论文')
+    parser.add_argument('--concurrency', type=int, default=Config.EVAL_MAX_WORKERS, help='同时进行的LLM请求数')
+    parser.add_argument('--batch-size', type=int, default=Config.EVAL_PROMPT_BATCH_SIZE, help='每次LLM请求评估的论文数量')
+    parser.add_argument('--watch', type=float, metavar='SECONDS',
+                        help='持续运行：没有待评估论文时每隔 SECONDS 秒重新检查')
+    args = parser.parse_args()
+
+    if not async_engine_available():
+        print("❌ 异步评估引擎需要安装 httpx")
+        return False
+
+    db = DatabaseManager()
+    engine = AsyncEvaluationEngine(db, concurrency=args.concurrency, batch_size=args.batch_size, idle_wait=args.watch)
+
+    if Config.PREFILTER_ENABLED:
+        from services.embedding_service import EmbeddingService
+        try:
+            EmbeddingService(db).prefilter_pending()
+        except Exception as e:
+            print(f"向量预筛选时出错: {e}")
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+
+        def on_signal():
+            # 第一次信号：停止认领并等待在途论文完成；第二次：立即取消
+            if engine.stop_requested:
+                task.cancel()
+            else:
+                print("收到停止信号，处理完已认领的论文后退出（再次发送信号立即退出）")
+                engine.stop()
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, on_signal)
+        return await engine.run()
+
+    started = time.monotonic()
+    try:
+        stats = asyncio.run(run())
+    except asyncio.CancelledError:
+        stats = engine.snapshot()
+    elapsed = time.monotonic() - started
+    print(f"评估完成：{stats['evaluated']} 篇成功，{stats['failed']} 篇失败，"
+          f"{stats['throttled']} 次限流，耗时 {elapsed:.1f}s")
+    return stats['failed'] == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
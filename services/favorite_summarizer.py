@@ -0,0 +1,124 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+from services.llm_service import LLMService
+from utils.database import DatabaseManager
+from utils.prompt_budget import chunk_by_tokens
+
+
+class FavoriteSummarizer:
+    """收藏论文的分层（map-reduce）总结
+
+    未总结的收藏按 `Config.LLM_SUMMARY_CHUNK_TOKEN_BUDGET` 分组，各组并发总结（map），
+    得到的分组总结按 token 预算与 `Config.LLM_SUMMARY_MERGE_FANIN` 逐层并发合并成一棵树（reduce），
+    最后把树顶的总结与已有总结合并为新的兴趣总结。论文只有一组时仍是一次请求。
+
+    每个分组/合并节点完成后立即写入 summary_checkpoints 表，键为输入内容的哈希：
+    中途失败重试时（如后台任务重试）已完成的节点直接读取，不会重复请求LLM。
+    收藏按ID排序后分组，重试前新增的收藏只影响最后一组。
+    """
+
+    def __init__(self, llm_service: LLMService, db: DatabaseManager = None, max_workers: Optional[int] = None):
+        self.llm_service = llm_service
+        self.db = db or llm_service.db
+        self.max_workers = max_workers or Config.LLM_SUMMARY_MAX_WORKERS
+
+    def summarize(self, papers: List[Dict], current_summary: str = '') -> Tuple[str, List[str]]:
+        """返回 (新总结, 本次用到的检查点键)；`papers` 为带 id、title、abstract 的收藏论文"""
+        summaries, keys = self._reduce(papers)
+        if summaries is None:
+            return self.llm_service.summarize_favorites(papers, current_summary), keys
+        return self.llm_service.merge_summaries(summaries, current_summary), keys
+
+    def summarize_stream(self, papers: List[Dict], current_summary: str = '',
+                         keys: Optional[List[str]] = None) -> Iterator[str]:
+        """`summarize` 的流式版本：分组与合并阶段不流式，逐段产生最终总结；用到的检查点键追加到 `keys`"""
+        summaries, used = self._reduce(papers)
+        if keys is not None:
+            keys.extend(used)
+        if summaries is None:
+            yield from self.llm_service.summarize_favorites_stream(papers, current_summary)
+        else:
+            yield from self.llm_service.merge_summaries_stream(summaries, current_summary)
+
+    def _reduce(self, papers: List[Dict]) -> Tuple[Optional[List[str]], List[str]]:
+        """执行 map 与逐层合并，返回 (树顶的若干份总结, 检查点键)；只有一组论文时返回 (None, [])"""
+        budget = Config.LLM_SUMMARY_CHUNK_TOKEN_BUDGET
+        groups = chunk_by_tokens([LLMService.summary_entry(paper) for paper in papers], budget)
+        if len(groups) <= 1:
+            return None, []
+
+        print(f"收藏论文较多（{len(papers)} 篇），分 {len(groups)} 组并发总结后逐层合并")
+        nodes = []
+        for group in groups:
+            chunk = [papers[i] for i in group]
+            key = self._key('map', [str(paper['id']) for paper in chunk])
+            nodes.append((key, lambda chunk=chunk: self.llm_service.summarize_favorites(chunk)))
+        done = self._run_level(nodes)
+        keys = [key for key, _ in nodes]
+        used = list(keys)
+
+        while True:
+            texts = [done[key] for key in keys]
+            groups = self._merge_groups(texts, budget)
+            if len(groups) == 1 or len(groups) == len(keys):
+                # 已经可以一次合并，或每份总结都超出预算、无法继续合并
+                return texts, used
+            nodes, next_keys = [], []
+            for group in groups:
+                children = [keys[i] for i in group]
+                if len(children) == 1:
+                    next_keys.append(children[0])
+                    continue
+                key = self._key('merge', children)
+                child_texts = [done[child] for child in children]
+                nodes.append((key, lambda child_texts=child_texts: self.llm_service.merge_summaries(child_texts)))
+                next_keys.append(key)
+            done.update(self._run_level(nodes))
+            used.extend(key for key, _ in nodes)
+            keys = next_keys
+
+    @staticmethod
+    def _merge_groups(texts: List[str], budget: int) -> List[List[int]]:
+        # 按 token 预算分组，每组再按合并扇入切分，使合并树保持平衡
+        fanin = max(2, Config.LLM_SUMMARY_MERGE_FANIN)
+        return [
+            group[start:start + fanin]
+            for group in chunk_by_tokens(texts, budget)
+            for start in range(0, len(group), fanin)
+        ]
+
+    def _run_level(self, nodes: List[Tuple[str, Callable[[], str]]]) -> Dict[str, str]:
+        """并发执行一层节点，返回 {key: summary}；已有检查点的节点直接读取。
+
+        每个节点完成后立即保存检查点；有节点失败时等其余节点结束（保存各自的检查点）后抛出第一个异常。
+        """
+        results = self.db.get_summary_checkpoints([key for key, _ in nodes])
+        if results:
+            print(f"从检查点恢复 {len(results)}/{len(nodes)} 个总结")
+        pending = [(key, run) for key, run in nodes if key not in results]
+        if not pending:
+            return results
+
+        def run_node(key, run):
+            summary = run()
+            self.db.save_summary_checkpoint(key, summary)
+            return summary
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+            futures = {executor.submit(run_node, key, run): key for key, run in pending}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    errors.append(e)
+        if errors:
+            raise errors[0]
+        return results
+
+    @staticmethod
+    def _key(kind: str, parts: List[str]) -> str:
+        return hashlib.sha256(f'{kind}:{",".join(parts)}'.encode('utf-8')).hexdigest()
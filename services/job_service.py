@@ -0,0 +1,197 @@
+import json
+import os
+import socket
+import threading
+import traceback
+import uuid
+from typing import Dict, Iterable, Optional
+
+from config import Config
+from utils.database import DatabaseManager
+from utils.status_hub import status_hub
+
+
+class JobService:
+    """基于 jobs 表的后台任务队列
+
+    Web 进程通过 `enqueue()` 添加任务并立即返回任务ID；worker（`worker.py` 的独立进程，
+    或 `Config.EMBEDDED_WORKER` 开启时 Flask 进程内的线程）通过 `run_worker()` 领取并执行任务。
+    任务按租约领取：执行期间定期续约，worker 崩溃后租约过期的任务会被其他 worker 重新领取；
+    失败的任务按指数退避重试，最多执行 `max_attempts` 次。
+    """
+
+    JOB_TYPES = ('crawl', 'evaluate', 'translate', 'summarize')
+
+    # 默认优先级（数值越大越先执行）：用户等待结果的任务优先
+    DEFAULT_PRIORITIES = {
+        'summarize': 20,
+        'translate': 10,
+        'evaluate': 0,
+        'crawl': 0,
+    }
+
+    def __init__(self, db: DatabaseManager = None, arxiv_service=None, recommendation_service=None):
+        self.db = db or DatabaseManager()
+        # 执行任务所需的服务未传入时在首次使用时创建（避免只入队的进程加载爬虫/LLM 服务）
+        self._arxiv_service = arxiv_service
+        self._recommendation_service = recommendation_service
+
+    def enqueue(self, job_type: str, payload: Dict = None, priority: Optional[int] = None,
+                dedupe_key: Optional[str] = None, delay_seconds: int = 0) -> int:
+        """添加任务并返回任务ID；`dedupe_key` 相同的任务在排队中时合并为一个"""
+        if job_type not in self.JOB_TYPES:
+            raise ValueError(f'不支持的任务类型: {job_type}')
+        if priority is None:
+            priority = self.DEFAULT_PRIORITIES.get(job_type, 0)
+        return self.db.enqueue_job(job_type, payload, priority, Config.JOB_MAX_ATTEMPTS, dedupe_key, delay_seconds)
+
+    def enqueue_crawl(self, categories=None, start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
+        """添加爬取任务；相同参数的爬取任务（包括定时爬取与手动触发的增量爬取）在排队中时合并为一个"""
+        payload = {'categories': categories, 'start_date': start_date, 'end_date': end_date}
+        return self.enqueue('crawl', payload, dedupe_key='crawl:' + json.dumps(payload, sort_keys=True))
+
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        row = self.db.get_job(job_id)
+        return self._to_dict(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50):
+        return [self._to_dict(row) for row in self.db.list_jobs(status, limit)]
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        job = dict(row)
+        for key in ('payload', 'result'):
+            if job.get(key):
+                try:
+                    job[key] = json.loads(job[key])
+                except ValueError:
+                    pass
+        return job
+
+    # === 任务执行 ===
+
+    @property
+    def arxiv_service(self):
+        if self._arxiv_service is None:
+            from services.arxiv_service import ArxivService
+            self._arxiv_service = ArxivService()
+        return self._arxiv_service
+
+    @property
+    def recommendation_service(self):
+        if self._recommendation_service is None:
+            from services.recommendation_service import RecommendationService
+            self._recommendation_service = RecommendationService()
+        return self._recommendation_service
+
+    def execute(self, job: Dict):
+        """执行一个任务并返回结果（可 JSON 序列化），失败时抛出异常"""
+        payload = job.get('payload') or {}
+        job_type = job['type']
+        if job_type == 'crawl':
+            evaluate_job_id = None
+            try:
+                count = self.arxiv_service.crawl_recent_papers(
+                    force_categories=payload.get('categories'),
+                    start_date=payload.get('start_date'),
+                    end_date=payload.get('end_date')
+                )
+            finally:
+                # 新论文入库后立即评估，用户打开页面前推荐队列已准备好；
+                # 爬取未完成（抛出异常、任务稍后重试）时已保存的论文同样评估
+                if any(item['saved'] for item in self.arxiv_service.last_crawl_report):
+                    evaluate_job_id = self.enqueue('evaluate', dedupe_key='evaluate')
+            result = {'count': count, 'shards': self.arxiv_service.last_crawl_report}
+            if evaluate_job_id:
+                result['evaluate_job_id'] = evaluate_job_id
+            return result
+        if job_type == 'evaluate':
+            service = self.recommendation_service
+            service.evaluate_pending_papers()
+            return {'evaluated': service.last_evaluated_count, 'stats': service.get_evaluation_stats()}
+        if job_type == 'translate':
+            count = self.recommendation_service.translate_papers(payload.get('paper_ids'))
+            return {'translated': count}
+        if job_type == 'summarize':
+            self.recommendation_service._trigger_incremental_summary()
+            return {'summary': self.db.get_config('FAVORITE_SUMMARY', '')}
+        raise ValueError(f'不支持的任务类型: {job_type}')
+
+    def run_worker(self, stop_event, worker_id: Optional[str] = None, job_types: Optional[Iterable[str]] = None):
+        """循环领取并执行任务，直到 `stop_event`（threading.Event 或 multiprocessing.Event）被设置。
+
+        停止时不会中断正在执行的任务，任务完成后退出。
+        """
+        worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        job_types = list(job_types) if job_types else None
+        threading.Thread(target=self._stop_watcher, args=(stop_event,), daemon=True).start()
+        while not stop_event.is_set():
+            try:
+                row = self.db.claim_job(worker_id, Config.JOB_LEASE_SECONDS, job_types)
+            except Exception as e:
+                print(f"领取任务时出错: {e}")
+                row = None
+            if row is None:
+                stop_event.wait(Config.JOB_POLL_INTERVAL)
+                continue
+            try:
+                self._run_claimed(self._to_dict(row), worker_id)
+            except Exception as e:
+                # 记录任务结果失败（如数据库繁忙）时任务保持运行中，租约过期后重新领取；worker 线程继续运行
+                traceback.print_exc()
+                print(f"[{worker_id}] 记录任务 #{row['id']} 结果时出错: {e}")
+                stop_event.wait(Config.JOB_POLL_INTERVAL)
+
+    def _stop_watcher(self, stop_event):
+        # 停止时让正在执行的评估任务收尾（asyncio 引擎停止认领，处理完已认领的论文后返回）
+        stop_event.wait()
+        if self._recommendation_service is not None:
+            self._recommendation_service.stop_background_evaluation(timeout=0)
+
+    def _run_claimed(self, job: Dict, worker_id: str):
+        print(f"[{worker_id}] 开始执行任务 #{job['id']}（{job['type']}，第 {job['attempts']} 次）")
+        done = threading.Event()
+
+        def renew_lease():
+            # 长时间运行的任务（爬取、评估）定期续约，避免被其他 worker 重复领取
+            while not done.wait(Config.JOB_LEASE_SECONDS / 3):
+                try:
+                    self.db.extend_job_lease(job['id'], worker_id, Config.JOB_LEASE_SECONDS)
+                except Exception as e:
+                    print(f"任务 #{job['id']} 续约失败: {e}")
+
+        renewer = threading.Thread(target=renew_lease, daemon=True)
+        renewer.start()
+        # 评估中/爬取中状态来自 jobs 表，任务开始与结束时通知本进程的 SSE 连接
+        self._refresh_status()
+        try:
+            result = self.execute(job)
+        except Exception as e:
+            traceback.print_exc()
+            delay = Config.JOB_RETRY_BASE_SECONDS * 2 ** (job['attempts'] - 1)
+            self.db.fail_job(job['id'], worker_id, str(e), delay)
+            print(f"[{worker_id}] 任务 #{job['id']} 失败: {e}")
+            self._refresh_status()
+            return
+        finally:
+            done.set()
+            renewer.join()
+        self.db.complete_job(job['id'], worker_id, result)
+        print(f"[{worker_id}] 任务 #{job['id']} 完成")
+        self._refresh_status()
+
+    @staticmethod
+    def _refresh_status():
+        try:
+            status_hub.refresh()
+        except Exception as e:
+            print(f"刷新任务状态时出错: {e}")
+
+
+def start_embedded_worker(job_service: JobService, job_types: Optional[Iterable[str]] = None):
+    """在当前进程中启动一个任务线程（单进程部署时使用），返回 (停止用的 Event, 线程)"""
+    stop_event = threading.Event()
+    worker_id = f'{socket.gethostname()}-{os.getpid()}-embedded'
+    t = threading.Thread(target=job_service.run_worker, args=(stop_event, worker_id, job_types), daemon=True)
+    t.start()
+    return stop_event, t
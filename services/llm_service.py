@@ -1,8 +1,13 @@
-import requests
+import asyncio
 import json
-from typing import Optional, Dict, Any
+import re
+from functools import lru_cache
+from typing import Optional, Dict, Any, Callable, Iterator, List
 from config import Config
 from utils.database import DatabaseManager
+from utils.llm_cache import LLMCache
+from utils.http_client import create_async_client, get_session
+from utils.prompt_budget import chunk_by_tokens, compact, estimate_tokens, truncate_to_tokens
 
 class LLMService:
     """LLM服务类"""
@@ -10,6 +15,9 @@ class LLMService:
     def __init__(self):
         self.config = Config()
         self.db = DatabaseManager()
+        self.cache = LLMCache(self.db)
+        # 复用连接的HTTP会话，连接池大小与评估并发数一致
+        self.session = get_session('llm', pool_size=self.config.EVAL_MAX_WORKERS)
         self._load_config()
     
     def _load_config(self):
@@ -42,7 +50,7 @@ class LLMService:
                 'max_tokens': 10
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f'{self.base_url}/chat/completions',
                 headers=headers,
                 json=data,
@@ -69,17 +77,38 @@ class LLMService:
         请直接返回精炼后的兴趣点描述：
         """
         
-        return self._call_llm(prompt)
+        return self._call_llm(prompt, purpose='refine_interests')
     
     def summarize_favorites(self, papers_data: list, current_summary: str = "") -> str:
-        """增量总结收藏论文"""
+        """增量总结收藏论文（一次请求；论文较多时由 `FavoriteSummarizer` 分组调用）"""
         if not papers_data:
             return current_summary
-            
-        papers_text = "\n".join([
-            f"论文{i+1}: {paper.get('title', '')}\n摘要: {paper.get('abstract', '')[:200]}..."
-            for i, paper in enumerate(papers_data)
-        ])
+        return self._call_llm(self._summary_prompt(papers_data, current_summary), purpose='summarize')
+
+    def summarize_favorites_stream(self, papers_data: list, current_summary: str = "") -> Iterator[str]:
+        """`summarize_favorites` 的流式版本，逐段产生总结文本"""
+        if not papers_data:
+            yield current_summary
+            return
+        yield from self._stream_llm(self._summary_prompt(papers_data, current_summary), purpose='summarize')
+
+    def merge_summaries(self, summaries: List[str], current_summary: str = "") -> str:
+        """把多份分组总结（以及已有总结）合并为一份兴趣总结"""
+        return self._call_llm(self._merge_summary_prompt(summaries, current_summary), purpose='summarize')
+
+    def merge_summaries_stream(self, summaries: List[str], current_summary: str = "") -> Iterator[str]:
+        """`merge_summaries` 的流式版本"""
+        yield from self._stream_llm(self._merge_summary_prompt(summaries, current_summary), purpose='summarize')
+
+    @staticmethod
+    def summary_entry(paper: Dict) -> str:
+        """总结提示词中一篇论文的文本（标题与按预算截断的摘要），分组时按它估算 token 数"""
+        abstract = truncate_to_tokens(paper.get('abstract', ''), Config.LLM_SUMMARY_ABSTRACT_TOKEN_BUDGET)
+        return f"{compact(paper.get('title', ''))}\n摘要: {abstract}"
+
+    @classmethod
+    def _summary_prompt(cls, papers_data: list, current_summary: str) -> str:
+        papers_text = "\n".join([f"论文{i+1}: {cls.summary_entry(paper)}" for i, paper in enumerate(papers_data)])
         
         if current_summary:
             prompt = f"""
@@ -115,25 +144,68 @@ class LLMService:
             
             请直接返回兴趣总结：
             """
-        
-        return self._call_llm(prompt)
+        return prompt
+    
+    @staticmethod
+    def _merge_summary_prompt(summaries: List[str], current_summary: str) -> str:
+        summaries_text = "\n\n".join([f"第{i+1}组: {summary}" for i, summary in enumerate(summaries)])
+        current = f"""
+            当前兴趣总结：
+            {current_summary}
+            """ if current_summary else ''
+        return f"""
+            以下是根据用户不同批次的收藏论文分别总结出的研究兴趣，请将它们合并为一份完整的用户兴趣总结：
+            {current}
+            各批次收藏论文的兴趣总结：
+            {summaries_text}
+            
+            要求：
+            1. 保持总结的专业性和准确性
+            2. 突出用户的核心研究兴趣，合并重复的方向
+            3. 保留各批次中体现的不同研究方向
+            4. 字数控制在150-250字之间
+            
+            请直接返回合并后的兴趣总结：
+            """
     
     def evaluate_paper(self, paper_data: Dict, user_interests: str, favorite_summary: str) -> Dict[str, Any]:
         """评估论文推荐价值，返回推荐结果和理由"""
+        response = self._call_llm(self._evaluation_prompt(paper_data, user_interests, favorite_summary),
+                                  purpose='evaluate', validate=self._is_valid_evaluation)
+        return self._parse_evaluation(response)
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _interest_preamble(user_interests: str, favorite_summary: str) -> str:
+        """评估提示词中的用户兴趣部分（不随论文变化）
+
+        兴趣点与收藏总结按 token 预算压缩；结果按参数缓存，一轮评估中只构建一次。
+        """
+        interests = truncate_to_tokens(user_interests, Config.LLM_INTERESTS_TOKEN_BUDGET)
+        summary = truncate_to_tokens(favorite_summary, Config.LLM_FAVORITE_SUMMARY_TOKEN_BUDGET)
+        return f"""用户初始兴趣点：
+        {interests}
+        
+        用户收藏论文总结出的兴趣：
+        {summary}"""
+
+    @staticmethod
+    def _paper_abstract(paper: Dict) -> str:
+        """评估用的摘要：合并空白，超出 `Config.LLM_ABSTRACT_TOKEN_BUDGET` 时按句截断"""
+        return truncate_to_tokens(paper.get('abstract', ''), Config.LLM_ABSTRACT_TOKEN_BUDGET)
+
+    @classmethod
+    def _evaluation_prompt(cls, paper_data: Dict, user_interests: str, favorite_summary: str) -> str:
         paper_info = f"""
-        标题: {paper_data.get('title', '')}
-        摘要: {paper_data.get('abstract', '')}
-        分类: {', '.join(json.loads(paper_data.get('categories', '[]')))}
+        标题: {compact(paper_data.get('title', ''))}
+        摘要: {cls._paper_abstract(paper_data)}
+        分类: {', '.join(json.loads(paper_data.get('categories') or '[]'))}
         """
         
-        prompt = f"""
+        return f"""
         你是一个专业的学术论文推荐助手。请根据以下信息判断这篇论文是否值得推荐给用户，并给出简短的推荐理由。
         
-        用户初始兴趣点：
-        {user_interests}
-        
-        用户收藏论文总结出的兴趣：
-        {favorite_summary}
+        {cls._interest_preamble(user_interests, favorite_summary)}
         
         待评估论文信息：
         {paper_info}
@@ -144,9 +216,24 @@ class LLMService:
             "reason": "简短的推荐或不推荐理由（不超过50字）"
         }}
         """
-        
-        response = self._call_llm(prompt)
-        
+
+    @staticmethod
+    def _load_json_object(response: str) -> Optional[Dict]:
+        """把LLM响应（可能带 Markdown 代码块标记）解析为JSON对象，失败时返回 None"""
+        try:
+            result = json.loads(response.replace('```json', '').replace('```', '').strip())
+        except Exception:
+            return None
+        return result if isinstance(result, dict) else None
+
+    @classmethod
+    def _is_valid_evaluation(cls, response: str) -> bool:
+        """单篇评估响应能否解析（只有能解析的响应才写入缓存）"""
+        result = cls._load_json_object(response)
+        return result is not None and 'is_recommended' in result
+
+    @staticmethod
+    def _parse_evaluation(response: str) -> Dict[str, Any]:
         try:
             # 清理可能的Markdown代码块标记
             response = response.replace('```json', '').replace('```', '').strip()
@@ -162,9 +249,203 @@ class LLMService:
                 'reason': '评估失败'
             }
     
+    def evaluate_papers_batch(self, papers: List[Dict], user_interests: str, favorite_summary: str) -> Dict[str, Dict[str, Any]]:
+        """在一次请求中评估多篇论文，返回 {arxiv_id: {'is_recommended', 'reason'}}。
+
+        用户兴趣与收藏总结只在提示词中出现一次；解析失败或缺失的条目会回退到
+        `evaluate_paper` 单篇评估。请求本身失败（如 429/5xx）时直接抛出异常。
+        """
+        if not papers:
+            return {}
+        if len(papers) == 1:
+            paper = papers[0]
+            return {paper['arxiv_id']: self.evaluate_paper(paper, user_interests, favorite_summary)}
+
+        response = self._call_llm(self._batch_evaluation_prompt(papers, user_interests, favorite_summary),
+                                  max_tokens=self._batch_max_tokens(papers), purpose='evaluate',
+                                  validate=self._batch_validator(papers, self._parse_batch_evaluation))
+        results = self._parse_batch_evaluation(response)
+
+        # 解析失败或缺失的论文回退到单篇评估
+        evaluated = {}
+        for paper in papers:
+            arxiv_id = paper['arxiv_id']
+            if arxiv_id in results:
+                evaluated[arxiv_id] = results[arxiv_id]
+            else:
+                print(f"批量评估结果中缺少论文 {arxiv_id}，回退到单篇评估")
+                evaluated[arxiv_id] = self.evaluate_paper(paper, user_interests, favorite_summary)
+        return evaluated
+
+    @staticmethod
+    def _batch_validator(papers: List[Dict], parse: Callable[[str], Dict]) -> Callable[[str], bool]:
+        """批量响应的校验函数：每篇论文都能从响应中解析出结果时才写入缓存
+        （缺失的论文会回退到单篇请求，不完整的批量响应缓存后每次都会重复回退）"""
+        arxiv_ids = {paper['arxiv_id'] for paper in papers}
+        return lambda response: arxiv_ids <= set(parse(response))
+
+    @staticmethod
+    def _batch_max_tokens(papers: List[Dict]) -> int:
+        return 100 + 120 * len(papers)
+
+    @classmethod
+    def _batch_evaluation_prompt(cls, papers: List[Dict], user_interests: str, favorite_summary: str) -> str:
+        papers_info = "\n".join([
+            f"""
+        [{i + 1}] arxiv_id: {paper['arxiv_id']}
+        标题: {compact(paper.get('title', ''))}
+        摘要: {cls._paper_abstract(paper)}
+        分类: {', '.join(json.loads(paper.get('categories') or '[]'))}"""
+            for i, paper in enumerate(papers)
+        ])
+
+        return f"""
+        你是一个专业的学术论文推荐助手。请根据以下信息逐篇判断论文是否值得推荐给用户，并给出简短的推荐理由。
+        
+        {cls._interest_preamble(user_interests, favorite_summary)}
+        
+        待评估论文信息（共 {len(papers)} 篇）：
+        {papers_info}
+        
+        请严格按照以下JSON数组格式回复，每篇论文一个元素，arxiv_id 必须与上面给出的完全一致（不要包含其他文字）：
+        [
+            {{
+                "arxiv_id": "论文的arxiv_id",
+                "is_recommended": true/false,
+                "reason": "简短的推荐或不推荐理由（不超过50字）"
+            }}
+        ]
+        """
+
+    @classmethod
+    def _parse_batch_evaluation(cls, response: str) -> Dict[str, Dict[str, Any]]:
+        """解析批量评估响应，返回 {arxiv_id: {'is_recommended', 'reason'}}（只包含成功解析的条目）"""
+        results = {}
+        for item in cls._parse_json_items(response):
+            arxiv_id = str(item.get('arxiv_id', '')).strip()
+            if arxiv_id and 'is_recommended' in item:
+                is_recommended = item.get('is_recommended')
+                if isinstance(is_recommended, str):
+                    is_recommended = is_recommended.strip().lower() == 'true'
+                results[arxiv_id] = {
+                    'is_recommended': bool(is_recommended),
+                    'reason': item.get('reason', '无')
+                }
+        return results
+
+    @staticmethod
+    def _parse_json_items(response: str) -> List[Dict]:
+        """从LLM响应中解析JSON对象列表，整体解析失败时逐个提取对象"""
+        # 清理可能的Markdown代码块标记
+        response = response.replace('```json', '').replace('```', '').strip()
+
+        start, end = response.find('['), response.rfind(']')
+        if start != -1 and end > start:
+            try:
+                items = json.loads(response[start:end + 1])
+                if isinstance(items, list):
+                    return [item for item in items if isinstance(item, dict)]
+            except Exception:
+                pass
+
+        items = []
+        for match in re.finditer(r'\{[^{}]*\}', response):
+            try:
+                item = json.loads(match.group(0))
+                if isinstance(item, dict):
+                    items.append(item)
+            except Exception:
+                continue
+        return items
+    
     def translate_paper_info(self, title: str, abstract: str) -> Dict[str, str]:
         """翻译论文标题和摘要"""
-        prompt = f"""
+        response = self._call_llm(self._translation_prompt(title, abstract), max_tokens=1000, purpose='translate',
+                                  validate=self._is_valid_translation)
+        return self._parse_translation(response)
+
+    def translate_papers_batch(self, papers: List[Dict]) -> Dict[str, Dict[str, str]]:
+        """批量翻译多篇论文的标题和摘要，返回 {arxiv_id: {'chinese_title', 'chinese_abstract'}}。
+
+        论文按 `Config.LLM_TRANSLATION_CHUNK_TOKEN_BUDGET` 分组，每组一次请求，避免长摘要的批量回复超出上限被截断。
+        解析失败或缺失的条目回退到 `translate_paper_info` 单篇翻译；请求本身失败时直接抛出异常。
+        """
+        texts = [f"{paper.get('title', '')}\n{paper.get('abstract', '')}" for paper in papers]
+        translated = {}
+        for group in chunk_by_tokens(texts, Config.LLM_TRANSLATION_CHUNK_TOKEN_BUDGET):
+            chunk = [papers[i] for i in group]
+            if len(chunk) == 1:
+                paper = chunk[0]
+                translated[paper['arxiv_id']] = self.translate_paper_info(paper['title'], paper['abstract'])
+            else:
+                translated.update(self._translate_chunk(chunk, [texts[i] for i in group]))
+        return translated
+
+    def _translate_chunk(self, papers: List[Dict], texts: List[str]) -> Dict[str, Dict[str, str]]:
+        # 中文译文的 token 数约为英文原文的两倍，加上 JSON 结构的开销
+        max_tokens = min(Config.LLM_TRANSLATION_MAX_TOKENS,
+                         100 + sum(2 * estimate_tokens(text) + 50 for text in texts))
+        response = self._call_llm(self._batch_translation_prompt(papers), max_tokens=max_tokens,
+                                  purpose='translate',
+                                  validate=self._batch_validator(papers, self._parse_batch_translation))
+        results = self._parse_batch_translation(response)
+
+        translated = {}
+        for paper in papers:
+            arxiv_id = paper['arxiv_id']
+            if arxiv_id in results:
+                translated[arxiv_id] = results[arxiv_id]
+            else:
+                print(f"批量翻译结果中缺少论文 {arxiv_id}，回退到单篇翻译")
+                translated[arxiv_id] = self.translate_paper_info(paper['title'], paper['abstract'])
+        return translated
+
+    @staticmethod
+    def _batch_translation_prompt(papers: List[Dict]) -> str:
+        papers_info = "\n".join([
+            f"""
+        [{i + 1}] arxiv_id: {paper['arxiv_id']}
+        英文标题: {paper.get('title', '')}
+        英文摘要: {paper.get('abstract', '')}"""
+            for i, paper in enumerate(papers)
+        ])
+
+        return f"""
+        请将以下 {len(papers)} 篇英文学术论文的标题和摘要翻译成中文：
+        {papers_info}
+        
+        请严格按照以下JSON数组格式返回翻译结果，每篇论文一个元素，arxiv_id 必须与上面给出的完全一致：
+        [
+            {{
+                "arxiv_id": "论文的arxiv_id",
+                "chinese_title": "中文标题",
+                "chinese_abstract": "中文摘要"
+            }}
+        ]
+        
+        要求：
+        1. 保持学术性和准确性
+        2. 中文标题要简洁明了
+        3. 中文摘要要完整传达原意
+        4. 直接返回JSON，不要添加其他文字
+        """
+
+    @classmethod
+    def _parse_batch_translation(cls, response: str) -> Dict[str, Dict[str, str]]:
+        """解析批量翻译响应，返回 {arxiv_id: {'chinese_title', 'chinese_abstract'}}（只包含有中文标题的条目）"""
+        results = {}
+        for item in cls._parse_json_items(response):
+            arxiv_id = str(item.get('arxiv_id', '')).strip()
+            if arxiv_id and item.get('chinese_title'):
+                results[arxiv_id] = {
+                    'chinese_title': item['chinese_title'],
+                    'chinese_abstract': item.get('chinese_abstract', '')
+                }
+        return results
+
+    @staticmethod
+    def _translation_prompt(title: str, abstract: str) -> str:
+        return f"""
         请将以下英文学术论文的标题和摘要翻译成中文：
         
         英文标题: {title}
@@ -182,9 +463,49 @@ class LLMService:
         3. 中文摘要要完整传达原意
         4. 直接返回JSON，不要添加其他文字
         """
+
+    def translate_paper_info_stream(self, title: str, abstract: str) -> Iterator[str]:
+        """流式翻译论文标题和摘要，逐段产生文本（第一行为中文标题，其后为中文摘要），
+        完整文本用 `parse_streamed_translation` 解析"""
+        yield from self._stream_llm(self._stream_translation_prompt(title, abstract), max_tokens=1000,
+                                    purpose='translate',
+                                    validate=lambda text: bool(self.parse_streamed_translation(text)['chinese_title']))
+
+    @staticmethod
+    def _stream_translation_prompt(title: str, abstract: str) -> str:
+        # 流式输出直接展示给用户，使用纯文本格式而不是JSON
+        return f"""
+        请将以下英文学术论文的标题和摘要翻译成中文：
         
-        response = self._call_llm(prompt, max_tokens=1000)
+        英文标题: {title}
+        英文摘要: {abstract}
         
+        请按以下格式返回翻译结果（不要使用JSON或Markdown，不要添加其他文字）：
+        第一行为中文标题，空一行后为中文摘要。
+        
+        要求：
+        1. 保持学术性和准确性
+        2. 中文标题要简洁明了
+        3. 中文摘要要完整传达原意
+        """
+
+    @staticmethod
+    def parse_streamed_translation(text: str) -> Dict[str, str]:
+        """解析流式翻译的完整文本：第一个非空行为中文标题，其余为中文摘要"""
+        title, _, abstract = text.strip().partition('\n')
+        return {
+            'chinese_title': re.sub(r'^(中文)?标题[:：]\s*', '', title.strip()),
+            'chinese_abstract': re.sub(r'^(中文)?摘要[:：]\s*', '', abstract.strip())
+        }
+
+    @classmethod
+    def _is_valid_translation(cls, response: str) -> bool:
+        """单篇翻译响应能否解析出中文标题（只有能解析的响应才写入缓存）"""
+        result = cls._load_json_object(response)
+        return result is not None and bool(result.get('chinese_title'))
+
+    @staticmethod
+    def _parse_translation(response: str) -> Dict[str, str]:
         try:
             # 清理可能的Markdown代码块标记
             response = response.replace('```json', '').replace('```', '').strip()
@@ -200,39 +521,224 @@ class LLMService:
                 'chinese_abstract': ''
             }
     
-    def _call_llm(self, prompt: str, max_tokens: int = 500) -> str:
-        """调用LLM API"""
-        if not self.api_key:
-            raise ValueError("LLM API key未配置")
+    def _call_llm(self, prompt: str, max_tokens: int = 500, temperature: float = 0.7, use_cache: bool = True,
+                  purpose: str = 'other', validate: Optional[Callable[[str], bool]] = None) -> str:
+        """调用LLM API
+
+        相同的 (base_url, model, prompt, max_tokens, temperature) 优先从缓存返回；
+        `use_cache=False` 或 `Config.LLM_CACHE_ENABLED = False` 时绕过缓存。
+        传入 `validate` 时只缓存通过校验（能被调用方解析）的响应，未通过校验的缓存条目会被删除并重新请求。
+        实际发出的请求按 `purpose` 记录 token 用量（见 `_record_usage`）。
+        """
+        cache_key, cached = self._cache_lookup(prompt, max_tokens, temperature, use_cache, validate)
+        if cached is not None:
+            return cached
         
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            data = {
-                'model': self.model,
-                'messages': [{'role': 'user', 'content': prompt}],
-                'max_tokens': max_tokens,
-                'temperature': 0.7
-            }
-            
-            response = requests.post(
+            response = self.session.post(
                 f'{self.base_url}/chat/completions',
-                headers=headers,
-                json=data,
+                headers=self._headers(),
+                json=self._chat_payload(prompt, max_tokens, temperature),
                 timeout=30
             )
             
             response.raise_for_status()
             result = response.json()
-            
-            if 'choices' in result and len(result['choices']) > 0:
-                return result['choices'][0]['message']['content'].strip()
+            content = self._extract_content(result)
+        except Exception as e:
+            print(f"调用LLM时出错: {e}")
+            raise
+
+        self._record_usage(purpose, prompt, content, result.get('usage'))
+        self._cache_store(cache_key, content, validate)
+        return content
+
+    def _stream_llm(self, prompt: str, max_tokens: int = 500, temperature: float = 0.7,
+                    use_cache: bool = True, purpose: str = 'other',
+                    validate: Optional[Callable[[str], bool]] = None) -> Iterator[str]:
+        """以流式方式调用LLM API（`stream: true`），逐段产生生成的文本。
+
+        服务端以 SSE 返回增量内容，首个片段到达即可展示，不必等待整个响应生成完毕。
+        缓存命中时一次产生全部内容；生成完毕后把完整内容写入缓存（与 `_call_llm` 共用缓存与 `validate` 规则）。
+        """
+        cache_key, cached = self._cache_lookup(prompt, max_tokens, temperature, use_cache, validate)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        usage = {}
+        payload = {**self._chat_payload(prompt, max_tokens, temperature), 'stream': True}
+        if self.config.LLM_STREAM_INCLUDE_USAGE:
+            # 要求服务端在 [DONE] 之前多发一个只含 usage 的片段；不支持的服务端会忽略，此时按文本估算
+            payload['stream_options'] = {'include_usage': True}
+        try:
+            with self.session.post(
+                f'{self.base_url}/chat/completions',
+                headers=self._headers(),
+                json=payload,
+                stream=True,
+                timeout=(10, 30)  # 读取超时按相邻两个片段之间的间隔计算
+            ) as response:
+                response.raise_for_status()
+                # text/event-stream 未声明编码时 requests 默认按 ISO-8859-1 解码
+                response.encoding = 'utf-8'
+                for delta in self._iter_stream_deltas(response.iter_lines(decode_unicode=True), usage):
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            print(f"调用LLM时出错: {e}")
+            raise
+
+        content = ''.join(parts).strip()
+        self._record_usage(purpose, prompt, content, usage)
+        self._cache_store(cache_key, content, validate)
+
+    @staticmethod
+    def _iter_stream_deltas(lines, usage: Optional[Dict] = None) -> Iterator[str]:
+        """从 OpenAI 兼容接口的 SSE 响应行中提取增量文本（`data: {...}`，以 `data: [DONE]` 结束）
+
+        片段中带有 `usage` 时写入传入的 `usage` 字典。
+        """
+        for line in lines:
+            if not line or not line.startswith('data:'):
+                continue
+            data = line[len('data:'):].strip()
+            if data == '[DONE]':
+                break
+            chunk = json.loads(data)
+            if usage is not None and chunk.get('usage'):
+                usage.update(chunk['usage'])
+            choices = chunk.get('choices') or []
+            if choices:
+                delta = (choices[0].get('delta') or {}).get('content')
+                if delta:
+                    yield delta
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+
+    def _chat_payload(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        return {
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'max_tokens': max_tokens,
+            'temperature': temperature
+        }
+
+    @staticmethod
+    def _extract_content(result: Dict) -> str:
+        if 'choices' in result and len(result['choices']) > 0:
+            return result['choices'][0]['message']['content'].strip()
+        raise ValueError("LLM返回格式异常")
+
+    def _record_usage(self, purpose: str, prompt: str, content: str, usage: Optional[Dict]):
+        """记录一次请求的 token 用量；服务端没有返回 usage 时按提示词与回复文本估算"""
+        try:
+            if usage and 'prompt_tokens' in usage:
+                self.db.record_llm_usage(self.model, purpose, usage['prompt_tokens'], usage.get('completion_tokens'))
             else:
-                raise ValueError("LLM返回格式异常")
-                
+                self.db.record_llm_usage(self.model, purpose, estimate_tokens(prompt), estimate_tokens(content),
+                                         estimated=True)
+        except Exception as e:
+            print(f"记录LLM用量时出错: {e}")
+
+    def _cache_lookup(self, prompt: str, max_tokens: int, temperature: float, use_cache: bool,
+                      validate: Optional[Callable[[str], bool]] = None):
+        """返回 (缓存键, 缓存内容)；不使用缓存时缓存键为 None，未命中时缓存内容为 None"""
+        if not self.api_key:
+            raise ValueError("LLM API key未配置")
+        if not (use_cache and self.config.LLM_CACHE_ENABLED):
+            return None, None
+        cache_key = self.cache.make_key(self.base_url, self.model, prompt, max_tokens, temperature)
+        cached = self.cache.get(cache_key)
+        if cached is not None and validate is not None and not validate(cached):
+            # 无法解析的缓存条目（如早期版本写入的）删除后重新请求
+            self.cache.delete(cache_key)
+            cached = None
+        return cache_key, cached
+
+    def _cache_store(self, cache_key: Optional[str], content: str, validate: Optional[Callable[[str], bool]] = None):
+        """写入缓存；空响应与未通过 `validate` 校验的响应不缓存，下次重新请求"""
+        if cache_key is None or not content or (validate is not None and not validate(content)):
+            return
+        try:
+            self.cache.set(cache_key, content)
+        except Exception as e:
+            print(f"写入LLM缓存时出错: {e}")
+
+
+class AsyncLLMService(LLMService):
+    """基于 `httpx.AsyncClient` 的异步LLM调用（供 asyncio 评估引擎使用）
+
+    提示词、响应解析与缓存与 `LLMService` 相同。客户端绑定创建它的事件循环，用完后调用 `aclose()`。
+    """
+
+    def __init__(self, max_connections: Optional[int] = None):
+        super().__init__()
+        self.client = create_async_client(pool_size=max_connections or self.config.EVAL_MAX_WORKERS)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _call_llm_async(self, prompt: str, max_tokens: int = 500, temperature: float = 0.7,
+                              use_cache: bool = True, purpose: str = 'other',
+                              validate: Optional[Callable[[str], bool]] = None) -> str:
+        """异步调用LLM API（缓存规则与 `_call_llm` 相同）
+
+        缓存读写与用量记录是同步的 SQLite 操作，放到线程中执行，避免阻塞事件循环上的其他请求。
+        """
+        cache_key, cached = await asyncio.to_thread(self._cache_lookup, prompt, max_tokens, temperature,
+                                                    use_cache, validate)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await self.client.post(
+                f'{self.base_url}/chat/completions',
+                headers=self._headers(),
+                json=self._chat_payload(prompt, max_tokens, temperature)
+            )
+            response.raise_for_status()
+            result = response.json()
+            content = self._extract_content(result)
         except Exception as e:
             print(f"调用LLM时出错: {e}")
-            raise
\ No newline at end of file
+            raise
+
+        await asyncio.to_thread(self._record_usage, purpose, prompt, content, result.get('usage'))
+        await asyncio.to_thread(self._cache_store, cache_key, content, validate)
+        return content
+
+    async def evaluate_paper_async(self, paper_data: Dict, user_interests: str, favorite_summary: str) -> Dict[str, Any]:
+        response = await self._call_llm_async(self._evaluation_prompt(paper_data, user_interests, favorite_summary),
+                                              purpose='evaluate', validate=self._is_valid_evaluation)
+        return self._parse_evaluation(response)
+
+    async def evaluate_papers_batch_async(self, papers: List[Dict], user_interests: str,
+                                          favorite_summary: str) -> Dict[str, Dict[str, Any]]:
+        """`evaluate_papers_batch` 的异步版本"""
+        if not papers:
+            return {}
+        if len(papers) == 1:
+            paper = papers[0]
+            return {paper['arxiv_id']: await self.evaluate_paper_async(paper, user_interests, favorite_summary)}
+
+        response = await self._call_llm_async(self._batch_evaluation_prompt(papers, user_interests, favorite_summary),
+                                              max_tokens=self._batch_max_tokens(papers), purpose='evaluate',
+                                              validate=self._batch_validator(papers, self._parse_batch_evaluation))
+        results = self._parse_batch_evaluation(response)
+
+        evaluated = {}
+        for paper in papers:
+            arxiv_id = paper['arxiv_id']
+            if arxiv_id in results:
+                evaluated[arxiv_id] = results[arxiv_id]
+            else:
+                print(f"批量评估结果中缺少论文 {arxiv_id}，回退到单篇评估")
+                evaluated[arxiv_id] = await self.evaluate_paper_async(paper, user_interests, favorite_summary)
+        return evaluated
+
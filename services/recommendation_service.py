@@ -1,89 +1,148 @@
+import asyncio
 import json
-from typing import List, Dict, Optional
+import os
+import socket
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Optional
+from config import Config
 from services.arxiv_service import ArxivService
+from services.embedding_service import EmbeddingService
+from services.evaluation_engine import AsyncEvaluationEngine, async_engine_available
+from services.favorite_summarizer import FavoriteSummarizer
+from services.job_service import JobService
 from services.llm_service import LLMService
 from utils.database import DatabaseManager
+from utils.pagination import decode_cursor, next_cursor
+from utils.rate_limiter import AdaptiveBackoff
+from utils.status_hub import status_hub
 import threading
 import time
 
 class RecommendationService:
     """推荐引擎服务"""
+
+    # 请求等待推荐论文时添加的评估任务优先级，以及检查推荐队列的间隔（秒）
+    WAITING_EVALUATION_PRIORITY = 10
+    WAIT_POLL_INTERVAL = 0.5
     
     def __init__(self):
         self.arxiv_service = ArxivService()
         self.llm_service = LLMService()
         self.db = DatabaseManager()
+        self.embedding_service = EmbeddingService(self.db)
+        self.favorite_summarizer = FavoriteSummarizer(self.llm_service, self.db)
         # 后台评估状态追踪
         self.last_evaluation_run = None
         self.last_evaluated_count = 0
+        # 所有评估线程共享的退避状态（遇到 429/5xx 时统一暂停）
+        self.backoff = AdaptiveBackoff(Config.EVAL_BACKOFF_BASE, Config.EVAL_BACKOFF_MAX)
+        # 评估吞吐与延迟统计
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=200)
+        self._run_started = None
+        self.evaluation_stats = self._empty_stats(0)
+        # 保证同一时间只有一轮后台评估
+        self._evaluation_lock = threading.Lock()
+        self._evaluation_thread = None
+        self._async_engine = None
+        self.job_service = JobService(self.db, arxiv_service=self.arxiv_service, recommendation_service=self)
     
-    def get_next_recommendation(self) -> Optional[Dict]:
-        """获取下一条推荐论文"""
-        # 优先返回已经被LLM标记为推荐并且用户尚未处理的论文（快速响应）
-        rows = self.db.get_recommended_unseen(limit=1)
-        if rows:
-            paper = dict(rows[0])
-            return paper
+    def get_next_recommendation(self, wait: bool = True, timeout: Optional[float] = None) -> Optional[Dict]:
+        """获取下一条推荐论文。
+
+        推荐论文由后台评估预先准备好（已评估、用户尚未处理），直接从这一队列中取出；
+        队列低于 `Config.READY_QUEUE_LOW_WATERMARK` 时添加评估任务补充。取出的论文尚无翻译时即时翻译，
+        并添加翻译任务预先翻译队列中接下来的 `Config.TRANSLATION_PREFETCH` 篇。队列为空时：
+        `wait=False` 立即返回 None（调用方可根据 `is_evaluation_running` / 待评估数量提示稍后重试）；
+        `wait=True` 添加（或提前）评估任务并等待 worker 评估出推荐论文，最多等待 `timeout`（默认
+        `Config.RECOMMENDATION_WAIT_SECONDS`）秒，超时或评估任务结束仍没有推荐论文则返回 None。
+        """
+        paper = self._next_ready_paper()
+        self._refill_if_low()
+        if paper or not wait:
+            return self._prepare_for_display(paper)
 
-        # 否则，按照旧逻辑评估下一篇未评估论文（同步行为，可能较慢）
-        papers = self.db.get_papers_for_recommendation(limit=1)
-        if not papers:
+        if not self.db.get_config('USER_INTERESTS', ''):
+            raise ValueError("用户兴趣点未配置")
+        if self.db.get_papers_for_recommendation(limit=1):
+            # 用户正在等待：评估任务优先于定时任务执行（已在排队的评估任务提高优先级）
+            self.request_evaluation(priority=self.WAITING_EVALUATION_PRIORITY)
+        elif not self.is_evaluation_running:
             # 无待评估论文，直接返回 None（不自动触发爬取）
             return None
 
-        paper = papers[0]
-
-        # 获取用户配置
-        user_interests = self.db.get_config('USER_INTERESTS', '')
-        favorite_summary = self.db.get_config('FAVORITE_SUMMARY', '')
-
-        if not user_interests:
-            raise ValueError("用户兴趣点未配置")
-
-        # 使用LLM评估论文（同步）
-        paper_dict = dict(paper)
-        eval_result = self.llm_service.evaluate_paper(
-            paper_dict, user_interests, favorite_summary
-        )
-        is_recommended = eval_result.get('is_recommended', False)
-        reason = eval_result.get('reason', '')
-
-        # 更新论文状态和推荐理由（把 llm_evaluated 也设置为 True）
-        self.db.update_paper_evaluation(paper['id'], is_recommended, recommendation_reason=reason)
+        deadline = time.monotonic() + (timeout if timeout is not None else Config.RECOMMENDATION_WAIT_SECONDS)
+        while time.monotonic() < deadline:
+            time.sleep(self.WAIT_POLL_INTERVAL)
+            paper = self._next_ready_paper()
+            if paper:
+                return self._prepare_for_display(paper)
+            if not self.is_evaluation_running:
+                # 评估任务已结束，仍没有推荐论文
+                return None
+        return None
+
+    def _next_ready_paper(self) -> Optional[Dict]:
+        rows = self.db.get_recommended_unseen(limit=1)
+        return dict(rows[0]) if rows else None
 
-        if is_recommended:
-            # 为推荐论文添加翻译
-            try:
-                translation = self.llm_service.translate_paper_info(
-                    paper_dict['title'], 
-                    paper_dict['abstract']
-                )
-                chinese_title = translation['chinese_title']
-                chinese_abstract = translation['chinese_abstract']
-                paper_dict['chinese_title'] = chinese_title
-                paper_dict['chinese_abstract'] = chinese_abstract
-                # 保存翻译到数据库
-                self.db.update_paper_translation(paper['id'], chinese_title, chinese_abstract)
-            except Exception as e:
-                print(f"翻译论文时出错: {e}")
-                paper_dict['chinese_title'] = ''
-                paper_dict['chinese_abstract'] = ''
+    def _prepare_for_display(self, paper: Optional[Dict]) -> Optional[Dict]:
+        """即将展示的论文补充翻译，并预先翻译推荐队列中接下来的论文"""
+        if paper is None:
+            return None
+        paper = self.translate_paper(paper)
+        try:
+            self.request_translation_prefetch()
+        except Exception as e:
+            print(f"添加翻译任务时出错: {e}")
+        return paper
+
+    def _refill_if_low(self):
+        """推荐队列低于水位线且有待评估论文时添加评估任务"""
+        if self.is_evaluation_running:
+            return
+        try:
+            if self.db.count_recommended_unseen() >= Config.READY_QUEUE_LOW_WATERMARK:
+                return
+            if self.db.get_papers_for_recommendation(limit=1):
+                self.request_evaluation()
+        except Exception as e:
+            print(f"补充推荐队列时出错: {e}")
 
-            # 添加推荐理由到返回数据
-            paper_dict['recommendation_reason'] = reason
+    def request_evaluation(self, priority: Optional[int] = None) -> int:
+        """添加评估任务（已有评估任务在排队时合并），返回任务ID"""
+        return self.job_service.enqueue('evaluate', priority=priority, dedupe_key='evaluate')
 
-            # 返回推荐论文的完整信息
-            return paper_dict
-        else:
-            # 如果不推荐，递归获取下一个
-            return self.get_next_recommendation()
+    @property
+    def is_evaluation_running(self) -> bool:
+        """是否有排队中或运行中的评估任务（读取 jobs 表，对所有进程与 worker 有效）"""
+        return self.db.has_active_job('evaluate')
 
-    def evaluate_pending_papers(self, batch_size: int = 10, delay: float = 0.0):
+    def evaluate_pending_papers(self, batch_size: int = 10, delay: float = 0.0, max_workers: Optional[int] = None):
         """在后台对未评估的论文运行 LLM 评估并保存结果到数据库。
 
-        该方法会批量获取未评估论文并依次调用 LLM 来评估、翻译（若被推荐），并把
-        `llm_evaluated` 标记为 True，`is_recommended` 根据评估结果设置为 True/False。
+        启动 `max_workers`（默认 `Config.EVAL_MAX_WORKERS`）个评估线程，每个线程每次在
+        `papers` 表中认领 `batch_size` 篇论文并评估，把 `llm_evaluated` 标记为 True，
+        `is_recommended` 根据评估结果设置为 True/False。评估时不翻译：推荐论文在展示前由
+        `translate_papers`（翻译任务或翻译接口）按需批量翻译，本轮结束后由 `request_translation_prefetch`
+        为推荐队列最前面的几篇添加翻译任务。
+        每次LLM请求打包评估 `Config.EVAL_PROMPT_BATCH_SIZE` 篇论文，以减少重复的提示词开销。
+        认领机制保证多个线程（或进程）不会重复评估同一篇论文；遇到 429/5xx、连接失败、超时或 401/403 时
+        所有线程共同退避，论文释放认领且不计入尝试次数，连续 `Config.EVAL_MAX_UNAVAILABLE` 次服务不可用时结束本轮评估。
+        启用 `Config.PREFILTER_ENABLED` 时先做向量预筛选，只有相似度较高的论文才交给LLM。
+        同一时间只运行一轮评估，已有评估在运行时直接返回。
         """
+        if not self._evaluation_lock.acquire(blocking=False):
+            print("后台评估正在进行，跳过")
+            return
+        try:
+            self._run_evaluation(batch_size, delay, max_workers)
+        finally:
+            self._evaluation_lock.release()
+
+    def _run_evaluation(self, batch_size: int, delay: float, max_workers: Optional[int]):
         try:
             # 如果LLM未配置，跳过
             if not self.llm_service.api_key:
@@ -94,50 +153,273 @@ class RecommendationService:
             print("无法读取 LLM 配置，跳过后台评估")
             return
 
-        evaluated_total = 0
         from datetime import datetime
         self.last_evaluation_run = datetime.utcnow().isoformat()
 
-        while True:
-            papers = self.db.get_papers_for_recommendation(limit=batch_size)
+        max_workers = max_workers or Config.EVAL_MAX_WORKERS
+        run_id = f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        with self._stats_lock:
+            self.evaluation_stats = self._empty_stats(max_workers)
+            self._latencies.clear()
+            self._run_started = time.monotonic()
+        # 每轮评估重新计算连续不可用次数（退避时间保留）
+        self.backoff.unavailable_streak = 0
+
+        if Config.PREFILTER_ENABLED:
+            try:
+                prefilter = self.embedding_service.prefilter_pending()
+                if prefilter:
+                    status_hub.refresh()
+                    with self._stats_lock:
+                        self.evaluation_stats['prefiltered'] = prefilter['rejected']
+            except Exception as e:
+                # 预筛选失败不影响LLM评估
+                print(f"向量预筛选时出错: {e}")
+
+        if Config.EVAL_ENGINE == 'async' and async_engine_available():
+            self._run_async_engine(max_workers, delay)
+        else:
+            self._run_worker_threads(run_id, max_workers, batch_size, delay)
+
+        # 记录评估统计信息
+        self.last_evaluated_count = self.evaluation_stats['evaluated']
+
+        # 新的推荐论文不在评估时翻译，只预先翻译推荐队列最前面的几篇
+        try:
+            self.request_translation_prefetch()
+        except Exception as e:
+            print(f"添加翻译任务时出错: {e}")
+
+    def _run_async_engine(self, max_workers: int, delay: float):
+        """在当前线程的事件循环中运行 asyncio 评估流水线（stop_background_evaluation 可以让它提前收尾）"""
+        engine = AsyncEvaluationEngine(
+            self.db, concurrency=max_workers, delay=delay, backoff=self.backoff,
+            stats=self.evaluation_stats, stats_lock=self._stats_lock, latencies=self._latencies
+        )
+        self._async_engine = engine
+        try:
+            asyncio.run(engine.run())
+        finally:
+            self._async_engine = None
+
+    def _run_worker_threads(self, run_id: str, max_workers: int, batch_size: int, delay: float):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._evaluation_worker, f'{run_id}-{i}', batch_size, delay)
+                for i in range(max_workers)
+            ]
+            for future in futures:
+                future.result()
+
+    def _evaluation_worker(self, worker_id: str, batch_size: int, delay: float):
+        """评估线程：循环认领并评估论文，直到没有待评估论文或LLM服务连续不可用"""
+        while not self._llm_unavailable():
+            papers = self.db.claim_papers_for_evaluation(
+                worker_id, limit=batch_size, lease_seconds=Config.EVAL_CLAIM_LEASE_SECONDS
+            )
             if not papers:
                 break
 
-            for row in papers:
-                pid = row['id']
-                paper_dict = dict(row)
+            user_interests = self.db.get_config('USER_INTERESTS', '')
+            favorite_summary = self.db.get_config('FAVORITE_SUMMARY', '')
+
+            # 每次请求打包评估 EVAL_PROMPT_BATCH_SIZE 篇论文
+            papers = [dict(row) for row in papers]
+            chunk_size = max(1, Config.EVAL_PROMPT_BATCH_SIZE)
+            for i in range(0, len(papers), chunk_size):
+                if self._llm_unavailable():
+                    # 本轮不再请求，剩余论文释放认领（不计入尝试次数）
+                    self.db.release_paper_claims([paper['id'] for paper in papers[i:]])
+                    break
+                self._evaluate_claimed_batch(papers[i:i + chunk_size], user_interests, favorite_summary)
+                if delay and delay > 0:
+                    time.sleep(delay)
 
-                try:
-                    user_interests = self.db.get_config('USER_INTERESTS', '')
-                    favorite_summary = self.db.get_config('FAVORITE_SUMMARY', '')
-                    eval_result = self.llm_service.evaluate_paper(paper_dict, user_interests, favorite_summary)
-                    is_recommended = eval_result.get('is_recommended', False)
-                    reason = eval_result.get('reason', '')
+    def _evaluate_claimed_batch(self, papers: List[Dict], user_interests: str, favorite_summary: str):
+        """在一次LLM请求中评估一批已认领的论文并保存结果"""
+        self.backoff.wait()
+        started = time.monotonic()
+        with self._stats_lock:
+            self.evaluation_stats['in_flight'] += len(papers)
 
-                    # 更新评估结果并标记为已评估
-                    self.db.update_paper_evaluation(pid, is_recommended, recommendation_reason=reason)
+        try:
+            results = self.llm_service.evaluate_papers_batch(papers, user_interests, favorite_summary)
+            self.backoff.success()
+            elapsed = time.monotonic() - started
+            with self._stats_lock:
+                self._latencies.append(elapsed)
+        except Exception as e:
+            backed_off = self._record_llm_error(e)
+            with self._stats_lock:
+                self.evaluation_stats['failed'] += len(papers)
+                self.evaluation_stats['in_flight'] -= len(papers)
+            ids = [paper['id'] for paper in papers]
+            if backed_off:
+                # 被限流或服务不可用（连接失败、超时、鉴权失败等）的论文立即释放（不计入尝试次数），
+                # 退避结束后由其他线程重新认领
+                self.db.release_paper_claims(ids)
+            else:
+                # 与具体论文有关的失败（如响应无法解析）保留认领，租约到期后重试；尝试次数用尽的论文标记为评估失败
+                self.db.fail_paper_claims(ids)
+            for paper in papers:
+                print(f"评估论文 ID={paper['id']} 时出错: {e}")
+            return
 
-                    if is_recommended:
-                        try:
-                            translation = self.llm_service.translate_paper_info(paper_dict['title'], paper_dict['abstract'])
-                            self.db.update_paper_translation(pid, translation.get('chinese_title', ''), translation.get('chinese_abstract', ''))
-                        except Exception as e:
-                            print(f"翻译失败（ID={pid}）: {e}")
+        for paper in papers:
+            pid = paper['id']
+            try:
+                eval_result = results.get(paper['arxiv_id'], {})
+                is_recommended = eval_result.get('is_recommended', False)
+                reason = eval_result.get('reason', '')
 
-                except Exception as e:
-                    print(f"评估论文 ID={pid} 时出错: {e}")
+                # 更新评估结果并标记为已评估（同时释放认领）
+                self.db.update_paper_evaluation(pid, is_recommended, recommendation_reason=reason)
+                status_hub.refresh()
 
-                if delay and delay > 0:
-                    time.sleep(delay)
-                evaluated_total += 1
+                with self._stats_lock:
+                    self.evaluation_stats['evaluated'] += 1
+            except Exception as e:
+                with self._stats_lock:
+                    self.evaluation_stats['failed'] += 1
+                print(f"保存论文 ID={pid} 的评估结果时出错: {e}")
+            finally:
+                with self._stats_lock:
+                    self.evaluation_stats['in_flight'] -= 1
+
+    def _record_llm_error(self, error: Exception) -> bool:
+        """如果错误与具体论文无关（429/5xx/401/403、连接失败、超时），则触发退避并返回 True"""
+        if not self.backoff.record_error(error):
+            return False
+        with self._stats_lock:
+            self.evaluation_stats['throttled'] += 1
+        if self.backoff.unavailable_streak == Config.EVAL_MAX_UNAVAILABLE:
+            print(f"LLM 服务连续 {Config.EVAL_MAX_UNAVAILABLE} 次不可用，停止本轮评估")
+        return True
+
+    def _llm_unavailable(self) -> bool:
+        """LLM 服务是否已连续 `Config.EVAL_MAX_UNAVAILABLE` 次不可用（请求成功后清零）"""
+        return self.backoff.unavailable_streak >= Config.EVAL_MAX_UNAVAILABLE
+
+    @staticmethod
+    def _empty_stats(max_workers: int) -> Dict:
+        return {
+            'max_workers': max_workers,
+            'in_flight': 0,
+            'evaluated': 0,
+            'failed': 0,
+            'throttled': 0,
+            'prefiltered': 0
+        }
+
+    def get_evaluation_stats(self) -> Dict:
+        """返回最近一次后台评估的吞吐与延迟统计（延迟按每次批量评估请求计算）"""
+        with self._stats_lock:
+            stats = dict(self.evaluation_stats)
+            latencies = sorted(self._latencies)
+            elapsed = time.monotonic() - self._run_started if self._run_started else 0
+
+        stats['throughput_per_minute'] = round(stats['evaluated'] / elapsed * 60, 2) if elapsed else 0.0
+        stats['avg_latency'] = round(sum(latencies) / len(latencies), 3) if latencies else None
+        stats['p95_latency'] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3) if latencies else None
+        stats['backoff_seconds'] = self.backoff.delay
+        stats['llm_cache'] = self.llm_service.cache.stats()
+        return stats
+
+    def translate_papers(self, paper_ids: Optional[List[int]] = None, limit: Optional[int] = None) -> int:
+        """翻译尚无中文翻译的论文，返回翻译成功的数量。
+
+        指定 `paper_ids` 时翻译其中的论文，否则翻译推荐队列最前面 `limit`（默认
+        `Config.TRANSLATION_PREFETCH`）篇中的论文。每次LLM请求翻译 `Config.TRANSLATION_BATCH_SIZE` 篇。
+        """
+        limit = len(paper_ids) if paper_ids else (limit or Config.TRANSLATION_PREFETCH)
+        papers = [dict(row) for row in self.db.get_untranslated_papers(paper_ids, limit)]
+        chunk_size = max(1, Config.TRANSLATION_BATCH_SIZE)
+        translated = 0
+        for i in range(0, len(papers), chunk_size):
+            translated += len(self._translate_batch(papers[i:i + chunk_size]))
+        return translated
+
+    def translate_paper(self, paper: Dict) -> Dict:
+        """用户打开尚无翻译的论文时即时翻译，返回补充了翻译的论文（翻译失败时原样返回）"""
+        if paper.get('chinese_title'):
+            return paper
+        paper = dict(paper)
+        paper_id = paper.get('paper_id') or paper['id']
+        translation = self._translate_batch([{**paper, 'id': paper_id}]).get(paper_id)
+        if translation:
+            paper.update(translation)
+        return paper
+
+    def stream_translation(self, paper: Dict) -> Iterator[Dict]:
+        """流式翻译论文：逐段产生 {'delta': 文本}，最后产生 {'done': 翻译} 并保存（已有翻译时直接产生 done）"""
+        if paper.get('chinese_title'):
+            yield {'done': {'chinese_title': paper['chinese_title'], 'chinese_abstract': paper.get('chinese_abstract') or ''}}
+            return
 
-            # 记录评估统计信息
-            self.last_evaluated_count = evaluated_total
+        parts = []
+        try:
+            self.backoff.wait()
+            for delta in self.llm_service.translate_paper_info_stream(paper['title'], paper['abstract']):
+                parts.append(delta)
+                yield {'delta': delta}
+        except Exception as e:
+            self._record_llm_error(e)
+            raise
+        translation = self.llm_service.parse_streamed_translation(''.join(parts))
+        if translation['chinese_title']:
+            paper_id = paper.get('paper_id') or paper['id']
+            self.db.save_translations([(translation['chinese_title'], translation['chinese_abstract'], paper_id)])
+        yield {'done': translation}
+
+    def _translate_batch(self, papers: List[Dict]) -> Dict[int, Dict]:
+        """在一次LLM请求中翻译一批论文并保存，返回 {论文ID: 翻译}（只包含翻译成功的论文）"""
+        try:
+            self.backoff.wait()
+            results = self.llm_service.translate_papers_batch(papers)
+            self.backoff.success()
+        except Exception as e:
+            self._record_llm_error(e)
+            print(f"翻译 {len(papers)} 篇论文时出错: {e}")
+            return {}
+
+        translations = {}
+        for paper in papers:
+            translation = results.get(paper['arxiv_id']) or {}
+            if translation.get('chinese_title'):
+                translations[paper['id']] = {
+                    'chinese_title': translation['chinese_title'],
+                    'chinese_abstract': translation.get('chinese_abstract', '')
+                }
+        self.db.save_translations([(t['chinese_title'], t['chinese_abstract'], pid) for pid, t in translations.items()])
+        return translations
+
+    def request_translation_prefetch(self) -> Optional[int]:
+        """推荐队列最前面的 `Config.TRANSLATION_PREFETCH` 篇中有尚无翻译的论文时添加翻译任务（已在排队时合并），返回任务ID"""
+        if not self.db.get_untranslated_papers(limit=Config.TRANSLATION_PREFETCH):
+            return None
+        return self.job_service.enqueue('translate', dedupe_key='translate:prefetch')
 
-    def start_background_evaluation(self, batch_size: int = 10, delay: float = 0.0):
-        """启动后台线程执行一次性评估任务（守护线程）。"""
+    def start_background_evaluation(self, batch_size: int = 10, delay: float = 0.0) -> bool:
+        """启动后台线程执行一次性评估任务（守护线程），已有评估在运行时返回 False。"""
+        if self._evaluation_lock.locked():
+            return False
         t = threading.Thread(target=self.evaluate_pending_papers, args=(batch_size, delay), daemon=True)
         t.start()
+        self._evaluation_thread = t
+        return True
+
+    def stop_background_evaluation(self, timeout: Optional[float] = None):
+        """让后台评估提前收尾并等待其结束（进程退出时调用）。
+
+        asyncio 引擎停止认领新论文，已认领的论文处理完后退出（最多 `Config.EVAL_DRAIN_TIMEOUT` 秒），
+        未完成的论文释放认领；线程池实现没有停止机制，只等待 `timeout` 秒。
+        """
+        engine = self._async_engine
+        if engine is not None:
+            engine.stop()
+        thread = self._evaluation_thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout if timeout is not None else Config.EVAL_DRAIN_TIMEOUT + 5)
     
     def process_user_feedback(self, paper_id: int, action: str, user_note: str = None):
         """处理用户反馈"""
@@ -151,109 +433,103 @@ class RecommendationService:
         elif action == 'dislike' or action == 'not_interested':
             # 标记为不喜欢
             self.db.mark_disliked(paper_id)
+        # 推荐队列中的论文被标记后离开队列
+        status_hub.refresh()
     
     def _trigger_incremental_summary(self):
-        """触发增量总结"""
-        # 获取未总结的收藏论文
-        unsummarized = self.db.get_unsummarized_favorites()
-        
-        if not unsummarized:
+        """触发增量总结（收藏较多时分组并发总结后逐层合并，见 `FavoriteSummarizer`）"""
+        papers_data, favorite_ids, current_summary = self._prepare_incremental_summary()
+        if not favorite_ids:
             return
-        
-        # 准备论文数据
-        papers_data = []
-        favorite_ids = []
-        
-        for row in unsummarized:
-            paper_data = {
-                'title': row['title'],
-                'abstract': row['abstract']
-            }
-            papers_data.append(paper_data)
-            favorite_ids.append(row['id'])
-        
-        # 获取当前总结
-        current_summary = self.db.get_config('FAVORITE_SUMMARY', '')
-        
+
         # 调用LLM进行增量总结
-        new_summary = self.llm_service.summarize_favorites(papers_data, current_summary)
-        
-        # 更新配置
-        self.db.set_config('FAVORITE_SUMMARY', new_summary)
-        
-        # 标记这些收藏已总结
-        for favorite_id in favorite_ids:
-            self.db.mark_favorite_summarized(favorite_id)
+        new_summary, checkpoint_keys = self.favorite_summarizer.summarize(papers_data, current_summary)
+        self.db.save_favorite_summary(new_summary, favorite_ids, checkpoint_keys)
+
+    def stream_incremental_summary(self) -> Iterator[Dict]:
+        """流式增量总结：逐段产生 {'delta': 文本}，最后产生 {'done': {'summary': 新总结}} 并保存"""
+        papers_data, favorite_ids, current_summary = self._prepare_incremental_summary()
+        if not favorite_ids:
+            yield {'done': {'summary': current_summary}}
+            return
+
+        parts, checkpoint_keys = [], []
+        for delta in self.favorite_summarizer.summarize_stream(papers_data, current_summary, checkpoint_keys):
+            parts.append(delta)
+            yield {'delta': delta}
+        new_summary = ''.join(parts).strip()
+        self.db.save_favorite_summary(new_summary, favorite_ids, checkpoint_keys)
+        yield {'done': {'summary': new_summary}}
+
+    def _prepare_incremental_summary(self):
+        """返回 (未总结的收藏论文数据, 论文ID列表, 当前总结)"""
+        unsummarized = self.db.get_unsummarized_favorites()
+        papers_data = [{'id': row['id'], 'title': row['title'], 'abstract': row['abstract']} for row in unsummarized]
+        favorite_ids = [row['id'] for row in unsummarized]
+        return papers_data, favorite_ids, self.db.get_config('FAVORITE_SUMMARY', '')
     
-    def get_favorites_list(self, page: int = 1, per_page: int = 10) -> Dict:
-        """获取收藏列表（分页）"""
-        offset = (page - 1) * per_page
-        rows = self.db.get_favorites(limit=per_page, offset=offset)
-        total = self.db.count_favorites()
+    def get_favorites_list(self, page: int = 1, per_page: int = 10, cursor: str = None, include_total: bool = True) -> Dict:
+        """获取收藏列表（分页，传入 cursor 时使用键集分页）"""
+        return self._paged_list(self.db.get_favorites, self.db.count_favorites, 'favorite_marked_at',
+                                page, per_page, cursor, include_total)
+
+    def get_papers_by_status_list(self, status: str = 'all', page: int = 1, per_page: int = 50,
+                                  cursor: str = None, include_total: bool = True) -> Dict:
+        """论文库按状态分页（管理界面使用）"""
+        return self._paged_list(
+            lambda **kwargs: self.db.get_papers_by_status(status, **kwargs),
+            lambda: self.db.count_papers_by_status(status),
+            'published_date', page, per_page, cursor, include_total
+        )
+
+    def _paged_list(self, fetch, count, sort_column: str, page: int, per_page: int,
+                    cursor: str = None, include_total: bool = True) -> Dict:
+        """按页码或游标获取一页论文。
+
+        多取一条用于判断是否有下一页，`next_cursor` 指向下一页；总数来自 paper_stats 计数
+        （`include_total=False` 时不返回）。
+        """
+        after = decode_cursor(cursor) if cursor else None
+        rows = fetch(limit=per_page + 1, offset=(page - 1) * per_page, after=after)
+        pagination = {
+            'page': page,
+            'per_page': per_page,
+            'next_cursor': next_cursor(rows, per_page, sort_column)
+        }
+        if include_total:
+            total = count()
+            pagination['total'] = total
+            pagination['pages'] = (total + per_page - 1) // per_page
 
         return {
-            'papers': [dict(row) for row in rows],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'pages': (total + per_page - 1) // per_page
-            }
+            'papers': [dict(row) for row in rows[:per_page]],
+            'pagination': pagination
         }
 
     def get_pending_count(self) -> int:
         """返回待评估（未由LLM评估且未标记为推荐）的论文数量"""
-        query = """
-            SELECT COUNT(*) as total
-            FROM papers
-            WHERE llm_evaluated = FALSE AND is_recommended = FALSE
-        """
-        result = self.db.execute_query(query)
-        return result[0]['total'] if result else 0
+        return status_hub.snapshot()[1]['pending']
 
     def get_evaluation_status(self) -> Dict:
         """返回评估相关的状态信息：
         - pending: 未由LLM评估的论文数量
         - recommended_unseen: 已被LLM标记为推荐但用户尚未处理的数量
-        - last_run: 后台最近一次评估时间（UTC ISO 格式，若无则为空）
-        - last_evaluated_count: 最近一次评估运行处理的论文数量
-        """
-        # 待评估数量
-        pending = self.get_pending_count()
-        # 已评估且未被用户处理的推荐数量
-        query = """
-            SELECT COUNT(*) as total FROM papers
-            WHERE llm_evaluated = 1
-            AND is_recommended = 1
-            AND (favorite IS NULL OR favorite = 0)
-            AND (maybe_later IS NULL OR maybe_later = 0)
-            AND (disliked IS NULL OR disliked = 0)
-        """
-        res = self.db.execute_query(query)
-        recommended_unseen = res[0]['total'] if res else 0
+        - eval_failed: 多次评估失败、不再自动重试的论文数量
+        - last_run: 最近一次评估任务的开始时间（UTC ISO 格式，若无则为空）
+        - last_evaluated_count: 最近一次成功的评估任务处理的论文数量
+        - evaluating / crawling: 是否有评估、爬取任务正在运行（读取 jobs 表，包括其他 worker 进程）
+        - stats: 最近一次评估运行的并发数、吞吐量（篇/分钟）与延迟（秒）统计
 
-        return {
-            'pending': pending,
-            'recommended_unseen': recommended_unseen,
-            'last_run': self.last_evaluation_run,
-            'last_evaluated_count': self.last_evaluated_count
-        }
+        计数来自触发器维护的 paper_stats 表（经 `status_hub`），不再每次扫描 papers 表。
+        """
+        status = status_hub.snapshot()[1]
+        status['stats'] = self.get_evaluation_stats()
+        return status
     
-    def get_maybe_later_list(self, page: int = 1, per_page: int = 10) -> Dict:
-        """获取稍后再说列表（分页）"""
-        offset = (page - 1) * per_page
-        rows = self.db.get_maybe_later(limit=per_page, offset=offset)
-        total = self.db.count_maybe_later()
-
-        return {
-            'papers': [dict(row) for row in rows],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'pages': (total + per_page - 1) // per_page
-            }
-        }
+    def get_maybe_later_list(self, page: int = 1, per_page: int = 10, cursor: str = None, include_total: bool = True) -> Dict:
+        """获取稍后再说列表（分页，传入 cursor 时使用键集分页）"""
+        return self._paged_list(self.db.get_maybe_later, self.db.count_maybe_later, 'maybe_later_marked_at',
+                                page, per_page, cursor, include_total)
     
     def move_from_maybe_to_favorite(self, paper_id: int, user_note: str = None):
         """将论文从稍后再说移动到收藏"""
@@ -264,11 +540,16 @@ class RecommendationService:
     
     def delete_favorite(self, paper_id: int):
         """取消收藏（通过 paper_id）"""
-        return self.db.unmark_favorite(paper_id)
+        result = self.db.unmark_favorite(paper_id)
+        # 被推荐过的论文取消标记后回到推荐队列
+        status_hub.refresh()
+        return result
     
     def delete_maybe_later(self, paper_id: int):
         """取消稍后再说（通过 paper_id）"""
-        return self.db.unmark_maybe_later(paper_id)
+        result = self.db.unmark_maybe_later(paper_id)
+        status_hub.refresh()
+        return result
     
     def clean_old_papers(self, days_old: int | None = 30, delete_all: bool = False):
         """清理旧论文。
@@ -279,36 +560,9 @@ class RecommendationService:
         from datetime import datetime, timedelta
 
         # 如果请求删除全部（不按日期），只删除被标记为 disliked 的论文（仍然保护收藏/稍后标记）
-        protected_result = self.db.execute_query('SELECT id as paper_id FROM papers WHERE favorite = 1 OR maybe_later = 1')
-        protected_ids = [str(row['paper_id']) for row in protected_result]
-
         if delete_all or days_old is None:
-            if protected_ids:
-                delete_query = f"""
-                    DELETE FROM papers
-                    WHERE disliked = 1
-                    AND id NOT IN ({','.join(['?'] * len(protected_ids))})
-                """
-                params = protected_ids
-            else:
-                delete_query = 'DELETE FROM papers WHERE disliked = 1'
-                params = []
-
-            return self.db.execute_query(delete_query, params if params else None)
+            return self.db.delete_disliked_papers()
 
         # 否则按日期删除（disliked 且 published_date < cutoff）
         cutoff_date = (datetime.now() - timedelta(days=days_old)).strftime('%Y-%m-%d')
-
-        if protected_ids:
-            delete_query = f'''
-                DELETE FROM papers
-                WHERE published_date < ?
-                AND disliked = 1
-                AND id NOT IN ({','.join(['?'] * len(protected_ids))})
-            '''
-            params = [cutoff_date] + protected_ids
-        else:
-            delete_query = 'DELETE FROM papers WHERE published_date < ? AND disliked = 1'
-            params = [cutoff_date]
-
-        return self.db.execute_query(delete_query, params)
\ No newline at end of file
+        return self.db.delete_disliked_papers(before_date=cutoff_date)
\ No newline at end of file
@@ -99,8 +99,12 @@ class APIClient {
     }
 
     // 推荐
-    async getNextRecommendation() {
-        return this.request('/recommendation/next');
+    async getNextRecommendation(wait = false) {
+        return this.request(`/recommendation/next?wait=${wait}`);
+    }
+
+    async translatePaper(paperId) {
+        return this.request(`/papers/${paperId}/translate`, { method: 'POST' });
     }
 
     async getRecommendationStatus() {
@@ -115,13 +119,13 @@ class APIClient {
     }
 
     // 列表管理
-    async getFavorites(page = 1, perPage = 10) {
-        return this.request(`/list/favorites?page=${page}&per_page=${perPage}`);
+    async getFavorites(page = 1, perPage = 10, cursor = null) {
+        return this.request(`/list/favorites?page=${page}&per_page=${perPage}${this._cursorParam(cursor)}`);
     }
 
     // 管理接口：获取所有论文（支持状态过滤）
-    async getAdminPapers(status = 'all', page = 1, perPage = 50) {
-        return this.request(`/admin/papers?status=${status}&page=${page}&per_page=${perPage}`);
+    async getAdminPapers(status = 'all', page = 1, perPage = 50, cursor = null) {
+        return this.request(`/admin/papers?status=${status}&page=${page}&per_page=${perPage}${this._cursorParam(cursor)}`);
     }
 
     async getLastCrawlDate() {
@@ -162,8 +166,13 @@ class APIClient {
         });
     }
 
-    async getMaybeLater(page = 1, perPage = 10) {
-        return this.request(`/list/maybe-later?page=${page}&per_page=${perPage}`);
+    async getMaybeLater(page = 1, perPage = 10, cursor = null) {
+        return this.request(`/list/maybe-later?page=${page}&per_page=${perPage}${this._cursorParam(cursor)}`);
+    }
+
+    // 分页游标（由上一页响应的 pagination.next_cursor 给出）
+    _cursorParam(cursor) {
+        return cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
     }
 
     async moveToFavorite(paperId, note = '') {
@@ -200,6 +209,46 @@ class APIClient {
             body: categories ? { categories } : {}
         });
     }
+
+    // 订阅一次性的 SSE 流：delta 事件为增量文本（传给 onDelta），done 事件为最终结果（resolve），
+    // failed 事件或连接中断时 reject。收到结果后立即关闭连接，避免 EventSource 自动重连再次请求
+    streamEvents(endpoint, onDelta) {
+        return new Promise((resolve, reject) => {
+            const source = new EventSource(`${this.baseUrl}${endpoint}`);
+            source.addEventListener('delta', (e) => onDelta && onDelta(JSON.parse(e.data).text));
+            source.addEventListener('done', (e) => {
+                source.close();
+                resolve(JSON.parse(e.data));
+            });
+            source.addEventListener('failed', (e) => {
+                source.close();
+                reject(new Error(JSON.parse(e.data).error));
+            });
+            source.onerror = () => {
+                if (source.readyState === EventSource.CLOSED) return;
+                source.close();
+                reject(new Error('连接中断'));
+            };
+        });
+    }
+
+    // 后台任务
+    async getJob(jobId) {
+        return this.request(`/jobs/${jobId}`);
+    }
+
+    // 轮询任务直到完成或失败，返回任务详情；超时抛出异常（任务仍在后台继续执行）
+    async waitForJob(jobId, { interval = 1500, timeout = 15 * 60 * 1000 } = {}) {
+        const deadline = Date.now() + timeout;
+        while (Date.now() < deadline) {
+            const response = await this.getJob(jobId);
+            const job = response.data;
+            if (job.status === 'succeeded') return job;
+            if (job.status === 'failed') throw new Error(job.error || '任务失败');
+            await new Promise(resolve => setTimeout(resolve, interval));
+        }
+        throw new Error(`任务 #${jobId} 仍在后台执行，请稍后查看`);
+    }
 }
 
 // 全局API客户端实例
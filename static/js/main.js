@@ -6,6 +6,8 @@ class ArxivAgentApp {
         this.adminPage = 1;
         this.currentPaper = null;
         this._statusInterval = null;
+        this._statusSource = null;
+        this.recommendationStatus = {};
         this.init();
     }
 
@@ -21,12 +23,44 @@ class ArxivAgentApp {
         });
         this.loadInitialData();
         this.loadAdminPanel();
-        // 每 5 秒刷新一次推荐进度（仅数字），不刷新推荐卡片
-        this._statusInterval = setInterval(() => this.loadRecommendationStatus(), 5000);
+        // 通过 SSE 接收推荐进度（仅数字），不刷新推荐卡片；浏览器不支持或连接关闭时退回轮询
+        this.startStatusStream();
+    }
+
+    startStatusStream() {
+        if (!window.EventSource) {
+            this._startStatusPolling();
+            return;
+        }
+        const source = new EventSource('/api/recommendation/status/stream');
+        source.addEventListener('status', (e) => {
+            // 首条消息为完整状态，之后只包含变化的字段
+            Object.assign(this.recommendationStatus, JSON.parse(e.data));
+            this.renderRecommendationStatus(this.recommendationStatus);
+        });
+        source.onerror = () => {
+            // 网络中断时 EventSource 会自动重连；只有连接被关闭时才改为轮询
+            if (source.readyState === EventSource.CLOSED) {
+                this._statusSource = null;
+                this._startStatusPolling();
+            }
+        };
+        this._statusSource = source;
+    }
+
+    _startStatusPolling() {
+        if (!this._statusInterval) {
+            // 每 5 秒刷新一次推荐进度
+            this._statusInterval = setInterval(() => this.loadRecommendationStatus(), 5000);
+        }
     }
 
     // 可用于在需要时停止自动刷新
     stopStatusAutoRefresh() {
+        if (this._statusSource) {
+            this._statusSource.close();
+            this._statusSource = null;
+        }
         if (this._statusInterval) {
             clearInterval(this._statusInterval);
             this._statusInterval = null;
@@ -132,18 +166,23 @@ class ArxivAgentApp {
         try {
             const resp = await api.getRecommendationStatus();
             if (resp.success && resp.data) {
-                const rec_unseen = resp.data.recommended_unseen || 0;
-                const pending = resp.data.pending || 0;
-                const el = document.getElementById('recommendation-remaining');
-                const processingEl = document.getElementById('recommendation-processing');
-                if (el) el.textContent = `${rec_unseen}`; // 只显示已评估但未标记的数量
-                if (processingEl) processingEl.textContent = `${pending}`;
+                Object.assign(this.recommendationStatus, resp.data);
+                this.renderRecommendationStatus(this.recommendationStatus);
             }
         } catch (e) {
             console.error('加载推荐进度失败:', e);
         }
     }
 
+    renderRecommendationStatus(status) {
+        const rec_unseen = status.recommended_unseen || 0;
+        const pending = status.pending || 0;
+        const el = document.getElementById('recommendation-remaining');
+        const processingEl = document.getElementById('recommendation-processing');
+        if (el) el.textContent = `${rec_unseen}`; // 只显示已评估但未标记的数量
+        if (processingEl) processingEl.textContent = `${pending}`;
+    }
+
     // 标签页切换
     switchTab(tabName) {
         // 更新导航按钮状态
@@ -363,6 +402,7 @@ class ArxivAgentApp {
         loadingEl.style.display = 'flex';
         contentEl.style.display = 'none';
         emptyEl.style.display = 'none';
+        clearTimeout(this.nextRecommendationTimer);
 
         try {
             const response = await api.getNextRecommendation();
@@ -372,6 +412,10 @@ class ArxivAgentApp {
                     this.displayPaperCard(response.data);
                     loadingEl.style.display = 'none';
                     contentEl.style.display = 'flex';
+                } else if (response.status === 'pending') {
+                    // 后台正在评估新论文，保持加载状态并稍后重试
+                    const delay = (response.retry_after || 3) * 1000;
+                    this.nextRecommendationTimer = setTimeout(() => this.loadNextRecommendation(), delay);
                 } else {
                     // 没有更多推荐
                     loadingEl.style.display = 'none';
@@ -490,8 +534,8 @@ class ArxivAgentApp {
             
             // 加载下一个推荐
             this.loadNextRecommendation();
-            // 刷新剩余计数
-            this.loadRecommendationStatus();
+            // 剩余计数由 SSE 推送；轮询模式下手动刷新
+            if (!this._statusSource) this.loadRecommendationStatus();
             
         } catch (error) {
             utils.hideLoading();
@@ -520,7 +564,7 @@ class ArxivAgentApp {
     async loadFavorites(page = 1) {
         try {
             console.log('加载收藏列表，页码:', page);
-            const response = await api.getFavorites(page, 10);
+            const response = await api.getFavorites(page, 10, this._pageCursor('favorites', page));
             console.log('收藏列表API响应:', response);
             if (response.success) {
                 this.renderPaperList('favorites-papers-list', response.data.papers);
@@ -537,7 +581,7 @@ class ArxivAgentApp {
     async loadMaybeLater(page = 1) {
         try {
             console.log('加载稍后再说列表，页码:', page);
-            const response = await api.getMaybeLater(page, 10);
+            const response = await api.getMaybeLater(page, 10, this._pageCursor('maybe-later', page));
             console.log('稍后再说列表API响应:', response);
             if (response.success) {
                 this.renderPaperList('maybe-later-papers-list', response.data.papers, true);
@@ -638,14 +682,33 @@ class ArxivAgentApp {
         });
     }
 
+    // 键集分页：记录每一页的起始游标，第 1 页或未知页码时按页码请求
+    _pageCursor(list, page) {
+        this.pageCursors = this.pageCursors || {};
+        if (page <= 1 || !this.pageCursors[list]) {
+            this.pageCursors[list] = {};
+            return null;
+        }
+        return this.pageCursors[list][page] || null;
+    }
+
+    _rememberNextCursor(list, pagination) {
+        this.pageCursors = this.pageCursors || {};
+        this.pageCursors[list] = this.pageCursors[list] || {};
+        if (pagination.next_cursor) {
+            this.pageCursors[list][pagination.page + 1] = pagination.next_cursor;
+        }
+    }
+
     renderPagination(containerId, pagination) {
         const container = document.getElementById(containerId);
+        this._rememberNextCursor(this.currentListTab === 'favorites' ? 'favorites' : 'maybe-later', pagination);
         container.innerHTML = `
             <button class="pagination-btn" id="prev-btn" 
                     ${pagination.page <= 1 ? 'disabled' : ''}>上一页</button>
             <span class="page-info">第 ${pagination.page} 页，共 ${pagination.pages} 页</span>
             <button class="pagination-btn" id="next-btn" 
-                    ${pagination.page >= pagination.pages ? 'disabled' : ''}>下一页</button>
+                    ${!pagination.next_cursor ? 'disabled' : ''}>下一页</button>
         `;
 
         document.getElementById('prev-btn').addEventListener('click', () => {
@@ -775,6 +838,30 @@ class ArxivAgentApp {
             chineseAbstractEl.parentElement.style.display = 'none';
         }
 
+        // 没有翻译的论文在打开时即时翻译（推荐论文只预先翻译推荐队列最前面的几篇），
+        // 支持 SSE 时流式显示翻译过程
+        this.detailPaperId = paper.paper_id;
+        if (!paper.chinese_title && paper.paper_id) {
+            const isCurrent = () => this.detailPaperId === paper.paper_id;
+            let streamed = '';
+            const translation = window.EventSource
+                ? api.streamEvents(`/papers/${paper.paper_id}/translate/stream`, (text) => {
+                    streamed += text;
+                    if (!isCurrent()) return;
+                    chineseAbstractEl.textContent = streamed;
+                    chineseAbstractEl.parentElement.style.display = 'block';
+                })
+                : api.translatePaper(paper.paper_id).then(resp => resp.data);
+            translation.then(result => {
+                Object.assign(paper, result);
+                if (!isCurrent() || !paper.chinese_title) return;
+                chineseTitleEl.textContent = paper.chinese_title;
+                chineseTitleEl.style.display = 'block';
+                chineseAbstractEl.textContent = paper.chinese_abstract || '';
+                chineseAbstractEl.parentElement.style.display = paper.chinese_abstract ? 'block' : 'none';
+            }).catch(error => console.error('翻译论文失败:', error));
+        }
+
         // 显示论文发表日期
         const detailDateEl = document.getElementById('paper-detail-published-date');
         if (detailDateEl) {
@@ -932,14 +1019,23 @@ class ArxivAgentApp {
 
     async updateFavoriteSummary() {
         try {
-            utils.showLoading('更新总结中...');
-            const response = await api.updateFavoriteSummaryAuto();
-            utils.hideLoading();
-            
-            if (response.success) {
-                document.getElementById('favorite-summary').value = response.data.summary;
-                utils.showNotification('收藏总结已更新', 'success');
+            const summaryEl = document.getElementById('favorite-summary');
+            if (window.EventSource) {
+                // 流式显示新的总结，首个片段到达即可看到
+                let streamed = '';
+                const result = await api.streamEvents('/config/update-favorite-summary/stream', (text) => {
+                    streamed += text;
+                    summaryEl.value = streamed;
+                });
+                summaryEl.value = result.summary;
+            } else {
+                utils.showLoading('更新总结中...');
+                const response = await api.updateFavoriteSummaryAuto();
+                const job = await api.waitForJob(response.data.job_id);
+                utils.hideLoading();
+                summaryEl.value = job.result.summary;
             }
+            utils.showNotification('收藏总结已更新', 'success');
         } catch (error) {
             utils.hideLoading();
             utils.showNotification('更新失败: ' + error.message, 'error');
@@ -994,12 +1090,11 @@ class ArxivAgentApp {
                 method: 'POST',
                 body: body
             });
+            const job = await api.waitForJob(response.data.job_id);
             utils.hideLoading();
 
-            if (response.success) {
-                utils.showNotification(response.message, 'success');
-                this.loadConfigStatus();
-            }
+            utils.showNotification(`成功爬取 ${job.result.count} 篇论文`, 'success');
+            this.loadConfigStatus();
         } catch (error) {
             utils.hideLoading();
             utils.showNotification('爬取失败: ' + error.message, 'error');
@@ -1032,8 +1127,10 @@ class ArxivAgentApp {
             const resp = await api.getLastCrawlDate();
             if (resp.success) {
                 const date = resp.data.last_crawl_date || '';
+                const nextRun = resp.data.next_scheduled_crawl || '';
                 const display = document.getElementById('admin-last-crawl-date');
                 if (display) {
+                    display.title = nextRun ? `下次自动抓取: ${nextRun} UTC` : '';
                     if (date) {
                         // 格式化日期显示
                         const formattedDate = utils.formatDateForDisplay(date);
@@ -1062,7 +1159,7 @@ class ArxivAgentApp {
         try {
             const statusEl = document.getElementById('admin-filter-status');
             const status = statusEl ? statusEl.value : 'all';
-            const resp = await api.getAdminPapers(status, this.adminPage, perPage);
+            const resp = await api.getAdminPapers(status, this.adminPage, perPage, this._pageCursor('admin', this.adminPage));
             if (resp.success) {
                 const papers = resp.data.papers || [];
                 const rawPag = resp.data.pagination || {};
@@ -1070,7 +1167,8 @@ class ArxivAgentApp {
                 const per = rawPag.per_page || perPage;
                 const total = rawPag.total != null ? rawPag.total : (papers.length || 0);
                 const pages = Math.max(1, Math.ceil(total / per));
-                const pagination = { page: pageNum, per_page: per, total: total, pages: pages };
+                const pagination = { page: pageNum, per_page: per, total: total, pages: pages, next_cursor: rawPag.next_cursor || null };
+                this._rememberNextCursor('admin', pagination);
                 this.renderAdminPapers(papers, pagination);
             }
         } catch (e) {
@@ -1099,7 +1197,7 @@ class ArxivAgentApp {
         html += `<div class="admin-pagination" id="admin-pagination">`;
         html += `<button class="pagination-btn" id="admin-prev" ${pagination.page <= 1 ? 'disabled' : ''}>上一页</button>`;
         html += `<span class="page-info">第 ${pagination.page} 页，共 ${pagination.pages} 页</span>`;
-        html += `<button class="pagination-btn" id="admin-next" ${pagination.page >= pagination.pages ? 'disabled' : ''}>下一页</button>`;
+        html += `<button class="pagination-btn" id="admin-next" ${!pagination.next_cursor ? 'disabled' : ''}>下一页</button>`;
         html += `</div>`;
 
         container.innerHTML = html;
@@ -1117,7 +1215,7 @@ class ArxivAgentApp {
         const prev = document.getElementById('admin-prev');
         const next = document.getElementById('admin-next');
         if (prev) prev.addEventListener('click', () => { if (pagination.page > 1) this.loadAdminPapers(pagination.page - 1); });
-        if (next) next.addEventListener('click', () => { if (pagination.page < pagination.pages) this.loadAdminPapers(pagination.page + 1); });
+        if (next) next.addEventListener('click', () => { if (pagination.next_cursor) this.loadAdminPapers(pagination.page + 1); });
     }
 
     _paperStatus(p) {
@@ -1219,11 +1317,10 @@ class ArxivAgentApp {
         try {
             utils.showLoading('爬取中...');
             const resp = await api.adminCrawlNow();
+            const job = await api.waitForJob(resp.data.job_id);
             utils.hideLoading();
-            if (resp.success) {
-                utils.showNotification(resp.message || '已开始爬取', 'success');
-                this.loadAdminPanel();
-            }
+            utils.showNotification(`成功爬取 ${job.result.count} 篇论文`, 'success');
+            this.loadAdminPanel();
         } catch (e) {
             utils.hideLoading();
             utils.showNotification('爬取失败: ' + e.message, 'error');
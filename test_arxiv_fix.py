@@ -1,17 +1,81 @@
 #!/usr/bin/env python3
 """
 arxivAgent 功能测试脚本
+
+    python test_arxiv_fix.py            # 访问真实的 arXiv API 与已配置的 LLM
+    python test_arxiv_fix.py --offline  # 使用 benchmarks/ 下的模拟 arXiv 与 LLM 服务，不访问网络
+
+两种模式都使用临时数据库，不写入 data/ 下的真实数据库。
 """
 
 import sys
 import os
+import io
+import json
+import sqlite3
+import tempfile
+from contextlib import closing, contextmanager
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+sys.path.append(BENCHMARKS_DIR)
 
+from config import Config
 from services.arxiv_service import ArxivService
 from services.llm_service import LLMService
 from services.recommendation_service import RecommendationService
+from utils.atom_parser import ArxivAtomParser
 from utils.database import DatabaseManager
 
+# 离线模式下模拟 LLM 服务的地址（见 start_mock_servers）
+MOCK_LLM_BASE_URL = None
+
+def start_mock_servers():
+    """启动模拟的 arXiv 与 LLM 服务，并让后续创建的服务使用它们"""
+    global MOCK_LLM_BASE_URL
+    import mock_arxiv_server
+    import mock_llm_server
+
+    _, Config.ARXIV_API_BASE = mock_arxiv_server.start_server(papers_per_day=20)
+    Config.ARXIV_PAGE_DELAY = 0.05
+    _, MOCK_LLM_BASE_URL = mock_llm_server.start_server(latency_ms=20)
+    print(f"🔌 离线模式：arXiv -> {Config.ARXIV_API_BASE}，LLM -> {MOCK_LLM_BASE_URL}")
+
+@contextmanager
+def temporary_config(**overrides):
+    """临时修改 Config 中的配置项（如指向临时数据库与模拟服务），退出时恢复"""
+    saved = {name: getattr(Config, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+
+def temp_database_path(name='test.db'):
+    """返回临时目录中的数据库路径"""
+    return os.path.join(tempfile.mkdtemp(), name)
+
+def use_temporary_database():
+    """让所有测试使用临时数据库（不写入真实数据库），并以只读方式复制真实数据库中的LLM配置供在线测试使用"""
+    real_path = Config.DATABASE_PATH
+    Config.DATABASE_PATH = temp_database_path('arxiv_agent.db')
+    if not os.path.exists(real_path):
+        return
+    try:
+        with closing(sqlite3.connect(f'file:{real_path}?mode=ro', uri=True)) as conn:
+            rows = conn.execute(
+                "SELECT key, value FROM config WHERE key IN ('LLM_BASE_URL', 'LLM_API_KEY', 'LLM_MODEL')"
+            ).fetchall()
+    except sqlite3.Error:
+        return
+    db = DatabaseManager()
+    for key, value in rows:
+        db.set_config(key, value)
+
+# 导入时即切换（pytest 收集本文件时同样生效）
+use_temporary_database()
+
 def test_database():
     """测试数据库连接和基本操作"""
     print("🧪 测试数据库功能...")
@@ -48,6 +112,9 @@ def test_llm_service():
     print("\n🧪 测试LLM服务...")
     try:
         service = LLMService()
+        if MOCK_LLM_BASE_URL:
+            # 只修改本实例，不覆盖数据库中的LLM配置
+            service.base_url, service.api_key = MOCK_LLM_BASE_URL, 'mock'
         # 检查是否有配置
         if not service.api_key:
             print("⚠️  LLM未配置，跳过测试")
@@ -76,17 +143,639 @@ def test_recommendation_service():
         print(f"❌ 推荐服务测试失败: {e}")
         return False
 
+def test_query_plans():
+    """检查热点查询在 50 万篇论文规模下不会全表扫描"""
+    print("\n🧪 测试热点查询的执行计划...")
+    try:
+        db = DatabaseManager(os.path.join(tempfile.mkdtemp(), 'query_plans.db'))
+        conn = db.get_connection()
+
+        # 先删除索引再批量生成数据，最后重新执行初始化以重建索引
+        for name in db.PAPER_INDEXES:
+            conn.execute(f'DROP INDEX IF EXISTS {name}')
+        with conn:
+            conn.execute('''
+                WITH RECURSIVE seq(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM seq WHERE i < 499999)
+                INSERT INTO papers (arxiv_id, title, abstract, published_date,
+                                    llm_evaluated, is_recommended, favorite, maybe_later, disliked,
+                                    favorite_marked_at, maybe_later_marked_at)
+                SELECT 'test.' || i, 'title', 'abstract', date('2020-01-01', '+' || (i % 2000) || ' days'),
+                       i % 100 < 70, i % 100 < 10, i % 100 = 1, i % 100 = 2, i % 100 = 3,
+                       datetime('2024-01-01', '+' || i || ' seconds'), datetime('2024-01-01', '+' || i || ' seconds')
+                FROM seq
+            ''')
+        db.init_database()
+
+        # 记录各热点查询实际执行的 SQL
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            db.get_recommended_unseen(limit=10)
+            db.get_papers_for_recommendation(limit=10)
+            db.get_favorites(limit=10)
+            db.get_maybe_later(limit=10)
+            for status in db.PAPER_STATUS_FILTERS:
+                db.get_papers_by_status(status, limit=50)
+                db.count_papers_by_status(status)
+
+            service = RecommendationService()
+            service.db = db
+            service.get_evaluation_status()
+        finally:
+            conn.set_trace_callback(None)
+
+        passed = True
+        for statement in statements:
+            if not statement.lstrip().upper().startswith('SELECT'):
+                continue
+            plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + statement)]
+            if any(detail.startswith('SCAN papers') for detail in plan):
+                print(f"❌ 全表扫描: {' '.join(statement.split())} -> {plan}")
+                passed = False
+
+        # 触发器维护的计数与实际 COUNT(*) 一致（包括批量更新与删除之后）
+        def check_stats(stage):
+            stats = db.get_paper_stats()
+            for name, condition in db.PAPER_STATS_FILTERS.items():
+                actual = conn.execute(f'SELECT COUNT(*) FROM papers WHERE {condition}').fetchone()[0]
+                if stats[name] != actual:
+                    print(f"❌ {stage}后计数 {name} 为 {stats[name]}，实际为 {actual}")
+                    return False
+            return True
+
+        passed = check_stats('批量写入') and passed
+        db.execute_query("UPDATE papers SET disliked = 1 WHERE llm_evaluated = 1 AND user_status = 'none'")
+        passed = check_stats('全部标记为已读') and passed
+        db.execute_query('DELETE FROM papers WHERE id % 7 = 0')
+        passed = check_stats('批量删除') and passed
+
+        if passed:
+            print(f"✅ {len(statements)} 条热点查询均使用索引，状态计数与实际一致")
+        return passed
+    except Exception as e:
+        print(f"❌ 执行计划测试失败: {e}")
+        return False
+
+def test_atom_parser():
+    """测试 Atom 增量解析：与 feedparser 的解析结果一致，并能直接解析模拟 arXiv 服务的响应流"""
+    print("\n🧪 测试 Atom 解析...")
+    import feedparser
+    import mock_arxiv_server
+
+    with open(os.path.join(BENCHMARKS_DIR, 'fixtures', 'arxiv_feed.xml'), 'rb') as f:
+        data = f.read()
+    parser = ArxivAtomParser(io.BytesIO(data))
+    papers = list(parser)
+    service = ArxivService.__new__(ArxivService)
+    expected = [service.parse_arxiv_entry(entry) for entry in feedparser.parse(data).entries]
+    assert papers == expected, "iterparse 与 feedparser 的解析结果不一致"
+    assert parser.total_results == len(papers) == 50, f"totalResults 为 {parser.total_results}，条目数为 {len(papers)}"
+
+    server, url = mock_arxiv_server.start_server(papers_per_day=30)
+    try:
+        with temporary_config(DATABASE_PATH=temp_database_path(), ARXIV_API_BASE=url, ARXIV_PAGE_DELAY=0.01):
+            service = ArxivService()
+            search = service.build_search_query(['cs.AI'], '20250303', '20250304')
+            _, total = service.fetch_page(search, 0, 1)
+            pages = list(service.iter_paper_pages(['cs.AI'], '20250303', '20250304', page_size=7))
+    finally:
+        server.shutdown()
+
+    fetched = [paper for _, page in pages for paper in page]
+    assert total and len(fetched) == total, f"分页取回 {len(fetched)} 篇，totalResults 为 {total}"
+    assert pages[-1][0] == total, "最后一页的下一页偏移应等于 totalResults"
+    assert len({paper['arxiv_id'] for paper in fetched}) == total, "分页结果中有重复论文"
+    for paper in fetched:
+        assert 'cs.AI' in paper['categories'], f"{paper['arxiv_id']} 不属于 cs.AI"
+        assert paper['updated_date'] in ('2025-03-03', '2025-03-04'), f"{paper['arxiv_id']} 的更新日期超出范围"
+        assert paper['title'] and paper['abstract'] and paper['authors'], f"{paper['arxiv_id']} 缺少字段"
+    print(f"✅ 样例的 {len(papers)} 条与 feedparser 一致，分页取回模拟服务的 {total} 篇论文")
+    return True
+
+def test_evaluation_claims():
+    """测试评估认领：限流释放不计入尝试次数，尝试次数用尽后标记为评估失败、不再认领"""
+    print("\n🧪 测试评估认领与尝试次数...")
+    db = DatabaseManager(temp_database_path('claims.db'))
+    db.bulk_insert_papers([{'arxiv_id': f'claim.{i}', 'title': f'paper {i}', 'abstract': 'abstract', 'authors': [],
+                            'categories': ['cs.AI'], 'published_date': '2025-01-01', 'updated_date': '2025-01-01',
+                            'pdf_url': '', 'arxiv_url': ''} for i in range(3)])
+
+    def claim():
+        rows = db.claim_papers_for_evaluation('worker', limit=10, lease_seconds=60, max_attempts=2)
+        # 模拟租约到期
+        db.execute_query("UPDATE papers SET eval_claimed_at = datetime('now', '-1 hour') WHERE eval_claimed_by IS NOT NULL")
+        return {row['id']: row['eval_attempts'] for row in rows}
+
+    first = claim()
+    assert len(first) == 3 and set(first.values()) == {1}, f"首次认领结果异常: {first}"
+    db.release_paper_claims(list(first))
+    assert set(claim().values()) == {1}, "限流释放后再次认领不应增加尝试次数"
+    assert set(claim().values()) == {2}, "租约到期后重新认领应计为第二次尝试"
+    assert claim() == {}, "尝试次数用尽的论文不应再被认领"
+    stats = db.get_paper_stats()
+    assert stats['eval_failed'] == 3 and stats['pending'] == 0, f"评估失败计数异常: {stats}"
+
+    assert db.reset_failed_evaluations() == 3
+    rows = db.claim_papers_for_evaluation('worker', limit=1, lease_seconds=60, max_attempts=1)
+    assert db.fail_paper_claims([rows[0]['id']], max_attempts=1) == 1, "出错且尝试次数用尽的论文应立即标记为失败"
+    assert db.get_paper_stats()['pending'] == 2
+    print("✅ 尝试次数、限流释放与评估失败标记均符合预期")
+    return True
+
+def test_llm_unavailable():
+    """测试LLM服务不可用（连接失败、鉴权失败）时：退避并释放认领，不计入尝试次数，连续失败后停止本轮评估"""
+    print("\n🧪 测试LLM服务不可用时的评估...")
+    import asyncio
+    import socket
+    import requests
+    from services.evaluation_engine import AsyncEvaluationEngine
+    from utils.rate_limiter import AdaptiveBackoff
+
+    # 取一个没有服务监听的端口
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    path = temp_database_path('unavailable.db')
+    with temporary_config(DATABASE_PATH=path, HTTP_RETRIES=0, LLM_CACHE_ENABLED=False, EVAL_BACKOFF_BASE=0.01,
+                          EVAL_BACKOFF_MAX=0.05, EVAL_MAX_UNAVAILABLE=3, EVAL_ENGINE='threads'):
+        db = DatabaseManager(path)
+        db.bulk_insert_papers([{'arxiv_id': f'down.{i}', 'title': f'paper {i}', 'abstract': 'abstract', 'authors': [],
+                                'categories': ['cs.AI'], 'published_date': '2025-01-01', 'updated_date': '2025-01-01',
+                                'pdf_url': '', 'arxiv_url': ''} for i in range(40)])
+        db.set_config('LLM_BASE_URL', f'http://127.0.0.1:{port}/v1')
+        db.set_config('LLM_API_KEY', 'test')
+
+        def attempts():
+            row = db.execute_query('SELECT SUM(eval_attempts) AS attempts, '
+                                   'SUM(eval_claimed_by IS NOT NULL) AS claimed FROM papers')[0]
+            return row['attempts'], row['claimed']
+
+        # asyncio 引擎：连接被拒绝
+        engine = AsyncEvaluationEngine(db, concurrency=2, batch_size=5, backoff=AdaptiveBackoff(0.01, 0.05))
+        stats = asyncio.run(engine.run())
+        assert stats['evaluated'] == 0 and stats['throttled'] >= 3, f"评估统计异常: {stats}"
+        assert db.get_paper_stats()['pending'] == 40, "服务不可用时论文不应标记为评估失败"
+        assert attempts() == (0, 0), f"服务不可用时应释放认领且不计尝试次数: {attempts()}"
+
+        # 线程池实现：401 同样退避，与具体论文有关的错误（响应无法解析）才计入尝试次数
+        service = RecommendationService()
+        unauthorized = requests.Response()
+        unauthorized.status_code = 401
+        calls = []
+
+        def evaluate_papers_batch(papers, *args):
+            calls.append(len(papers))
+            raise requests.HTTPError('401 Unauthorized', response=unauthorized)
+
+        service.llm_service.evaluate_papers_batch = evaluate_papers_batch
+        service.evaluate_pending_papers(batch_size=5, max_workers=1)
+        assert len(calls) == 3, f"连续 3 次不可用后应停止本轮评估，实际请求 {len(calls)} 次"
+        assert attempts() == (0, 0), f"鉴权失败时应释放认领且不计尝试次数: {attempts()}"
+
+        def malformed(papers, *args):
+            raise ValueError('LLM返回格式异常')
+
+        service.llm_service.evaluate_papers_batch = malformed
+        service.evaluate_pending_papers(batch_size=5, max_workers=1)
+        assert attempts() == (40, 40), f"响应无法解析的论文应计入尝试次数并保留认领: {attempts()}"
+    print("✅ 服务不可用时释放认领并停止本轮评估，只有与论文有关的错误计入尝试次数")
+    return True
+
+def test_parse_json_items():
+    """测试从LLM响应中解析JSON对象列表（代码块、前后附加文字、被截断的数组）"""
+    print("\n🧪 测试批量响应解析...")
+    parse = LLMService._parse_json_items
+    items = [{'arxiv_id': '2501.00001', 'is_recommended': True, 'reason': '相关'},
+             {'arxiv_id': '2501.00002', 'is_recommended': 'false', 'reason': '无关'}]
+    array = json.dumps(items, ensure_ascii=False)
+
+    assert parse(array) == items, "完整数组解析失败"
+    assert parse(f"```json\n{array}\n```") == items, "Markdown 代码块解析失败"
+    assert parse(f"评估结果如下：\n{array}\n以上。") == items, "前后附加文字时解析失败"
+    assert parse(f'[{json.dumps(items[0])}, 1, "x"]') == [items[0]], "数组中的非对象元素应被忽略"
+    # 输出被截断：数组不完整时逐个提取完整的对象
+    assert parse(array[:-20]) == [items[0]], "截断的数组应保留已完整输出的对象"
+    assert parse('无法评估') == [], "没有JSON时应返回空列表"
+
+    results = LLMService._parse_batch_evaluation(array)
+    assert results == {'2501.00001': {'is_recommended': True, 'reason': '相关'},
+                       '2501.00002': {'is_recommended': False, 'reason': '无关'}}, f"批量评估解析结果异常: {results}"
+    translations = LLMService._parse_batch_translation(json.dumps([
+        {'arxiv_id': '2501.00001', 'chinese_title': '标题', 'chinese_abstract': '摘要'},
+        {'arxiv_id': '2501.00002', 'chinese_title': ''},
+    ], ensure_ascii=False))
+    assert list(translations) == ['2501.00001'], "没有中文标题的条目应被忽略"
+
+    # categories 为 NULL 的论文：单篇评估（批量评估失败后的回退）与批量评估的提示词都能生成
+    paper = {'arxiv_id': '2501.00003', 'title': 'title', 'abstract': 'abstract', 'categories': None}
+    assert '分类: \n' in LLMService._evaluation_prompt(paper, '兴趣', '')
+    assert '2501.00003' in LLMService._batch_evaluation_prompt([paper, dict(paper, arxiv_id='2501.00004')], '兴趣', '')
+    print("✅ 批量评估与翻译响应解析符合预期")
+    return True
+
+def test_llm_cache_validation():
+    """测试LLM缓存只保存能解析的响应，无法解析的缓存条目会被删除并重新请求，缓存统计按 TTL 缓存"""
+    print("\n🧪 测试LLM响应缓存...")
+    import mock_llm_server
+
+    server, url = mock_llm_server.start_server(latency_ms=0)
+    answer = server.answer
+    try:
+        with temporary_config(DATABASE_PATH=temp_database_path('llm_cache.db'), LLM_CACHE_ENABLED=True):
+            service = LLMService()
+            service.base_url, service.api_key = url, 'mock'
+            paper = {'arxiv_id': '2501.00001', 'title': 'Graph neural networks', 'abstract': 'abstract',
+                     'categories': '["cs.LG"]'}
+
+            # 无法解析的响应不写入缓存
+            server.answer = lambda prompt: ('evaluate', '抱歉，我无法评估这篇论文')
+            assert service.evaluate_paper(paper, '图神经网络', '')['reason'] == '评估失败'
+            assert service.cache.stats()['entries'] == 0, "无法解析的响应不应写入缓存"
+
+            # 能解析的响应写入缓存，再次评估直接命中
+            server.answer = answer
+            result = service.evaluate_paper(paper, '图神经网络', '')
+            requests_before = server.snapshot().get('requests', 0)
+            assert service.evaluate_paper(paper, '图神经网络', '') == result
+            assert server.snapshot().get('requests', 0) == requests_before, "能解析的响应应从缓存返回"
+
+            # 早期版本写入的无法解析的条目：删除后重新请求
+            prompt = service._evaluation_prompt(paper, '图神经网络', '')
+            key = service.cache.make_key(service.base_url, service.model, prompt, 500, 0.7)
+            service.cache.set(key, 'not json')
+            assert service.evaluate_paper(paper, '图神经网络', '') == result
+            assert server.snapshot().get('requests', 0) == requests_before + 1, "无法解析的缓存条目应重新请求"
+            assert service.cache.get(key) != 'not json', "无法解析的缓存条目应被替换"
+
+            # 统计中的条目数与大小：本进程写入后立即更新，其他进程的写入在缓存期内不重新聚合
+            entries = service.cache.stats()['entries']
+            service.cache.set('other', 'x')
+            assert service.cache.stats()['entries'] == entries + 1
+            service.db.execute_query("INSERT INTO llm_cache (key, response, size, created_at, last_access) "
+                                     "VALUES ('external', 'x', 1, 0, 0)")
+            assert service.cache.stats()['entries'] == entries + 1, "缓存期内不应重新统计整个缓存表"
+    finally:
+        server.answer = answer
+        server.shutdown()
+    print("✅ 缓存只保存能解析的响应，缓存统计不随每次轮询全表聚合")
+    return True
+
+def test_fts_chinese_search():
+    """测试中文全文检索：按字短语匹配、高亮还原为原文，且不依赖自定义函数的连接也能写入论文"""
+    print("\n🧪 测试中文全文检索...")
+    import sqlite3
+    path = temp_database_path('fts.db')
+    db = DatabaseManager(path)
+    db.bulk_insert_papers([{'arxiv_id': f'fts.{i}', 'title': f'Graph networks {i}', 'abstract': 'abstract',
+                            'authors': [], 'categories': ['cs.LG'], 'published_date': '2025-01-01',
+                            'updated_date': '2025-01-01', 'pdf_url': '', 'arxiv_url': ''} for i in range(2)])
+    first, second = sorted(row['id'] for row in db.execute_query('SELECT id FROM papers'))
+    db.save_translations([('基于图神经网络的推荐', '我们提出一种图神经网络方法。', first)])
+    db.update_paper_translation(second, '大语言模型评测', '评测大语言模型的推理能力。')
+
+    results = db.search_papers('神经网络')
+    assert [row['id'] for row in results] == [first], f"中文检索结果异常: {results}"
+    assert results[0]['chinese_title_highlight'] == '基于图<mark>神经网络</mark>的推荐', results[0]['chinese_title_highlight']
+    assert '<mark>神经网络</mark>' in results[0]['chinese_abstract_snippet']
+    assert 'chinese_title_fts' not in results[0], "检索结果不应包含切分后的影子列"
+    assert db.search_papers('网络神经') == [], "中文应按短语匹配，字序不同不应命中"
+
+    # 其他进程（如 sqlite3 命令行）写入 papers：触发器只使用内置 SQL
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE papers SET title = 'Diffusion models' WHERE id = ?", (second,))
+        conn.execute("INSERT INTO papers (arxiv_id, title, abstract) VALUES ('fts.raw', 'Raw insert', 'abstract')")
+        conn.execute('DELETE FROM papers WHERE id = ?', (first,))
+    conn.close()
+    assert [row['arxiv_id'] for row in db.search_papers('diffusion')] == ['fts.1']
+    assert [row['arxiv_id'] for row in db.search_papers('raw')] == ['fts.raw']
+    assert db.search_papers('神经网络') == [], "删除的论文应从索引中移除"
+    print("✅ 中文短语检索、高亮还原与外部连接写入均符合预期")
+    return True
+
+def test_cursor_pagination():
+    """测试游标分页：逐页翻完所有论文，不重复不遗漏（包括排序键为 NULL 的论文）"""
+    print("\n🧪 测试游标分页...")
+    from utils.pagination import decode_cursor, encode_cursor
+    db = DatabaseManager(temp_database_path('pagination.db'))
+    # 7 篇论文：有重复的发布日期，其中 3 篇没有发布日期
+    dates = ['2025-01-03', '2025-01-02', '2025-01-02', None, '2025-01-01', None, None]
+    db.bulk_insert_papers([{'arxiv_id': f'page.{i}', 'title': f'paper {i}', 'abstract': 'abstract', 'authors': [],
+                            'categories': ['cs.AI'], 'published_date': date, 'updated_date': date,
+                            'pdf_url': '', 'arxiv_url': ''} for i, date in enumerate(dates)])
+    expected = [row['id'] for row in db.get_papers_by_status('all', limit=100)]
+    assert len(expected) == len(dates)
+
+    service = RecommendationService()
+    service.db = db
+    for per_page in (1, 2, 3, 10):
+        seen, cursor = [], None
+        while True:
+            page = service.get_papers_by_status_list('all', per_page=per_page, cursor=cursor, include_total=False)
+            seen.extend(paper['id'] for paper in page['papers'])
+            cursor = page['pagination']['next_cursor']
+            if cursor is None:
+                break
+            assert encode_cursor(decode_cursor(cursor)) == cursor, "游标编码后应能原样解析"
+        assert seen == expected, f"per_page={per_page} 时游标分页结果为 {seen}，期望 {expected}"
+
+    for invalid in ('not-a-cursor', encode_cursor([{'a': 1}, 1]), encode_cursor(['2025-01-01', 'x'])):
+        try:
+            decode_cursor(invalid)
+        except ValueError:
+            continue
+        raise AssertionError(f"无效游标 {invalid} 应抛出 ValueError")
+    print("✅ 游标分页在重复与 NULL 排序键下不重复不遗漏")
+    return True
+
+def test_recommendation_wait():
+    """测试推荐队列为空时：请求添加评估任务而不是在请求内评估，“评估中”以 jobs 表为准"""
+    print("\n🧪 测试等待推荐与评估任务...")
+    with temporary_config(DATABASE_PATH=temp_database_path('recommendation_wait.db')):
+        service = RecommendationService()
+        db = service.db
+        db.set_config('USER_INTERESTS', '图神经网络')
+        db.bulk_insert_papers([{'arxiv_id': f'wait.{i}', 'title': f'paper {i}', 'abstract': 'abstract', 'authors': [],
+                                'categories': ['cs.AI'], 'published_date': '2025-01-01', 'updated_date': '2025-01-01',
+                                'pdf_url': '', 'arxiv_url': ''} for i in range(2)])
+
+        # 没有 worker：请求只添加评估任务，超时后返回 None，论文不在请求内被认领
+        assert service.get_next_recommendation(wait=True, timeout=0.6) is None
+        jobs = db.list_jobs('queued')
+        assert [job['type'] for job in jobs] == ['evaluate'], f"应只添加一个评估任务: {[dict(j) for j in jobs]}"
+        assert jobs[0]['priority'] == service.WAITING_EVALUATION_PRIORITY
+        assert service.is_evaluation_running and db.get_paper_stats()['pending'] == 2
+
+        # 另一个 worker 领取任务后租约过期（崩溃）：不再视为评估中
+        job = db.claim_job('crashed-worker', lease_seconds=60)
+        assert service.is_evaluation_running
+        db.execute_query("UPDATE jobs SET lease_expires_at = datetime('now', '-1 minute') WHERE id = ?", (job['id'],))
+        assert not service.is_evaluation_running, "租约过期的评估任务不应视为运行中"
+
+        # 其他进程评估出推荐论文后，等待中的请求取到该论文
+        paper_id = db.execute_query('SELECT id FROM papers ORDER BY id LIMIT 1')[0]['id']
+        db.update_paper_translation(paper_id, '论文', '摘要')
+        db.update_paper_evaluation(paper_id, True, True, '相关')
+        paper = service.get_next_recommendation(wait=True, timeout=1)
+        assert paper and paper['id'] == paper_id, f"应返回已评估的推荐论文: {paper}"
+    print("✅ 等待推荐通过评估任务完成，评估状态对所有进程一致")
+    return True
+
+def test_job_queue():
+    """测试任务队列：合并排队任务、按优先级领取、租约过期后接管、爬取任务串行执行，以及未完成的爬取进入重试
+    （执行期间已有同类任务排队时不重复排队）"""
+    print("\n🧪 测试任务队列与租约...")
+    from services.job_service import JobService
+
+    class IncompleteCrawl:
+        """保存了部分论文、但有分片未完成的爬取"""
+        last_crawl_report = []
+
+        def crawl_recent_papers(self, **kwargs):
+            self.last_crawl_report = [{'category': 'cs.AI', 'date': '2025-01-01', 'saved': 3, 'completed': False,
+                                       'seconds': 0.1}]
+            raise RuntimeError('1 个分片未抓取完成')
+
+    def expire(job_id):
+        db.execute_query("UPDATE jobs SET lease_expires_at = datetime('now', '-1 minute') WHERE id = ?", (job_id,))
+
+    path = temp_database_path('jobs.db')
+    with temporary_config(DATABASE_PATH=path):
+        db = DatabaseManager(path)
+        jobs = JobService(db, arxiv_service=IncompleteCrawl())
+
+        # 同一 dedupe_key 的排队任务合并，优先级取较高者；领取按优先级
+        first = jobs.enqueue('translate', dedupe_key='translate:test')
+        assert jobs.enqueue('translate', priority=30, dedupe_key='translate:test') == first
+        jobs.enqueue('summarize')
+        claimed = db.claim_job('worker-1', lease_seconds=60)
+        assert claimed['id'] == first and claimed['priority'] == 30
+
+        # 租约过期后由其他 worker 接管，原 worker 不能再提交结果
+        expire(first)
+        taken = db.claim_job('worker-2', lease_seconds=60, job_types=['translate'])
+        assert taken['id'] == first and taken['attempts'] == 2 and taken['claimed_by'] == 'worker-2'
+        assert db.complete_job(first, 'worker-1', {}) == 0, "租约已被接管的 worker 不应能提交结果"
+        assert db.complete_job(first, 'worker-2', {'translated': 1}) == 1
+
+        # 租约过期且重试次数用尽的任务标记为失败
+        last = db.enqueue_job('translate', max_attempts=1)
+        assert db.claim_job('worker-1', lease_seconds=60, job_types=['translate'])['id'] == last
+        expire(last)
+        assert db.claim_job('worker-2', lease_seconds=60, job_types=['translate']) is None
+        assert db.get_job(last)['status'] == 'failed'
+
+        # 同一时间只运行一个爬取任务，租约过期（worker 崩溃）后才能再领取
+        crawl = jobs.enqueue_crawl(['cs.AI'])
+        other_crawl = jobs.enqueue_crawl(['cs.LG'])
+        assert crawl != other_crawl
+        assert db.claim_job('worker-1', lease_seconds=60, job_types=['crawl'])['id'] == crawl
+        assert db.claim_job('worker-2', lease_seconds=60, job_types=['crawl']) is None, "已有爬取任务运行时不应领取其他爬取任务"
+        expire(crawl)
+        row = db.claim_job('worker-2', lease_seconds=60, job_types=['crawl'])
+        assert row['id'] == crawl
+
+        # 爬取未完成：任务记为失败并稍后重试，已保存的论文照常添加评估任务
+        jobs._run_claimed(jobs._to_dict(row), 'worker-2')
+        job = db.get_job(crawl)
+        assert job['status'] == 'queued' and '未抓取完成' in job['error'], f"未完成的爬取应重新排队: {dict(job)}"
+        assert db.execute_query("SELECT 1 FROM jobs WHERE type = 'evaluate' AND status = 'queued'"), "已保存的论文应添加评估任务"
+        row = db.claim_job('worker-1', lease_seconds=60, job_types=['crawl'])
+        assert row['id'] == other_crawl, "重试的爬取任务应等待退避时间"
+
+        # 执行期间已有同参数的任务排队：失败任务不再重新排队（不违反 dedupe_key 唯一约束），由排队中的任务代替
+        requeued = jobs.enqueue_crawl(['cs.LG'])
+        assert requeued != other_crawl
+        jobs._run_claimed(jobs._to_dict(row), 'worker-1')
+        job = db.get_job(other_crawl)
+        assert job['status'] == 'failed' and job['finished_at'], f"已有同类任务排队时失败任务不应重新排队: {dict(job)}"
+        assert db.get_job(requeued)['status'] == 'queued'
+    print("✅ 任务合并、优先级、租约接管、爬取串行与重试均符合预期")
+    return True
+
+def test_crawl_scheduler():
+    """测试定时爬取：跳过周末与节假日、公告时间前后的边界，以及多进程同时调度时只添加一次任务"""
+    print("\n🧪 测试定时爬取调度...")
+    from datetime import date, datetime, timezone
+    from services.crawl_scheduler import CrawlScheduler
+
+    class FakeJobService:
+        def __init__(self, db):
+            self.db = db
+            self.enqueued = 0
+
+        def enqueue_crawl(self):
+            self.enqueued += 1
+            return self.enqueued
+
+    path = temp_database_path('scheduler.db')
+    with temporary_config(DATABASE_PATH=path, CRAWL_ANNOUNCE_TIME='20:00', CRAWL_DELAY_MINUTES=30,
+                          CRAWL_ANNOUNCE_WEEKDAYS=(6, 0, 1, 2, 3), ARXIV_US_HOLIDAYS=True, ARXIV_HOLIDAYS=[]):
+        jobs = FakeJobService(DatabaseManager(path))
+        scheduler = CrawlScheduler(jobs)
+
+        def local(*args):
+            return datetime(*args, tzinfo=scheduler.tz)
+
+        def next_local(*args):
+            return scheduler.next_run_after(local(*args)).astimezone(scheduler.tz).replace(tzinfo=None)
+
+        # 周五、周六没有公告：周五晚上之后的下一次是周日 20:30
+        assert next_local(2025, 6, 6, 21, 0) == datetime(2025, 6, 8, 20, 30)
+        # 公告后延迟前仍是当晚，到达执行时间后是下一个公告日
+        assert next_local(2025, 6, 9, 20, 29) == datetime(2025, 6, 9, 20, 30)
+        assert next_local(2025, 6, 9, 20, 30) == datetime(2025, 6, 10, 20, 30)
+        # 感恩节（周四）与圣诞节（周四）跳过，顺延到周日
+        assert next_local(2025, 11, 26, 21, 0) == datetime(2025, 11, 30, 20, 30)
+        assert next_local(2025, 12, 24, 21, 0) == datetime(2025, 12, 28, 20, 30)
+        # 阵亡将士纪念日（周一）与周日节假日的周一调休日
+        assert not scheduler.is_announcement_day(date(2025, 5, 26))
+        assert not scheduler.is_announcement_day(date(2022, 6, 20)), "六月节逢周日应在周一调休"
+        assert scheduler.is_announcement_day(date(2025, 6, 9))
+        with temporary_config(ARXIV_HOLIDAYS=['2025-06-10']):
+            extra = CrawlScheduler(jobs).next_run_after(local(2025, 6, 9, 21, 0))
+            assert extra == local(2025, 6, 11, 20, 30).astimezone(timezone.utc), "ARXIV_HOLIDAYS 中的日期应跳过"
+
+        # 首次调度只记录下次执行时间；到期后只有一个进程添加任务，错过的多个时间点合并为一次
+        start = local(2025, 6, 9, 12, 0).astimezone(timezone.utc)
+        assert scheduler.tick(start) is None and jobs.enqueued == 0
+        due = scheduler.next_run()
+        assert due == local(2025, 6, 9, 20, 30).astimezone(timezone.utc)
+        assert scheduler.tick(due.replace(minute=29)) is None
+        late = local(2025, 6, 12, 9, 0).astimezone(timezone.utc)
+        assert scheduler.tick(late) == 1
+        assert CrawlScheduler(jobs).tick(late) is None, "另一个进程不应重复添加同一时间点的任务"
+        assert jobs.enqueued == 1
+        assert scheduler.next_run() == local(2025, 6, 12, 20, 30).astimezone(timezone.utc)
+    print("✅ 周末、节假日、公告时间边界与多进程调度均符合预期")
+    return True
+
+def test_stream_deltas():
+    """测试从流式响应（SSE）中提取增量文本与 token 用量"""
+    print("\n🧪 测试流式响应解析...")
+    def chunk(content=None, usage=None, role=None):
+        delta = {key: value for key, value in (('role', role), ('content', content)) if value is not None}
+        data = {'choices': [{'index': 0, 'delta': delta}] if role or content is not None else []}
+        if usage:
+            data['usage'] = usage
+        return 'data: ' + json.dumps(data, ensure_ascii=False)
+
+    usage_data = {'prompt_tokens': 12, 'completion_tokens': 3, 'total_tokens': 15}
+    lines = [
+        ': keep-alive',
+        chunk(role='assistant'),          # 只有角色、没有内容的首个片段
+        '',
+        chunk('图神经'),
+        'event: message',
+        chunk(''),                        # 空内容不输出
+        'data:' + chunk('网络')[len('data: '):],  # data: 后没有空格
+        chunk(usage=usage_data),          # include_usage 时最后一个片段 choices 为空
+        'data: [DONE]',
+        chunk('结束后的内容'),
+    ]
+    usage = {}
+    assert list(LLMService._iter_stream_deltas(lines, usage)) == ['图神经', '网络']
+    assert usage == usage_data, f"应记录流中返回的用量: {usage}"
+    assert list(LLMService._iter_stream_deltas(iter(lines))) == ['图神经', '网络'], "不传 usage 时同样输出增量文本"
+    assert list(LLMService._iter_stream_deltas([chunk('没有 [DONE] 的流')])) == ['没有 [DONE] 的流']
+    print("✅ 增量文本、空片段、心跳行与用量片段解析符合预期")
+    return True
+
+def test_summary_resume():
+    """测试收藏的分层总结：中途失败后重试从检查点恢复，已完成的分组不再请求LLM，结果与一次完成时相同"""
+    print("\n🧪 测试分层总结的断点恢复...")
+    import mock_llm_server
+    from services.favorite_summarizer import FavoriteSummarizer
+    from utils.prompt_budget import estimate_tokens
+
+    papers = [{'id': i, 'title': f'Paper {i} on graph neural networks',
+               'abstract': 'We study message passing on large graphs. ' * 5} for i in range(1, 7)]
+    # 每组两篇论文，共三组
+    budget = 2 * estimate_tokens(LLMService.summary_entry(papers[0]))
+
+    server, url = mock_llm_server.start_server(latency_ms=0)
+    answer = server.answer
+    try:
+        def make_summarizer():
+            """使用新的临时数据库（检查点为空）创建总结器，返回 (总结器, 数据库)"""
+            db = DatabaseManager(temp_database_path('summary.db'))
+            llm = LLMService()
+            llm.base_url, llm.api_key = url, 'mock'
+            # 单线程按顺序执行分组，便于确定性地注入错误
+            summarizer = FavoriteSummarizer(llm, db, max_workers=1)
+            return summarizer, db
+
+        with temporary_config(DATABASE_PATH=temp_database_path('summary_usage.db'), LLM_CACHE_ENABLED=False,
+                              LLM_SUMMARY_CHUNK_TOKEN_BUDGET=budget, LLM_SUMMARY_MERGE_FANIN=2):
+            # 一次完成的总结作为对照
+            summarizer, _ = make_summarizer()
+            before = server.snapshot().get('requests', 0)
+            expected, _ = summarizer.summarize(papers, '已有总结')
+            full_requests = server.snapshot().get('requests', 0) - before
+
+            # 前两组总结成功后LLM开始返回 500：总结失败，已完成的两组保存为检查点
+            summarizer, db = make_summarizer()
+            served = []
+
+            def failing_answer(prompt):
+                served.append(prompt)
+                if len(served) > 2:
+                    server.error_rate = 1.0
+                return answer(prompt)
+
+            server.answer = failing_answer
+            failed = False
+            try:
+                summarizer.summarize(papers, '已有总结')
+            except Exception:
+                failed = True
+            server.answer, server.error_rate = answer, 0.0
+            assert failed, "LLM返回 500 时总结应失败"
+            assert db.execute_query('SELECT COUNT(*) AS n FROM summary_checkpoints')[0]['n'] == 2
+
+            # 重试：已完成的两组从检查点读取，结果与一次完成时相同
+            before = server.snapshot().get('requests', 0)
+            summary, keys = summarizer.summarize(papers, '已有总结')
+            assert summary == expected, "从检查点恢复的总结应与一次完成时相同"
+            assert server.snapshot().get('requests', 0) - before == full_requests - 2, "已完成的分组不应重复请求"
+
+            # 保存总结后删除本次用到的检查点
+            db.save_favorite_summary(summary, [paper['id'] for paper in papers], keys)
+            assert db.get_summary_checkpoints(keys) == {}
+    finally:
+        server.answer, server.error_rate = answer, 0.0
+        server.shutdown()
+    print("✅ 分层总结失败后从检查点恢复，不重复请求已完成的分组")
+    return True
+
 def main():
     """主测试函数"""
     print("=" * 50)
     print("arxivAgent 功能测试")
     print("=" * 50)
+    if '--offline' in sys.argv[1:]:
+        start_mock_servers()
     
     tests = [
         ("数据库测试", test_database),
         ("arXiv服务测试", test_arxiv_service),
         ("LLM服务测试", test_llm_service),
-        ("推荐服务测试", test_recommendation_service)
+        ("推荐服务测试", test_recommendation_service),
+        ("执行计划测试", test_query_plans),
+        ("Atom 解析测试", test_atom_parser),
+        ("评估认领测试", test_evaluation_claims),
+        ("LLM服务不可用测试", test_llm_unavailable),
+        ("批量响应解析测试", test_parse_json_items),
+        ("LLM缓存测试", test_llm_cache_validation),
+        ("中文全文检索测试", test_fts_chinese_search),
+        ("游标分页测试", test_cursor_pagination),
+        ("等待推荐测试", test_recommendation_wait),
+        ("任务队列测试", test_job_queue),
+        ("定时爬取测试", test_crawl_scheduler),
+        ("流式响应解析测试", test_stream_deltas),
+        ("总结断点恢复测试", test_summary_resume)
     ]
     
     passed = 0
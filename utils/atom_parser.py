@@ -0,0 +1,68 @@
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, Optional
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+OPENSEARCH_NS = '{http://a9.com/-/spec/opensearch/1.1/}'
+
+_ENTRY = ATOM_NS + 'entry'
+_ID = ATOM_NS + 'id'
+_TITLE = ATOM_NS + 'title'
+_SUMMARY = ATOM_NS + 'summary'
+_PUBLISHED = ATOM_NS + 'published'
+_UPDATED = ATOM_NS + 'updated'
+_AUTHOR = ATOM_NS + 'author'
+_NAME = ATOM_NS + 'name'
+_CATEGORY = ATOM_NS + 'category'
+_TOTAL_RESULTS = OPENSEARCH_NS + 'totalResults'
+
+
+class ArxivAtomParser:
+    """arXiv Atom 响应的增量解析器
+
+    基于 `iterparse` 逐条解析 `<entry>`，每解析完一条就产出论文记录并释放对应的
+    XML 节点，内存占用与响应大小无关。`source` 可以是文件路径或任意可读的二进制流
+    （例如 `requests` 的 `response.raw`）。
+
+    产出的记录与 `ArxivService.parse_arxiv_entry` 的返回格式一致。
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.total_results: Optional[int] = None
+
+    def __iter__(self) -> Iterator[Dict]:
+        root = None
+        for event, elem in ET.iterparse(self.source, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+
+            if elem.tag == _ENTRY:
+                yield self._parse_entry(elem)
+                # 释放已处理的节点
+                elem.clear()
+                if root is not None:
+                    root.remove(elem)
+            elif elem.tag == _TOTAL_RESULTS and elem.text:
+                self.total_results = int(elem.text)
+
+    @staticmethod
+    def _parse_entry(elem) -> Dict:
+        """将单个 `<entry>` 节点转换为论文记录"""
+        arxiv_id = (elem.findtext(_ID) or '').strip().split('/abs/')[-1]
+        published = elem.findtext(_PUBLISHED)
+        updated = elem.findtext(_UPDATED)
+
+        return {
+            'arxiv_id': arxiv_id,
+            'title': (elem.findtext(_TITLE) or '').strip(),
+            'abstract': (elem.findtext(_SUMMARY) or '').strip(),
+            'authors': [(author.findtext(_NAME) or '').strip() for author in elem.iter(_AUTHOR)],
+            'categories': [tag.get('term') for tag in elem.iter(_CATEGORY) if tag.get('term')],
+            # 日期格式为 YYYY-MM-DDTHH:MM:SSZ，只保留日期部分
+            'published_date': published.strip()[:10] if published else None,
+            'updated_date': updated.strip()[:10] if updated else None,
+            'pdf_url': f'http://arxiv.org/pdf/{arxiv_id}',
+            'arxiv_url': f'http://arxiv.org/abs/{arxiv_id}'
+        }
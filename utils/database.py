@@ -1,22 +1,162 @@
 import sqlite3
 import json
+import re
 from datetime import datetime
 import os
+import threading
+import time
 from config import Config
 
+# 连接池：每个线程针对每个数据库文件复用同一个连接
+_local = threading.local()
+# 中日韩字符：FTS5 的 unicode61 分词器会把连续的汉字当作一个词，建索引前逐字切分
+_CJK_CHAR_RE = re.compile(r'([\u3400-\u9fff\uf900-\ufaff])')
+# 切分使用零宽空格：unicode61 把它当作分隔符，去掉后即可还原原文（高亮与片段的位置不受影响）
+FTS_SEPARATOR = '\u200b'
+
+
+def segment_cjk(text):
+    """在每个汉字两侧插入零宽空格，使全文检索可以按字（短语）匹配中文"""
+    if not text:
+        return text
+    return _CJK_CHAR_RE.sub(FTS_SEPARATOR + r'\1' + FTS_SEPARATOR, text)
+
+
+def desegment_cjk(text):
+    """还原 `segment_cjk` 切分过的文本（如 FTS5 的 highlight/snippet 输出）"""
+    if not text:
+        return text
+    return text.replace(FTS_SEPARATOR, '')
+
+
+# 论文计数缓存：{db_path: (stats, expires_at)}，本进程写入后失效，其他进程的写入最多延迟 STATS_CACHE_TTL 秒
+_stats_cache = {}
+# 已完成表结构初始化的数据库文件（每个进程只初始化一次）
+_initialized_paths = set()
+_init_lock = threading.Lock()
+
+
 class DatabaseManager:
     """数据库管理工具类"""
-    
+
+    # 用户状态：'none' | 'favorite' | 'maybe_later' | 'dislike'（与 models/paper.py 中的 user_status 一致）
+    USER_STATUS_EXPR = (
+        "CASE WHEN favorite = 1 THEN 'favorite' "
+        "WHEN maybe_later = 1 THEN 'maybe_later' "
+        "WHEN disliked = 1 THEN 'dislike' "
+        "ELSE 'none' END"
+    )
+
+    PAPER_INDEXES = {
+        # 论文库默认排序
+        'idx_papers_published': '(published_date)',
+        # 待评估论文（get_papers_for_recommendation / 待评估计数）
+        'idx_papers_pending': '(llm_evaluated, is_recommended, published_date)',
+        # 论文库按评估状态筛选
+        'idx_papers_evaluated': '(llm_evaluated, published_date)',
+        # 已推荐未处理论文（get_recommended_unseen / 未读计数 / 论文库“未读”）
+        'idx_papers_unseen': '(is_recommended, user_status, llm_evaluated, published_date)',
+        # 收藏、稍后再说与不喜欢列表
+        'idx_papers_favorite': '(favorite, favorite_marked_at)',
+        'idx_papers_maybe_later': '(maybe_later, maybe_later_marked_at)',
+        'idx_papers_disliked': '(disliked, published_date)',
+        # 被向量预筛选淘汰的论文
+        'idx_papers_evaluated_by': '(evaluated_by, published_date)',
+        # 认领中的论文（认领时回收租约到期的论文）
+        'idx_papers_eval_claimed': '(eval_claimed_at) WHERE eval_claimed_by IS NOT NULL',
+    }
+
+    # 论文库筛选条件
+    PAPER_STATUS_FILTERS = {
+        'unassessed': 'llm_evaluated = 0',
+        # 由LLM评估过的论文（不含被向量预筛选直接淘汰的论文）
+        'assessed': "llm_evaluated = 1 AND evaluated_by IS NOT 'prefilter'",
+        'prefiltered': "evaluated_by = 'prefilter'",
+        # 已被LLM评估且被LLM推荐，但用户尚未对其进行任何标记（未收藏/未稍后/未标记为不喜欢）
+        'unread': "is_recommended = 1 AND user_status = 'none' AND llm_evaluated = 1",
+        'favorite': 'favorite = 1',
+        'disliked': 'disliked = 1',
+        'maybe_later': 'maybe_later = 1',
+    }
+
+    # 待评估论文：未评估、未推荐，且没有因多次评估失败而被放弃
+    PENDING_CONDITION = 'llm_evaluated = 0 AND is_recommended = 0 AND eval_failed = 0'
+
+    # paper_stats 表维护的计数：论文总数、待评估数、评估失败数与各筛选状态的数量
+    PAPER_STATS_FILTERS = {
+        'all': '1',
+        'pending': PENDING_CONDITION,
+        'eval_failed': 'eval_failed = 1 AND llm_evaluated = 0',
+        **PAPER_STATUS_FILTERS,
+    }
+    # 计数条件涉及的列（触发器只在这些列变化时更新计数）
+    PAPER_STATS_COLUMNS = ('llm_evaluated', 'is_recommended', 'favorite', 'maybe_later', 'disliked', 'eval_failed',
+                           'evaluated_by')
+
+    # 全文检索的列及其 BM25 权重（标题权重最高）
+    FTS_COLUMNS = ('title', 'abstract', 'authors', 'chinese_title_fts', 'chinese_abstract_fts')
+    # 中文列 -> 逐字切分后的影子列（写入翻译时在 Python 中切分，索引与触发器只使用内置 SQL）
+    FTS_CJK_COLUMNS = {'chinese_title': 'chinese_title_fts', 'chinese_abstract': 'chinese_abstract_fts'}
+    FTS_RANK = 'bm25(10.0, 1.0, 3.0, 10.0, 1.0)'
+
+    # 管理界面批量操作：动作 -> SET 子句（与 mark_* / unmark_* 方法一致）
+    BULK_UPDATE_ACTIONS = {
+        'favorite': "favorite = 1, favorite_marked_at = datetime('now')",
+        'unfavorite': 'favorite = 0, favorite_marked_at = NULL',
+        'maybe_later': "maybe_later = 1, maybe_later_marked_at = datetime('now')",
+        'unmaybe': 'maybe_later = 0, maybe_later_marked_at = NULL',
+        'dislike': 'disliked = 1',
+    }
+
+    INSERT_PAPER_QUERY = '''
+        INSERT OR IGNORE INTO papers
+        (arxiv_id, title, abstract, authors, categories, published_date, updated_date, pdf_url, arxiv_url)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
     def __init__(self, db_path=None):
         self.db_path = db_path or Config.DATABASE_PATH
-        self.init_database()
+        # 多个 DatabaseManager 实例共享连接池，表结构只初始化一次
+        if self.db_path not in _initialized_paths:
+            with _init_lock:
+                if self.db_path not in _initialized_paths:
+                    self.init_database()
+                    _initialized_paths.add(self.db_path)
+
+    def get_connection(self):
+        """获取当前线程的数据库连接（首次调用时创建并设置 PRAGMA）"""
+        connections = getattr(_local, 'connections', None)
+        # 进程 fork 后不能复用父进程的连接
+        if connections is None or getattr(_local, 'pid', None) != os.getpid():
+            connections = _local.connections = {}
+            _local.pid = os.getpid()
+
+        conn = connections.get(self.db_path)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=Config.DB_BUSY_TIMEOUT)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute(f'PRAGMA cache_size = -{int(Config.DB_CACHE_SIZE_KB)}')
+            conn.execute(f'PRAGMA mmap_size = {int(Config.DB_MMAP_SIZE)}')
+            conn.execute('PRAGMA temp_store = MEMORY')
+            connections[self.db_path] = conn
+        return conn
+
+    def close_connection(self):
+        """关闭当前线程持有的连接"""
+        connections = getattr(_local, 'connections', None)
+        if connections and getattr(_local, 'pid', None) == os.getpid():
+            conn = connections.pop(self.db_path, None)
+            if conn is not None:
+                conn.close()
     
     def init_database(self):
         """初始化数据库表"""
         # 确保数据目录存在
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         # 为了简化测试环境，直接在 papers 表内保存收藏/稍后/不喜欢等状态，移除单独表
         # 如果存在旧的 favorites / maybe_later 表，先删除（测试环境允许直接删除）
@@ -27,7 +167,7 @@ class DatabaseManager:
             pass
 
         # 创建论文表（包含收藏/稍后/不喜欢等字段）
-        cursor.execute('''
+        cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS papers (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 arxiv_id TEXT UNIQUE NOT NULL,
@@ -44,13 +184,22 @@ class DatabaseManager:
                 recommendation_reason TEXT,
                 chinese_title TEXT,
                 chinese_abstract TEXT,
+                chinese_title_fts TEXT,
+                chinese_abstract_fts TEXT,
                 favorite BOOLEAN DEFAULT FALSE,
                 favorite_marked_at TEXT,
                 maybe_later BOOLEAN DEFAULT FALSE,
                 maybe_later_marked_at TEXT,
                 disliked BOOLEAN DEFAULT FALSE,
                 is_summarized BOOLEAN DEFAULT FALSE,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                eval_claimed_by TEXT,
+                eval_claimed_at TEXT,
+                eval_attempts INTEGER DEFAULT 0,
+                eval_failed BOOLEAN DEFAULT FALSE,
+                prefilter_score REAL,
+                evaluated_by TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                user_status TEXT GENERATED ALWAYS AS ({self.USER_STATUS_EXPR}) VIRTUAL
             )
         ''')
         
@@ -63,7 +212,88 @@ class DatabaseManager:
                 updated_at TEXT DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+
+        # 创建LLM响应缓存表（键为请求参数的哈希）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)')
+
+        # 创建LLM用量表：每次实际发出的请求一行（缓存命中不计），token 数取自响应中的 usage 字段
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                model TEXT,
+                purpose TEXT NOT NULL,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0,
+                estimated BOOLEAN NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL DEFAULT (datetime('now'))
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_usage_created_at ON llm_usage (created_at)')
+
+        # 创建收藏总结检查点表：分层总结中已完成的分组/合并结果，键为输入内容的哈希
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS summary_checkpoints (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at TEXT NOT NULL DEFAULT (datetime('now'))
+            )
+        ''')
+
+        # 创建论文向量表（float32 向量以 BLOB 存储）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS paper_embeddings (
+                paper_id INTEGER PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL
+            )
+        ''')
         
+        # 创建后台任务表（爬取、评估、翻译、总结等，由 worker 进程按租约领取）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL,
+                payload TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL DEFAULT 'queued',
+                priority INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                run_after TEXT NOT NULL DEFAULT (datetime('now')),
+                dedupe_key TEXT,
+                claimed_by TEXT,
+                lease_expires_at TEXT,
+                result TEXT,
+                error TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                started_at TEXT,
+                finished_at TEXT
+            )
+        ''')
+        # 领取顺序：优先级高的先执行，同优先级先进先出
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, priority DESC, id)')
+        # 按类型查询任务状态（是否有运行中的评估/爬取任务、最近一次评估）
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_type_status ON jobs (type, status, finished_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_type_started ON jobs (type, started_at)')
+        # 同一 dedupe_key 最多只有一个排队中的任务
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs (dedupe_key) WHERE status = 'queued'")
+
+        # 早期版本的全文检索触发器调用自定义函数 fts_segment，其他连接（如命令行工具）写入时会失败；
+        # 先删除旧索引与触发器，下面按影子列重建
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'papers_fts_%' AND sql LIKE '%fts_segment%'")
+        if cursor.fetchone() is not None:
+            for name in ('papers_fts_ai', 'papers_fts_ad', 'papers_fts_au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute('DROP TABLE IF EXISTS papers_fts')
+
         # 对于可能存在的旧表结构，尝试按需添加缺失列（更稳健）
         cursor.execute("PRAGMA table_info(papers)")
         columns = [column[1] for column in cursor.fetchall()]
@@ -71,12 +301,20 @@ class DatabaseManager:
             'recommendation_reason': 'TEXT',
             'chinese_title': 'TEXT',
             'chinese_abstract': 'TEXT',
+            'chinese_title_fts': 'TEXT',
+            'chinese_abstract_fts': 'TEXT',
             'favorite': 'BOOLEAN',
             'favorite_marked_at': 'TEXT',
             'maybe_later': 'BOOLEAN',
             'maybe_later_marked_at': 'TEXT',
             'disliked': 'BOOLEAN',
-            'is_summarized': 'BOOLEAN'
+            'is_summarized': 'BOOLEAN',
+            'eval_claimed_by': 'TEXT',
+            'eval_claimed_at': 'TEXT',
+            'eval_attempts': 'INTEGER DEFAULT 0',
+            'eval_failed': 'BOOLEAN DEFAULT FALSE',
+            'prefilter_score': 'REAL',
+            'evaluated_by': 'TEXT'
         }
         for col, coltype in needed_cols.items():
             if col not in columns:
@@ -84,11 +322,17 @@ class DatabaseManager:
                     cursor.execute(f'ALTER TABLE papers ADD COLUMN {col} {coltype}')
                 except Exception:
                     pass
+        if 'evaluated_by' not in columns:
+            # 旧数据中被向量预筛选淘汰的论文只能从评估理由识别
+            cursor.execute("""
+                UPDATE papers SET evaluated_by = 'prefilter'
+                WHERE llm_evaluated = 1 AND prefilter_score IS NOT NULL AND recommendation_reason LIKE '向量预筛选未通过%'
+            """)
 
         # 如果旧表包含 `favorite_note` 列，则进行迁移：创建新表并复制数据（不包含该列）
         if 'favorite_note' in columns:
             # 构建新表结构（与上面 CREATE TABLE 一致）
-            cursor.execute('''
+            cursor.execute(f'''
                 CREATE TABLE IF NOT EXISTS papers_new (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     arxiv_id TEXT UNIQUE NOT NULL,
@@ -105,13 +349,22 @@ class DatabaseManager:
                     recommendation_reason TEXT,
                     chinese_title TEXT,
                     chinese_abstract TEXT,
+                    chinese_title_fts TEXT,
+                    chinese_abstract_fts TEXT,
                     favorite BOOLEAN DEFAULT FALSE,
                     favorite_marked_at TEXT,
                     maybe_later BOOLEAN DEFAULT FALSE,
                     maybe_later_marked_at TEXT,
                     disliked BOOLEAN DEFAULT FALSE,
                     is_summarized BOOLEAN DEFAULT FALSE,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    eval_claimed_by TEXT,
+                    eval_claimed_at TEXT,
+                    eval_attempts INTEGER DEFAULT 0,
+                    eval_failed BOOLEAN DEFAULT FALSE,
+                    prefilter_score REAL,
+                    evaluated_by TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    user_status TEXT GENERATED ALWAYS AS ({self.USER_STATUS_EXPR}) VIRTUAL
                 )
             ''')
 
@@ -124,14 +377,142 @@ class DatabaseManager:
             # 刷新 columns 变量
             cursor.execute("PRAGMA table_info(papers)")
             columns = [column[1] for column in cursor.fetchall()]
-        
+
+        # 用户状态列：由 favorite / maybe_later / disliked 派生的虚拟生成列（PRAGMA table_info 不显示生成列）
+        cursor.execute("PRAGMA table_xinfo(papers)")
+        if 'user_status' not in [column[1] for column in cursor.fetchall()]:
+            cursor.execute(f'ALTER TABLE papers ADD COLUMN user_status TEXT GENERATED ALWAYS AS ({self.USER_STATUS_EXPR}) VIRTUAL')
+
+        # 将旧数据中为 NULL 的状态标记统一为 0，使查询条件可以直接使用索引
+        for col in ('is_recommended', 'llm_evaluated', 'favorite', 'maybe_later', 'disliked', 'is_summarized',
+                    'eval_attempts', 'eval_failed'):
+            cursor.execute(f'UPDATE papers SET {col} = 0 WHERE {col} IS NULL')
+
+        # 列表按标记时间做键集分页，补齐旧数据中缺失的标记时间
+        cursor.execute('UPDATE papers SET favorite_marked_at = created_at WHERE favorite = 1 AND favorite_marked_at IS NULL')
+        cursor.execute('UPDATE papers SET maybe_later_marked_at = created_at WHERE maybe_later = 1 AND maybe_later_marked_at IS NULL')
+
+        # 热点查询所需的索引
+        for name, definition in self.PAPER_INDEXES.items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON papers {definition}')
+
+        # 全文检索：外部内容表，由触发器与 papers 保持同步。
+        # 中文列索引的是影子列（写入翻译时已逐字切分），触发器只使用内置 SQL，任何连接都可以写入 papers
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'papers_fts'")
+        fts_exists = cursor.fetchone() is not None
+        fts_cols = ', '.join(self.FTS_COLUMNS)
+        new_cols = ', '.join(f'new.{c}' for c in self.FTS_COLUMNS)
+        old_cols = ', '.join(f'old.{c}' for c in self.FTS_COLUMNS)
+        if not fts_exists:
+            self._fill_fts_shadow_columns(cursor)
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                {fts_cols}, content='papers', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS papers_fts_ai AFTER INSERT ON papers BEGIN
+                INSERT INTO papers_fts (rowid, {fts_cols}) VALUES (new.id, {new_cols});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS papers_fts_ad AFTER DELETE ON papers BEGIN
+                INSERT INTO papers_fts (papers_fts, rowid, {fts_cols}) VALUES ('delete', old.id, {old_cols});
+            END
+        ''')
+        # 只有检索列变化时才更新索引，状态标记的更新不受影响
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS papers_fts_au AFTER UPDATE OF {fts_cols} ON papers BEGIN
+                INSERT INTO papers_fts (papers_fts, rowid, {fts_cols}) VALUES ('delete', old.id, {old_cols});
+                INSERT INTO papers_fts (rowid, {fts_cols}) VALUES (new.id, {new_cols});
+            END
+        ''')
+        if not fts_exists:
+            cursor.execute(f"INSERT INTO papers_fts (papers_fts, rank) VALUES ('rank', '{self.FTS_RANK}')")
+            # 已有论文的旧数据库：从 papers（含影子列）一次性建立索引
+            cursor.execute("INSERT INTO papers_fts (papers_fts) VALUES ('rebuild')")
+
+        # 删除论文时同步删除其向量
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS papers_embeddings_ad AFTER DELETE ON papers BEGIN
+                DELETE FROM paper_embeddings WHERE paper_id = old.id;
+            END
+        ''')
+
+        self._init_paper_stats(cursor)
+
         conn.commit()
-        conn.close()
+
+    def _fill_fts_shadow_columns(self, cursor, chunk_size=1000):
+        """为已有翻译的论文填充逐字切分的影子列（建立全文索引之前调用）"""
+        rows = cursor.execute('''
+            SELECT id, chinese_title, chinese_abstract FROM papers
+            WHERE chinese_title IS NOT NULL OR chinese_abstract IS NOT NULL
+        ''').fetchall()
+        for start in range(0, len(rows), chunk_size):
+            cursor.executemany(
+                'UPDATE papers SET chinese_title_fts = ?, chinese_abstract_fts = ? WHERE id = ?',
+                [(segment_cjk(row[1]), segment_cjk(row[2]), row[0]) for row in rows[start:start + chunk_size]]
+            )
+
+    def _init_paper_stats(self, cursor):
+        """创建按状态计数的 paper_stats 表及维护计数的触发器。
+
+        计数与论文的增删改在同一事务内更新，读取计数的代价与论文数量无关。
+        触发器定义（计数条件）变化或计数项不一致时，重建触发器并全表统计一次。
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS paper_stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        ''')
+
+        # 单行派生表上按计数项求值：每个条件为真时该计数项 +1
+        def delta(prefix):
+            row = ', '.join(f'{prefix}.{col} AS {col}' for col in (*self.PAPER_STATS_COLUMNS, 'user_status'))
+            cases = ' '.join(
+                f"WHEN '{name}' THEN IFNULL(({condition}), 0)" for name, condition in self.PAPER_STATS_FILTERS.items()
+            )
+            return f'(SELECT CASE paper_stats.name {cases} ELSE 0 END FROM (SELECT {row}))'
+
+        triggers = {
+            'papers_stats_ai': f'''CREATE TRIGGER papers_stats_ai AFTER INSERT ON papers BEGIN
+                UPDATE paper_stats SET value = value + {delta('new')};
+            END''',
+            'papers_stats_ad': f'''CREATE TRIGGER papers_stats_ad AFTER DELETE ON papers BEGIN
+                UPDATE paper_stats SET value = value - {delta('old')};
+            END''',
+            'papers_stats_au': f'''CREATE TRIGGER papers_stats_au AFTER UPDATE OF {', '.join(self.PAPER_STATS_COLUMNS)} ON papers BEGIN
+                UPDATE paper_stats SET value = value + {delta('new')} - {delta('old')};
+            END''',
+        }
+
+        cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'papers_stats_%'")
+        existing = {row[0]: row[1] for row in cursor.fetchall()}
+        cursor.execute('SELECT name FROM paper_stats')
+        names = {row[0] for row in cursor.fetchall()}
+        if existing == triggers and names == set(self.PAPER_STATS_FILTERS):
+            return
+
+        for name in existing:
+            cursor.execute(f'DROP TRIGGER {name}')
+        for sql in triggers.values():
+            cursor.execute(sql)
+        self._rebuild_paper_stats(cursor)
+
+    def _rebuild_paper_stats(self, cursor):
+        """全表统计一次，重写 paper_stats"""
+        cursor.execute('DELETE FROM paper_stats')
+        for name, condition in self.PAPER_STATS_FILTERS.items():
+            cursor.execute(
+                f'INSERT INTO paper_stats (name, value) SELECT ?, COUNT(*) FROM papers WHERE {condition}', (name,)
+            )
+        _stats_cache.pop(self.db_path, None)
     
     def execute_query(self, query, params=None):
         """执行查询"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self.get_connection()
         cursor = conn.cursor()
         
         try:
@@ -144,23 +525,65 @@ class DatabaseManager:
                 result = cursor.fetchall()
             else:
                 conn.commit()
+                self._invalidate_stats()
                 result = cursor.lastrowid if 'INSERT' in query.upper() else cursor.rowcount
-            
+
             return result
+        except Exception:
+            conn.rollback()
+            raise
         finally:
-            conn.close()
+            cursor.close()
     
     def insert_paper(self, paper_data):
         """插入论文数据。
 
         返回值：插入的行数（1 表示插入成功，0 表示由于 arxiv_id 已存在而被忽略）。
         """
-        query = '''
-            INSERT OR IGNORE INTO papers 
-            (arxiv_id, title, abstract, authors, categories, published_date, updated_date, pdf_url, arxiv_url)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        '''
-        params = (
+        conn = self.get_connection()
+        with conn:
+            cursor = conn.execute(self.INSERT_PAPER_QUERY, self._paper_params(paper_data))
+        self._invalidate_stats()
+        # cursor.rowcount 在 INSERT OR IGNORE 的情况下会反映是否插入（1 或 0）
+        return cursor.rowcount
+
+    def bulk_insert_papers(self, papers, chunk_size=500):
+        """批量插入论文数据。
+
+        在同一个连接上按 `chunk_size` 分块执行 `executemany`，每块一个事务。
+        返回 {'inserted': 插入数量, 'ignored': 因 arxiv_id 已存在而被忽略的数量}。
+        """
+        inserted = 0
+        ignored = 0
+        conn = self.get_connection()
+
+        chunk = []
+        for paper_data in papers:
+            chunk.append(self._paper_params(paper_data))
+            if len(chunk) >= chunk_size:
+                count = self._insert_paper_chunk(conn, chunk)
+                inserted += count
+                ignored += len(chunk) - count
+                chunk = []
+        if chunk:
+            count = self._insert_paper_chunk(conn, chunk)
+            inserted += count
+            ignored += len(chunk) - count
+
+        return {'inserted': inserted, 'ignored': ignored}
+
+    def _insert_paper_chunk(self, conn, params_list):
+        """在一个事务中插入一块论文，返回实际插入的行数"""
+        # 使用 rowcount 而不是 total_changes：后者包含触发器（全文索引、计数）写入的行
+        with conn:
+            cursor = conn.executemany(self.INSERT_PAPER_QUERY, params_list)
+        self._invalidate_stats()
+        return cursor.rowcount
+
+    @staticmethod
+    def _paper_params(paper_data):
+        """将论文数据转换为 INSERT_PAPER_QUERY 的参数"""
+        return (
             paper_data['arxiv_id'],
             paper_data['title'],
             paper_data['abstract'],
@@ -171,15 +594,6 @@ class DatabaseManager:
             paper_data.get('pdf_url'),
             paper_data.get('arxiv_url')
         )
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        try:
-            cursor.execute(query, params)
-            conn.commit()
-            # cursor.rowcount 在 INSERT OR IGNORE 的情况下会反映是否插入（1 或 0）
-            return cursor.rowcount
-        finally:
-            conn.close()
 
     # 新的状态操作方法（将 favorite / maybe_later / disliked 状态保存在 papers 表）
     def mark_favorite(self, paper_id, user_note=None):
@@ -216,76 +630,543 @@ class DatabaseManager:
         '''
         return self.execute_query(query, (paper_id,))
 
-    def get_favorites(self, limit=10, offset=0):
-        query = '''
-            SELECT *, id as paper_id FROM papers
-            WHERE favorite = 1
-            ORDER BY favorite_marked_at DESC
-            LIMIT ? OFFSET ?
-        '''
-        return self.execute_query(query, (limit, offset))
+    def bulk_update_status(self, paper_ids, action, chunk_size=None):
+        """在一个事务中批量修改论文标记（action 取值见 BULK_UPDATE_ACTIONS），返回更新的行数"""
+        assignments = self.BULK_UPDATE_ACTIONS.get(action)
+        if assignments is None:
+            raise ValueError(f'不支持的批量操作: {action}')
+        query = f'UPDATE papers SET {assignments} WHERE id IN (SELECT value FROM json_each(?))'
+        return self._execute_for_ids(query, paper_ids, chunk_size)
+
+    def bulk_delete_papers(self, paper_ids, chunk_size=None):
+        """在一个事务中批量删除论文，返回删除的行数"""
+        return self._execute_for_ids('DELETE FROM papers WHERE id IN (SELECT value FROM json_each(?))', paper_ids, chunk_size)
+
+    def _execute_for_ids(self, query, paper_ids, chunk_size=None):
+        """以 JSON 数组传入论文ID执行 `query`（不受 SQLite 参数个数限制）。
+
+        ID 很多时按 `chunk_size`（默认 `Config.BULK_ID_CHUNK_SIZE`）分块执行，所有分块在同一个事务中提交。
+        """
+        ids = [int(paper_id) for paper_id in paper_ids]
+        chunk_size = chunk_size or Config.BULK_ID_CHUNK_SIZE
+        conn = self.get_connection()
+        changed = 0
+        with conn:
+            for start in range(0, len(ids), chunk_size):
+                changed += conn.execute(query, (json.dumps(ids[start:start + chunk_size]),)).rowcount
+        self._invalidate_stats()
+        return changed
+
+    def delete_disliked_papers(self, before_date=None):
+        """删除被标记为不喜欢、且未被收藏或标记为稍后再说的论文；传入 before_date 时只删除发表日期更早的论文"""
+        query = 'DELETE FROM papers WHERE disliked = 1 AND favorite = 0 AND maybe_later = 0'
+        if before_date is None:
+            return self.execute_query(query)
+        return self.execute_query(query + ' AND published_date < ?', (before_date,))
+
+    def get_favorites(self, limit=10, offset=0, after=None):
+        """按收藏时间倒序获取收藏论文；`after` 为上一页最后一条的 (favorite_marked_at, id)"""
+        return self._page_query('favorite = 1', 'favorite_marked_at', limit, offset, after)
 
     def count_favorites(self):
-        query = 'SELECT COUNT(*) as total FROM papers WHERE favorite = 1'
-        res = self.execute_query(query)
-        return res[0]['total'] if res else 0
+        return self.get_paper_stats()['favorite']
 
-    def get_maybe_later(self, limit=10, offset=0):
-        query = '''
-            SELECT *, id as paper_id FROM papers
-            WHERE maybe_later = 1
-            ORDER BY maybe_later_marked_at DESC
-            LIMIT ? OFFSET ?
-        '''
-        return self.execute_query(query, (limit, offset))
+    def get_maybe_later(self, limit=10, offset=0, after=None):
+        """按标记时间倒序获取稍后再说论文；`after` 为上一页最后一条的 (maybe_later_marked_at, id)"""
+        return self._page_query('maybe_later = 1', 'maybe_later_marked_at', limit, offset, after)
 
-    def get_recommended_unseen(self, limit=10, offset=0):
+    def get_recommended_unseen(self, limit=10, offset=0, after=None):
         """获取已被LLM标记为推荐但尚未被用户处理的论文（未收藏/未标记为稍后/未标记为不感兴趣）"""
-        query = '''
-            SELECT *, id as paper_id FROM papers
-            WHERE is_recommended = 1
-            AND (favorite IS NULL OR favorite = 0)
-            AND (maybe_later IS NULL OR maybe_later = 0)
-            AND (disliked IS NULL OR disliked = 0)
-            ORDER BY published_date DESC
-            LIMIT ? OFFSET ?
-        '''
-        return self.execute_query(query, (limit, offset))
+        return self._page_query(self.PAPER_STATUS_FILTERS['unread'], 'published_date', limit, offset, after)
+
+    def count_pending(self):
+        """统计待评估（未由LLM评估且未标记为推荐）的论文数量"""
+        return self.get_paper_stats()['pending']
+
+    def count_recommended_unseen(self):
+        """统计推荐队列（已推荐且用户尚未处理）中的论文数"""
+        return self.get_paper_stats()['unread']
 
     def count_maybe_later(self):
-        query = 'SELECT COUNT(*) as total FROM papers WHERE maybe_later = 1'
-        res = self.execute_query(query)
-        return res[0]['total'] if res else 0
+        return self.get_paper_stats()['maybe_later']
+
+    def get_papers_by_status(self, status='all', limit=50, offset=0, after=None):
+        """按论文库筛选状态分页获取论文（status 取值见 PAPER_STATUS_FILTERS）"""
+        return self._page_query(self.PAPER_STATUS_FILTERS.get(status), 'published_date', limit, offset, after)
+
+    def count_papers_by_status(self, status='all'):
+        return self.get_paper_stats()[status if status in self.PAPER_STATUS_FILTERS else 'all']
+
+    def _page_query(self, condition, sort_column, limit, offset=0, after=None):
+        """按 (sort_column, id) 倒序分页。
+
+        传入 `after`（上一页最后一条的 (sort_column, id)）时使用键集分页，直接从索引定位，
+        耗时与页码无关；否则退回 OFFSET 分页以兼容按页码访问。
+        倒序时 sort_column 为 NULL 的论文排在最后，行值比较不会匹配 NULL，单独按 id 继续分页。
+        """
+        def fetch(extra_clause, params, order_by, limit, offset):
+            clauses = [c for c in (condition, extra_clause) if c]
+            where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+            query = f'''
+                SELECT *, id as paper_id FROM papers {where_sql}
+                ORDER BY {order_by}
+                LIMIT ? OFFSET ?
+            '''
+            return self.execute_query(query, (*params, limit, offset))
+
+        if after is None:
+            return fetch(None, (), f'{sort_column} DESC, id DESC', limit, offset)
+
+        sort_value, last_id = after
+        if sort_value is None:
+            return fetch(f'{sort_column} IS NULL AND id < ?', (last_id,), 'id DESC', limit, 0)
+        rows = fetch(f'({sort_column}, id) < (?, ?)', (sort_value, last_id), f'{sort_column} DESC, id DESC', limit, 0)
+        if len(rows) < limit:
+            rows = list(rows) + fetch(f'{sort_column} IS NULL', (), 'id DESC', limit - len(rows), 0)
+        return rows
+
+    def get_paper_stats(self):
+        """返回各状态的论文数量 {计数项: 数量}（计数项见 PAPER_STATS_FILTERS）。
+
+        读取由触发器维护的 paper_stats 表，结果缓存到本进程下一次写入，
+        其他进程（如独立的爬虫）写入后最多 `Config.STATS_CACHE_TTL` 秒可见。
+        """
+        hit = _stats_cache.get(self.db_path)
+        if hit and hit[1] > time.monotonic():
+            return dict(hit[0])
+        rows = self.execute_query('SELECT name, value FROM paper_stats')
+        stats = {name: 0 for name in self.PAPER_STATS_FILTERS}
+        stats.update({row['name']: row['value'] for row in rows})
+        _stats_cache[self.db_path] = (stats, time.monotonic() + Config.STATS_CACHE_TTL)
+        return dict(stats)
+
+    def rebuild_paper_stats(self):
+        """重新全表统计各状态的论文数量（触发器维护的计数出现偏差时使用）"""
+        conn = self.get_connection()
+        with conn:
+            self._rebuild_paper_stats(conn.cursor())
+        return self.get_paper_stats()
+
+    def _invalidate_stats(self):
+        _stats_cache.pop(self.db_path, None)
     
+    @staticmethod
+    def build_fts_query(text):
+        """把用户输入转换为 FTS5 查询：每个词作为短语（汉字逐字切分）以 AND 连接，避免特殊字符导致语法错误"""
+        phrases = []
+        for term in re.findall(r'\w+', text or ''):
+            phrases.append('"' + ' '.join(segment_cjk(term).replace(FTS_SEPARATOR, ' ').split()) + '"')
+        return ' '.join(phrases)
+
+    def search_papers(self, text, status='all', limit=20, offset=0):
+        """全文检索论文，按 BM25 相关度排序（status 取值见 PAPER_STATUS_FILTERS）。
+
+        BM25 需要为每篇匹配的论文打分，常见词在大型论文库中会匹配几十万篇论文；
+        匹配数超过 `Config.SEARCH_RANK_WINDOW` 时只在最新的这部分匹配论文中排序和按状态过滤。
+        返回按相关度排序的字典列表，额外包含高亮后的 `title_highlight`、`chinese_title_highlight`
+        与摘要片段 `abstract_snippet`、`chinese_abstract_snippet`（中文已还原为未切分的原文）。
+        """
+        match = self.build_fts_query(text)
+        if not match:
+            return []
+
+        # rowid 随写入递增，按 rowid 倒序跳过窗口大小即可得到窗口下界（代价与窗口大小成正比）
+        rows = self.execute_query(
+            'SELECT rowid FROM papers_fts WHERE papers_fts MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?',
+            (match, Config.SEARCH_RANK_WINDOW)
+        )
+        min_rowid = rows[0]['rowid'] if rows else 0
+
+        # 先只取排序后的一页 rowid，再为这一页生成高亮和片段（否则会为窗口内每篇论文生成片段）。
+        # 不输出 rank 列：FTS5 会为输出再计算一遍 BM25
+        condition = self.PAPER_STATUS_FILTERS.get(status)
+        status_sql = f'AND {condition}' if condition else ''
+        join_sql = 'JOIN papers ON papers.id = papers_fts.rowid' if condition else ''
+        ranked = self.execute_query(f'''
+            SELECT papers_fts.rowid AS id FROM papers_fts {join_sql}
+            WHERE papers_fts MATCH ? AND papers_fts.rowid > ? {status_sql}
+            ORDER BY papers_fts.rank
+            LIMIT ? OFFSET ?
+        ''', (match, min_rowid, limit, offset))
+        if not ranked:
+            return []
+
+        rows = self.execute_query('''
+            SELECT papers.*, papers.id as paper_id,
+                   highlight(papers_fts, 0, '<mark>', '</mark>') AS title_highlight,
+                   snippet(papers_fts, 1, '<mark>', '</mark>', '…', 32) AS abstract_snippet,
+                   highlight(papers_fts, 3, '<mark>', '</mark>') AS chinese_title_highlight,
+                   snippet(papers_fts, 4, '<mark>', '</mark>', '…', 64) AS chinese_abstract_snippet
+            FROM papers_fts JOIN papers ON papers.id = papers_fts.rowid
+            WHERE papers_fts MATCH ? AND papers_fts.rowid IN (SELECT value FROM json_each(?))
+        ''', (match, json.dumps([row['id'] for row in ranked])))
+        by_id = {}
+        for row in rows:
+            paper = dict(row)
+            for shadow in self.FTS_CJK_COLUMNS.values():
+                paper.pop(shadow, None)
+            # 影子列中的中文是切分过的，去掉分隔符还原原文
+            paper['chinese_title_highlight'] = desegment_cjk(paper['chinese_title_highlight'])
+            paper['chinese_abstract_snippet'] = desegment_cjk(paper['chinese_abstract_snippet'])
+            by_id[paper['id']] = paper
+
+        return [by_id[row['id']] for row in ranked if row['id'] in by_id]
+
     def get_papers_for_recommendation(self, limit=10):
         """获取待推荐的论文"""
-        query = '''
+        query = f'''
             SELECT * FROM papers 
-            WHERE llm_evaluated = FALSE AND is_recommended = FALSE
+            WHERE {self.PENDING_CONDITION}
             ORDER BY published_date DESC
             LIMIT ?
         '''
         return self.execute_query(query, (limit,))
     
+    def claim_papers_for_evaluation(self, worker_id, limit=1, lease_seconds=300, max_attempts=None):
+        """认领待评估的论文，保证多个评估线程/进程不会重复评估同一篇论文。
+
+        只会认领未被认领或认领已超过 `lease_seconds` 的论文，返回被认领的论文行。
+        每次认领计为一次评估尝试；租约到期时已尝试 `max_attempts`（默认 `Config.EVAL_MAX_ATTEMPTS`）次的论文
+        不再被认领，而是标记为评估失败。
+        """
+        max_attempts = max_attempts or Config.EVAL_MAX_ATTEMPTS
+        expired = f'-{int(lease_seconds)} seconds'
+        query = f'''
+            UPDATE papers
+            SET eval_claimed_by = ?, eval_claimed_at = datetime('now'), eval_attempts = eval_attempts + 1
+            WHERE id IN (
+                SELECT id FROM papers
+                WHERE {self.PENDING_CONDITION} AND eval_attempts < ?
+                AND (eval_claimed_by IS NULL OR eval_claimed_at < datetime('now', ?))
+                ORDER BY published_date DESC
+                LIMIT ?
+            )
+            RETURNING *
+        '''
+        conn = self.get_connection()
+        with conn:
+            # 评估进程崩溃或反复出错时租约会过期，尝试次数用尽的论文不再重新认领
+            failed = conn.execute('''
+                UPDATE papers
+                SET eval_failed = 1, eval_claimed_by = NULL, eval_claimed_at = NULL
+                WHERE eval_claimed_by IS NOT NULL AND eval_claimed_at < datetime('now', ?)
+                AND eval_attempts >= ? AND llm_evaluated = 0
+            ''', (expired, max_attempts)).rowcount
+            rows = conn.execute(query, (worker_id, max_attempts, expired, limit)).fetchall()
+        if failed:
+            self._invalidate_stats()
+            print(f"{failed} 篇论文已尝试评估 {max_attempts} 次仍未成功，标记为评估失败")
+        return rows
+
+    def fail_paper_claims(self, paper_ids, max_attempts=None):
+        """评估出错（非限流）后调用：尝试次数用尽的论文立即标记为评估失败并释放认领，返回标记的数量。
+
+        其余论文保留认领，租约到期后再重新评估。
+        """
+        max_attempts = max_attempts or Config.EVAL_MAX_ATTEMPTS
+        conn = self.get_connection()
+        with conn:
+            failed = conn.execute('''
+                UPDATE papers
+                SET eval_failed = 1, eval_claimed_by = NULL, eval_claimed_at = NULL
+                WHERE id IN (SELECT value FROM json_each(?)) AND llm_evaluated = 0 AND eval_attempts >= ?
+            ''', (json.dumps([int(pid) for pid in paper_ids]), max_attempts)).rowcount
+        if failed:
+            self._invalidate_stats()
+        return failed
+
+    def reset_failed_evaluations(self):
+        """将评估失败的论文恢复为待评估（清零尝试次数），返回恢复的数量"""
+        return self.execute_query('UPDATE papers SET eval_failed = 0, eval_attempts = 0 WHERE eval_failed = 1')
+
+    def get_unscored_pending_papers(self, after_id=0, limit=1000):
+        """按ID顺序分页获取尚未经过向量预筛选、且未被认领的待评估论文（ID 大于 `after_id` 的 `limit` 篇）"""
+        query = f'''
+            SELECT id, title, abstract FROM papers
+            WHERE {self.PENDING_CONDITION}
+            AND prefilter_score IS NULL AND eval_claimed_by IS NULL AND id > ?
+            ORDER BY id
+            LIMIT ?
+        '''
+        return self.execute_query(query, (after_id, limit))
+
+    def apply_prefilter_results(self, passed, rejected):
+        """在一个事务中保存预筛选结果。
+
+        passed: [(score, paper_id)]，记录分数，等待LLM评估；
+        rejected: [(score, reason, paper_id)]，直接标记为已评估且不推荐，并记录 `evaluated_by = 'prefilter'`
+        以便与LLM的评估结果区分。
+        """
+        conn = self.get_connection()
+        with conn:
+            conn.executemany('UPDATE papers SET prefilter_score = ? WHERE id = ?', passed)
+            conn.executemany('''
+                UPDATE papers
+                SET prefilter_score = ?, recommendation_reason = ?, llm_evaluated = 1, is_recommended = 0,
+                    evaluated_by = 'prefilter'
+                WHERE id = ? AND llm_evaluated = 0
+            ''', rejected)
+        self._invalidate_stats()
+
+    def get_embeddings(self, paper_ids, model):
+        """批量读取论文向量，返回 {paper_id: bytes}"""
+        query = '''
+            SELECT paper_id, vector FROM paper_embeddings
+            WHERE paper_id IN (SELECT value FROM json_each(?)) AND model = ?
+        '''
+        rows = self.execute_query(query, (json.dumps(list(paper_ids)), model))
+        return {row['paper_id']: row['vector'] for row in rows}
+
+    def save_embeddings(self, rows):
+        """批量保存论文向量，rows: [(paper_id, model, vector_bytes)]"""
+        conn = self.get_connection()
+        with conn:
+            conn.executemany('INSERT OR REPLACE INTO paper_embeddings (paper_id, model, vector) VALUES (?, ?, ?)', rows)
+
+    def release_paper_claim(self, paper_id):
+        """释放论文的评估认领（被限流或停止评估时调用，本次认领不计入尝试次数）"""
+        return self.release_paper_claims([paper_id])
+
+    def release_paper_claims(self, paper_ids):
+        """批量释放论文的评估认领（只释放尚未完成评估的论文，本次认领不计入尝试次数）"""
+        return self._execute_for_ids('''
+            UPDATE papers
+            SET eval_claimed_by = NULL, eval_claimed_at = NULL, eval_attempts = MAX(eval_attempts - 1, 0)
+            WHERE id IN (SELECT value FROM json_each(?)) AND llm_evaluated = 0 AND eval_claimed_by IS NOT NULL
+        ''', paper_ids)
+
+    def save_evaluation_results(self, results):
+        """在一个事务中保存多篇论文的评估结果（同时释放评估认领）。
+
+        results: [(is_recommended, recommendation_reason, paper_id)]
+        """
+        conn = self.get_connection()
+        with conn:
+            conn.executemany('''
+                UPDATE papers
+                SET is_recommended = ?, llm_evaluated = 1, recommendation_reason = ?, evaluated_by = 'llm',
+                    eval_claimed_by = NULL, eval_claimed_at = NULL
+                WHERE id = ?
+            ''', results)
+        self._invalidate_stats()
+
     def update_paper_evaluation(self, paper_id, is_recommended, llm_evaluated=True, recommendation_reason=None):
-        """更新论文评估状态"""
+        """更新论文评估状态（同时释放评估认领）"""
         query = '''
             UPDATE papers 
-            SET is_recommended = ?, llm_evaluated = ?, recommendation_reason = ?
+            SET is_recommended = ?, llm_evaluated = ?, recommendation_reason = ?, evaluated_by = 'llm',
+                eval_claimed_by = NULL, eval_claimed_at = NULL
             WHERE id = ?
         '''
         return self.execute_query(query, (is_recommended, llm_evaluated, recommendation_reason, paper_id))
     
+    def get_paper(self, paper_id):
+        """按ID获取论文，不存在时返回 None"""
+        rows = self.execute_query('SELECT *, id as paper_id FROM papers WHERE id = ?', (paper_id,))
+        return rows[0] if rows else None
+
+    def get_untranslated_papers(self, paper_ids=None, limit=50):
+        """获取尚无中文翻译的论文：指定 paper_ids 时在这些论文中查找，否则在推荐队列最前面的 `limit` 篇中查找"""
+        untranslated = "(chinese_title IS NULL OR chinese_title = '')"
+        if paper_ids:
+            query = f'''
+                SELECT id, arxiv_id, title, abstract FROM papers
+                WHERE id IN (SELECT value FROM json_each(?)) AND {untranslated}
+                LIMIT ?
+            '''
+            return self.execute_query(query, (json.dumps([int(pid) for pid in paper_ids]), limit))
+        # 与 get_recommended_unseen 的展示顺序一致
+        query = f'''
+            SELECT id, arxiv_id, title, abstract FROM (
+                SELECT id, arxiv_id, title, abstract, chinese_title FROM papers
+                WHERE {self.PAPER_STATUS_FILTERS['unread']}
+                ORDER BY published_date DESC, id DESC
+                LIMIT ?
+            )
+            WHERE {untranslated}
+        '''
+        return self.execute_query(query, (limit,))
+
+    # 保存翻译时同时写入供全文检索使用的逐字切分影子列
+    TRANSLATION_UPDATE_QUERY = '''
+        UPDATE papers
+        SET chinese_title = ?, chinese_abstract = ?, chinese_title_fts = ?, chinese_abstract_fts = ?
+        WHERE id = ?
+    '''
+
+    @staticmethod
+    def _translation_params(chinese_title, chinese_abstract, paper_id):
+        return chinese_title, chinese_abstract, segment_cjk(chinese_title), segment_cjk(chinese_abstract), paper_id
+
+    def save_translations(self, rows):
+        """在一个事务中保存多篇论文的翻译，rows: [(chinese_title, chinese_abstract, paper_id)]"""
+        conn = self.get_connection()
+        with conn:
+            conn.executemany(self.TRANSLATION_UPDATE_QUERY, [self._translation_params(*row) for row in rows])
+
     def update_paper_translation(self, paper_id, chinese_title=None, chinese_abstract=None):
         """更新论文的中文翻译"""
-        query = '''
-            UPDATE papers 
-            SET chinese_title = ?, chinese_abstract = ?
-            WHERE id = ?
-        '''
-        return self.execute_query(query, (chinese_title, chinese_abstract, paper_id))
+        return self.execute_query(self.TRANSLATION_UPDATE_QUERY,
+                                  self._translation_params(chinese_title, chinese_abstract, paper_id))
     
     
+    # 后台任务队列（jobs 表），status: 'queued' | 'running' | 'succeeded' | 'failed'
+    def enqueue_job(self, job_type, payload=None, priority=0, max_attempts=3, dedupe_key=None, delay_seconds=0):
+        """添加后台任务，返回任务ID。
+
+        指定 `dedupe_key` 且已有同键任务在排队时不重复添加，返回已有任务的ID（优先级取两者较高者）。
+        """
+        conn = self.get_connection()
+        with conn:
+            cursor = conn.execute('''
+                INSERT INTO jobs (type, payload, priority, max_attempts, dedupe_key, run_after)
+                VALUES (?, ?, ?, ?, ?, datetime('now', ?))
+                ON CONFLICT (dedupe_key) WHERE status = 'queued' DO UPDATE SET priority = max(priority, excluded.priority)
+                RETURNING id
+            ''', (job_type, json.dumps(payload or {}, ensure_ascii=False), priority, max_attempts, dedupe_key,
+                  f'{int(delay_seconds):+d} seconds'))
+            return cursor.fetchone()['id']
+
+    def claim_job(self, worker_id, lease_seconds, job_types=None):
+        """领取一个可执行的任务（排队中且已到执行时间，或运行中但租约已过期），返回任务行或 None。
+
+        租约过期且已用完重试次数的任务直接标记为失败。爬取任务串行执行：已有爬取任务在运行（租约未过期）时
+        不领取其他爬取任务，保证所有进程合计的 arXiv 请求频率不超过限制。
+        """
+        types_sql = 'AND type IN (SELECT value FROM json_each(?))' if job_types else ''
+        types_params = (json.dumps(list(job_types)),) if job_types else ()
+        conn = self.get_connection()
+        with conn:
+            conn.execute('''
+                UPDATE jobs SET status = 'failed', error = '执行超时（租约过期）', finished_at = datetime('now')
+                WHERE status = 'running' AND lease_expires_at < datetime('now') AND attempts >= max_attempts
+            ''')
+            return conn.execute(f'''
+                UPDATE jobs
+                SET status = 'running', claimed_by = ?, attempts = attempts + 1,
+                    lease_expires_at = datetime('now', ?), started_at = datetime('now')
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE ((status = 'queued' AND run_after <= datetime('now'))
+                           OR (status = 'running' AND lease_expires_at < datetime('now')))
+                    AND NOT (type = 'crawl' AND EXISTS (
+                        SELECT 1 FROM jobs AS active WHERE active.type = 'crawl' AND active.status = 'running'
+                        AND active.lease_expires_at >= datetime('now')))
+                    {types_sql}
+                    ORDER BY priority DESC, id
+                    LIMIT 1
+                )
+                RETURNING *
+            ''', (worker_id, f'{int(lease_seconds):+d} seconds', *types_params)).fetchone()
+
+    def extend_job_lease(self, job_id, worker_id, lease_seconds):
+        """延长任务租约（任务执行期间定期调用），任务已被其他 worker 接管时返回 0"""
+        return self.execute_query('''
+            UPDATE jobs SET lease_expires_at = datetime('now', ?)
+            WHERE id = ? AND claimed_by = ? AND status = 'running'
+        ''', (f'{int(lease_seconds):+d} seconds', job_id, worker_id))
+
+    def complete_job(self, job_id, worker_id, result=None):
+        """标记任务成功并保存结果"""
+        return self.execute_query('''
+            UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, lease_expires_at = NULL,
+                            finished_at = datetime('now')
+            WHERE id = ? AND claimed_by = ? AND status = 'running'
+        ''', (json.dumps(result, ensure_ascii=False), job_id, worker_id))
+
+    def fail_job(self, job_id, worker_id, error, retry_delay_seconds):
+        """记录任务失败：还有重试次数时在 `retry_delay_seconds` 秒后重新排队，否则标记为失败。
+
+        任务执行期间已有同 `dedupe_key` 的任务排队（如爬取结束时添加的评估任务、定时添加的同参数爬取任务）时，
+        不再重新排队（排队中的任务 dedupe_key 唯一），失败任务标记为失败并把优先级合并到排队中的任务。
+        """
+        conn = self.get_connection()
+        with conn:
+            # 第一条写语句即取得写锁，两条 UPDATE 之间其他进程无法插入同键的排队任务
+            conn.execute('''
+                UPDATE jobs AS queued SET priority = max(queued.priority, failed.priority)
+                FROM jobs AS failed
+                WHERE failed.id = ? AND failed.claimed_by = ? AND failed.status = 'running'
+                AND queued.dedupe_key = failed.dedupe_key AND queued.status = 'queued'
+            ''', (job_id, worker_id))
+            return conn.execute('''
+                UPDATE jobs
+                SET status = CASE WHEN attempts < max_attempts AND NOT superseded THEN 'queued' ELSE 'failed' END,
+                    run_after = datetime('now', ?),
+                    error = CASE WHEN attempts < max_attempts AND superseded
+                                 THEN ? || '（已有同类任务排队，不再重试）' ELSE ? END,
+                    claimed_by = NULL, lease_expires_at = NULL,
+                    finished_at = CASE WHEN attempts < max_attempts AND NOT superseded THEN NULL ELSE datetime('now') END
+                FROM (SELECT EXISTS (
+                    SELECT 1 FROM jobs AS current JOIN jobs AS queued ON queued.dedupe_key = current.dedupe_key
+                    WHERE current.id = ? AND queued.status = 'queued'
+                ) AS superseded)
+                WHERE id = ? AND claimed_by = ? AND status = 'running'
+            ''', (f'{int(retry_delay_seconds):+d} seconds', error, error, job_id, job_id, worker_id)).rowcount
+
+    def get_job_activity(self):
+        """从 jobs 表读取后台任务状态（对所有进程与 worker 有效）：
+        evaluating / crawling 为是否有运行中且租约未过期的评估、爬取任务，
+        last_run 为最近一次评估任务的开始时间（UTC），last_evaluated_count 为最近一次成功的评估任务处理的论文数。
+        """
+        row = self.execute_query('''
+            SELECT
+                EXISTS (SELECT 1 FROM jobs WHERE type = 'evaluate' AND status = 'running'
+                        AND lease_expires_at >= datetime('now')) AS evaluating,
+                EXISTS (SELECT 1 FROM jobs WHERE type = 'crawl' AND status = 'running'
+                        AND lease_expires_at >= datetime('now')) AS crawling,
+                (SELECT strftime('%Y-%m-%dT%H:%M:%S', started_at) FROM jobs
+                 WHERE type = 'evaluate' AND started_at IS NOT NULL ORDER BY started_at DESC LIMIT 1) AS last_run,
+                (SELECT json_extract(result, '$.evaluated') FROM jobs
+                 WHERE type = 'evaluate' AND status = 'succeeded' ORDER BY finished_at DESC LIMIT 1) AS last_evaluated_count
+        ''')[0]
+        return {
+            'evaluating': bool(row['evaluating']),
+            'crawling': bool(row['crawling']),
+            'last_run': row['last_run'],
+            'last_evaluated_count': row['last_evaluated_count'] or 0,
+        }
+
+    def has_active_job(self, job_type):
+        """是否有该类型的任务在排队中，或在运行中且租约未过期（worker 崩溃后不再视为运行中）"""
+        rows = self.execute_query('''
+            SELECT 1 FROM jobs
+            WHERE type = ? AND (status = 'queued' OR (status = 'running' AND lease_expires_at >= datetime('now')))
+            LIMIT 1
+        ''', (job_type,))
+        return bool(rows)
+
+    def get_job(self, job_id):
+        rows = self.execute_query('SELECT * FROM jobs WHERE id = ?', (job_id,))
+        return rows[0] if rows else None
+
+    def list_jobs(self, status=None, limit=50):
+        """按创建时间倒序列出任务，可按状态过滤"""
+        if status:
+            return self.execute_query('SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?', (status, limit))
+        return self.execute_query('SELECT * FROM jobs ORDER BY id DESC LIMIT ?', (limit,))
+
+    def record_llm_usage(self, model, purpose, prompt_tokens, completion_tokens, estimated=False):
+        """记录一次LLM请求的 token 用量；`estimated` 表示服务端未返回 usage、按文本长度估算"""
+        self.execute_query('''
+            INSERT INTO llm_usage (model, purpose, prompt_tokens, completion_tokens, estimated)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (model, purpose, int(prompt_tokens or 0), int(completion_tokens or 0), bool(estimated)))
+
+    def get_llm_usage_stats(self, days=None):
+        """按用途汇总LLM请求数与 token 用量，`days` 为 None 时统计全部记录"""
+        where = "WHERE created_at >= datetime('now', ?)" if days is not None else ''
+        params = (f'{-int(days):+d} days',) if days is not None else None
+        return self.execute_query(f'''
+            SELECT purpose,
+                   COUNT(*) as requests,
+                   SUM(prompt_tokens) as prompt_tokens,
+                   SUM(completion_tokens) as completion_tokens,
+                   SUM(estimated) as estimated_requests
+            FROM llm_usage {where}
+            GROUP BY purpose ORDER BY prompt_tokens + completion_tokens DESC
+        ''', params)
+
     def get_config(self, key, default=None):
         """获取配置值"""
         query = 'SELECT value FROM config WHERE key = ?'
@@ -301,23 +1182,85 @@ class DatabaseManager:
             VALUES (?, ?, datetime('now'))
         '''
         return self.execute_query(query, (key, str(value)))
-    
+
+    def compare_and_set_config(self, key, expected, value):
+        """当前值等于 `expected` 时（为 None 表示不存在）设置为 `value`，返回是否设置成功。
+
+        多个进程竞争同一个配置项（如定时任务的下次执行时间）时只有一个会成功。
+        """
+        conn = self.get_connection()
+        with conn:
+            if expected is None:
+                cursor = conn.execute('''
+                    INSERT INTO config (key, value, updated_at) VALUES (?, ?, datetime('now'))
+                    ON CONFLICT (key) DO NOTHING
+                ''', (key, str(value)))
+            else:
+                cursor = conn.execute('''
+                    UPDATE config SET value = ?, updated_at = datetime('now')
+                    WHERE key = ? AND value = ?
+                ''', (str(value), key, str(expected)))
+        return cursor.rowcount == 1
+
+    def delete_config(self, key):
+        """删除配置值"""
+        query = 'DELETE FROM config WHERE key = ?'
+        return self.execute_query(query, (key,))
+
+    def delete_stale_configs(self, prefix, max_age_days):
+        """删除以 `prefix` 开头、超过 `max_age_days` 天未更新的配置项，返回删除的条数"""
+        conn = self.get_connection()
+        with conn:
+            cursor = conn.execute('''
+                DELETE FROM config
+                WHERE substr(key, 1, ?) = ? AND updated_at < datetime('now', ?)
+            ''', (len(prefix), prefix, f'-{int(max_age_days)} days'))
+        return cursor.rowcount
+
     def get_unsummarized_favorites(self):
-        """获取未总结的收藏论文"""
+        """获取未总结的收藏论文（按ID排序，重试时分组保持不变）"""
         query = '''
             SELECT * FROM papers
             WHERE favorite = 1 AND is_summarized = FALSE
+            ORDER BY id
         '''
         return self.execute_query(query)
-    
-    def mark_favorite_summarized(self, favorite_id):
-        """标记收藏已总结"""
-        query = 'UPDATE papers SET is_summarized = TRUE WHERE id = ?'
-        return self.execute_query(query, (favorite_id,))
+
+    def get_summary_checkpoints(self, keys):
+        """返回已保存的分层总结检查点 {key: summary}"""
+        rows = self.execute_query(
+            'SELECT key, summary FROM summary_checkpoints WHERE key IN (SELECT value FROM json_each(?))',
+            (json.dumps(list(keys)),)
+        )
+        return {row['key']: row['summary'] for row in rows}
+
+    def save_summary_checkpoint(self, key, summary):
+        self.execute_query('INSERT OR REPLACE INTO summary_checkpoints (key, summary) VALUES (?, ?)', (key, summary))
+
+    def save_favorite_summary(self, summary, favorite_ids, checkpoint_keys=(), chunk_size=None):
+        """在一个事务中保存收藏总结、标记这些收藏已总结，并删除本次总结用到的检查点
+
+        同时清理超过 7 天的检查点（总结中途放弃、之后收藏又发生变化时留下的）。
+        """
+        ids = [int(favorite_id) for favorite_id in favorite_ids]
+        chunk_size = chunk_size or Config.BULK_ID_CHUNK_SIZE
+        conn = self.get_connection()
+        with conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO config (key, value, updated_at)
+                VALUES ('FAVORITE_SUMMARY', ?, datetime('now'))
+            ''', (summary,))
+            for start in range(0, len(ids), chunk_size):
+                conn.execute('UPDATE papers SET is_summarized = 1 WHERE id IN (SELECT value FROM json_each(?))',
+                             (json.dumps(ids[start:start + chunk_size]),))
+            conn.execute('''
+                DELETE FROM summary_checkpoints
+                WHERE key IN (SELECT value FROM json_each(?)) OR created_at < datetime('now', '-7 days')
+            ''', (json.dumps(list(checkpoint_keys)),))
     
     def reset_database(self):
         """重置数据库到初始状态（清空所有数据）"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         
         try:
@@ -331,6 +1274,7 @@ class DatabaseManager:
                 cursor.execute(f'DELETE FROM sqlite_sequence WHERE name = "{table}"')
             
             conn.commit()
+            self._invalidate_stats()
             print("数据库已重置到初始状态")
             return True
         except Exception as e:
@@ -338,4 +1282,4 @@ class DatabaseManager:
             conn.rollback()
             return False
         finally:
-            conn.close()
\ No newline at end of file
+            cursor.close()
\ No newline at end of file
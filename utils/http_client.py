@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from config import Config
+
+try:
+    import httpx
+except ImportError:  # 可选依赖，只有 asyncio 评估引擎需要
+    httpx = None
+
+# 按名称共享的会话（如 'llm'、'arxiv'），同一进程内复用连接池
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+# 按主机统计的请求指标
+_metrics = defaultdict(lambda: {'requests': 0, 'errors': 0, 'total_seconds': 0.0, 'status': defaultdict(int)})
+_metrics_lock = threading.Lock()
+# 按主机统计新建的连接数（观察连接复用情况）
+_connections_opened = defaultdict(int)
+
+
+class InstrumentedSession(requests.Session):
+    """记录每个主机请求次数、错误数与耗时的会话"""
+
+    def request(self, method, url, *args, **kwargs):
+        host = urlparse(url).netloc
+        started = time.monotonic()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except Exception:
+            _record(host, time.monotonic() - started, None)
+            raise
+        _record(host, time.monotonic() - started, response.status_code)
+        return response
+
+
+def _record_connection(host: str, port: Optional[int]):
+    key = host if port in (None, 80, 443) else f'{host}:{port}'
+    with _metrics_lock:
+        _connections_opened[key] += 1
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        _record_connection(self.host, self.port)
+        super().connect()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _record_connection(self.host, self.port)
+        super().connect()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """统计新建连接数的适配器：连接池使用在建立连接时计数的连接类"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+
+def _record(host: str, seconds: float, status_code: Optional[int]):
+    with _metrics_lock:
+        metrics = _metrics[host]
+        metrics['requests'] += 1
+        metrics['total_seconds'] += seconds
+        if status_code is None:
+            metrics['errors'] += 1
+        else:
+            metrics['status'][status_code] += 1
+
+
+def get_session(name: str, pool_size: Optional[int] = None, retries: Optional[int] = None) -> requests.Session:
+    """获取按名称共享的 `requests.Session`
+
+    首次调用时创建：连接池大小为 `pool_size`（默认 `Config.HTTP_POOL_SIZE`），
+    对连接错误与 429/5xx 响应按带随机抖动的指数退避重试 `retries`（默认 `Config.HTTP_RETRIES`）次；
+    调用方自行重试时传入 `retries=0`，避免两层重试叠加。
+    429/5xx 与读取错误只对幂等方法（GET 等）重试，POST 只在连接尚未建立的错误时重试，
+    避免重复提交已被服务端处理的请求（如重复计费的LLM调用）。
+    """
+    session = _sessions.get(name)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            pool_size = pool_size or Config.HTTP_POOL_SIZE
+            retry = Retry(
+                total=Config.HTTP_RETRIES if retries is None else retries,
+                backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+                backoff_jitter=Config.HTTP_BACKOFF_JITTER,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = InstrumentedAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session = InstrumentedSession()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[name] = session
+    return session
+
+
+if httpx is not None:
+    class InstrumentedAsyncTransport(httpx.AsyncHTTPTransport):
+        """与 `InstrumentedSession` 共用请求指标的 httpx 异步传输层"""
+
+        async def handle_async_request(self, request):
+            host = request.url.netloc.decode('ascii')
+            started = time.monotonic()
+            try:
+                response = await super().handle_async_request(request)
+            except Exception:
+                _record(host, time.monotonic() - started, None)
+                raise
+            _record(host, time.monotonic() - started, response.status_code)
+            return response
+
+
+def create_async_client(pool_size: Optional[int] = None, timeout: float = 30.0):
+    """创建 `httpx.AsyncClient`（需要安装 httpx）
+
+    连接池大小为 `pool_size`（默认 `Config.HTTP_POOL_SIZE`），连接错误重试 `Config.HTTP_RETRIES` 次；
+    429/5xx 响应不在这里重试，由调用方统一退避。客户端绑定当前事件循环，用完后需要 `await client.aclose()`。
+    """
+    if httpx is None:
+        raise RuntimeError('异步HTTP客户端需要安装 httpx')
+    pool_size = pool_size or Config.HTTP_POOL_SIZE
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    transport = InstrumentedAsyncTransport(limits=limits, retries=Config.HTTP_RETRIES)
+    return httpx.AsyncClient(transport=transport, timeout=timeout)
+
+
+def is_transport_error(error: Exception) -> bool:
+    """是否为连接失败、超时等传输层错误（requests 或 httpx），与请求内容无关"""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    return httpx is not None and isinstance(error, httpx.TransportError)
+
+
+def get_http_metrics() -> Dict[str, Dict]:
+    """返回按主机统计的请求指标，以及各连接池新建连接数（用于观察连接复用情况）"""
+    with _metrics_lock:
+        result = {
+            host: {
+                'requests': m['requests'],
+                'errors': m['errors'],
+                'avg_seconds': round(m['total_seconds'] / m['requests'], 3) if m['requests'] else None,
+                'status': dict(m['status'])
+            }
+            for host, m in _metrics.items()
+        }
+        for host, count in _connections_opened.items():
+            result.setdefault(host, {})['connections_opened'] = count
+
+    return result
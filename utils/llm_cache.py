@@ -0,0 +1,125 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Optional
+from config import Config
+from utils.database import DatabaseManager
+
+# 按数据库文件缓存的条目数与总大小 {db_path: ((entries, size), 过期时间)}，本进程内所有缓存实例共享
+_size_cache = {}
+
+
+class LLMCache:
+    """基于SQLite的LLM响应缓存
+
+    以 (base_url, model, prompt, max_tokens, temperature) 的哈希为键，
+    条目超过 `ttl_seconds` 后失效；总大小超过 `max_bytes` 时按最近最少使用（LRU）淘汰。
+    命中时距上次更新超过 `touch_interval` 秒才写回访问时间，避免每次读取都产生一次写事务
+    （LRU 的精度相应降为 `touch_interval`）。
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None,
+                 ttl_seconds: Optional[int] = None, max_bytes: Optional[int] = None,
+                 touch_interval: Optional[float] = None):
+        self.db = db or DatabaseManager()
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.LLM_CACHE_TTL_SECONDS
+        self.max_bytes = max_bytes if max_bytes is not None else Config.LLM_CACHE_MAX_BYTES
+        self.touch_interval = touch_interval if touch_interval is not None else Config.LLM_CACHE_TOUCH_INTERVAL
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(base_url: str, model: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        payload = json.dumps([base_url, model, prompt, max_tokens, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中或已过期时返回 None"""
+        now = time.time()
+        conn = self.db.get_connection()
+        row = conn.execute('SELECT response, created_at, last_access FROM llm_cache WHERE key = ?', (key,)).fetchone()
+
+        if row is not None and now - row['created_at'] <= self.ttl_seconds:
+            if now - row['last_access'] >= self.touch_interval:
+                with conn:
+                    conn.execute('UPDATE llm_cache SET last_access = ? WHERE key = ?', (now, key))
+            with self._lock:
+                self.hits += 1
+            return row['response']
+
+        if row is not None:
+            with conn:
+                conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+            self._invalidate_size()
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, response: str):
+        """写入缓存，并在超出大小上限时淘汰最久未使用的条目"""
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        conn = self.db.get_connection()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, response, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)',
+                (key, response, size, now, now)
+            )
+            self._evict(conn)
+        self._invalidate_size()
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # 按 last_access 从旧到新删除，直到总大小回到上限以内
+        excess = total - self.max_bytes
+        freed = 0
+        stale_keys = []
+        for row in conn.execute('SELECT key, size FROM llm_cache ORDER BY last_access'):
+            stale_keys.append((row['key'],))
+            freed += row['size']
+            if freed >= excess:
+                break
+        conn.executemany('DELETE FROM llm_cache WHERE key = ?', stale_keys)
+
+    def delete(self, key: str):
+        """删除一个缓存条目（如调用方无法解析的响应）"""
+        conn = self.db.get_connection()
+        with conn:
+            conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+        self._invalidate_size()
+
+    def clear(self):
+        self.db.execute_query('DELETE FROM llm_cache')
+        self._invalidate_size()
+
+    def _invalidate_size(self):
+        _size_cache.pop(self.db.db_path, None)
+
+    def _size(self):
+        """缓存条目数与总大小（全表聚合）：结果缓存到本进程下一次写入缓存，
+        其他进程的写入最多 `Config.LLM_CACHE_STATS_TTL` 秒可见"""
+        hit = _size_cache.get(self.db.db_path)
+        if hit and hit[1] > time.monotonic():
+            return hit[0]
+        res = self.db.execute_query('SELECT COUNT(*) as entries, COALESCE(SUM(size), 0) as size FROM llm_cache')
+        size = (res[0]['entries'], res[0]['size']) if res else (0, 0)
+        _size_cache[self.db.db_path] = (size, time.monotonic() + Config.LLM_CACHE_STATS_TTL)
+        return size
+
+    def stats(self):
+        """返回缓存命中统计与当前大小（状态接口每次轮询都会调用，大小见 `_size`）"""
+        entries, size = self._size()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            'entries': entries,
+            'size': size
+        }
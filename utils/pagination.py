@@ -0,0 +1,30 @@
+import base64
+import json
+
+
+def encode_cursor(values) -> str:
+    """把排序键（如 [published_date, id]）编码为不透明的分页游标"""
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> list:
+    """解析分页游标，格式错误时抛出 ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError('无效的分页游标')
+    # 排序键可以为 NULL（如旧数据缺失的标记时间），这些论文排在最后
+    if (not isinstance(values, list) or len(values) != 2 or not isinstance(values[1], int)
+            or not isinstance(values[0], (str, int, float, type(None)))):
+        raise ValueError('无效的分页游标')
+    return values
+
+
+def next_cursor(rows, limit: int, sort_column: str):
+    """按 `limit + 1` 查询得到的结果生成下一页游标，没有下一页时返回 None"""
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor([last[sort_column], last['id']])
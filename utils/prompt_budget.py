@@ -0,0 +1,100 @@
+import re
+from functools import lru_cache
+from typing import Iterable, List
+
+from config import Config
+
+try:
+    import tiktoken
+except ImportError:  # 可选依赖，未安装时按字符数估算 token 数
+    tiktoken = None
+
+
+_CJK_RE = re.compile(r'[　-〿一-鿿＀-￯]')
+_SPACE_RE = re.compile(r'\s+')
+# 句末位置：后跟空白的英文句末标点（不匹配 3.5、e.g 中间的点），或中文句末标点
+_SENTENCE_END_RE = re.compile(r'[.!?;](?=\s)|[。！？；]')
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(Config.LLM_TOKENIZER_ENCODING)
+    except Exception as e:  # 编码文件需要联网下载，失败时退回估算
+        print(f"加载 tiktoken 编码 {Config.LLM_TOKENIZER_ENCODING} 失败，按字符数估算: {e}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本的 token 数
+
+    安装了 tiktoken 时精确计数；否则按经验值估算：中日文字符每字约 1 个 token，
+    其余字符每 4 个约 1 个 token（对英文摘要通常高估 5%~10%，预算因此偏保守）。
+    """
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def compact(text: str) -> str:
+    """合并连续空白（arXiv 摘要中的换行与缩进不携带信息，却占用 token）"""
+    return _SPACE_RE.sub(' ', text or '').strip()
+
+
+def truncate_to_tokens(text: str, budget: int, ellipsis: str = '…') -> str:
+    """把文本压缩到 `budget` 个 token 以内
+
+    先合并空白；仍超出预算时按句子截断（至少保留一句时在句末截断，否则按字符截断），并追加省略号。
+    `budget` 不大于 0 表示不限制。
+    """
+    text = compact(text)
+    if budget <= 0 or estimate_tokens(text) <= budget:
+        return text
+
+    budget -= estimate_tokens(ellipsis)
+    fits = lambda end: estimate_tokens(text[:end]) <= budget
+    # 优先在句末截断：取能放下的最后一个句末位置
+    ends = [m.end() for m in _SENTENCE_END_RE.finditer(text)]
+    end = _last_fitting(ends, fits)
+    if end is None:
+        # 第一句就超出预算：按字符截断
+        end = _last_fitting(range(len(text) + 1), fits) or 0
+    kept = text[:end].rstrip()
+    return kept + ellipsis
+
+
+def _last_fitting(positions, fits):
+    """二分查找 `positions`（递增）中最后一个满足 `fits` 的位置，都不满足时返回 None"""
+    low, high, found = 0, len(positions) - 1, None
+    while low <= high:
+        mid = (low + high) // 2
+        if fits(positions[mid]):
+            found = positions[mid]
+            low = mid + 1
+        else:
+            high = mid - 1
+    return found
+
+
+def chunk_by_tokens(items: Iterable[str], budget: int) -> List[List[int]]:
+    """按 token 预算把若干文本分组，返回每组文本的下标列表
+
+    每组的总 token 数不超过 `budget`；单个文本超出预算时单独成组（调用方应事先截断）。
+    """
+    groups, current, used = [], [], 0
+    for i, item in enumerate(items):
+        cost = estimate_tokens(item)
+        if current and used + cost > budget:
+            groups.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
@@ -0,0 +1,135 @@
+import threading
+import time
+from typing import Dict
+
+from utils.http_client import is_transport_error
+
+
+class TokenBucket:
+    """线程安全的令牌桶限流器
+
+    以 `rate` 个/秒的速度补充令牌，最多积攒 `capacity` 个。
+    多个线程共享同一个实例时，总请求速率不会超过 `rate`。
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """阻塞直到获得令牌，返回等待的秒数"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait_time = (tokens - self._tokens) / self.rate
+            time.sleep(wait_time)
+            waited += wait_time
+
+
+class AdaptiveBackoff:
+    """多个线程共享的自适应退避
+
+    调用方遇到限流（429）或服务端错误（5xx）时调用 `failure()`，退避时间翻倍
+    （不超过 `max_delay`）；请求成功时调用 `success()`，退避时间逐步减半直至归零。
+    所有线程在发起请求前调用 `wait()`，在退避期内统一暂停。
+    `unavailable_streak` 记录自上次成功以来连续的服务不可用错误（连接失败、超时、401/403、5xx）次数，
+    调用方据此判断是否停止本轮请求。
+    """
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.delay = 0.0
+        self._resume_at = 0.0
+        self.unavailable_streak = 0
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        """退避期剩余的秒数（不在退避期时为 0），异步调用方据此 `await asyncio.sleep()`"""
+        with self._lock:
+            return max(0.0, self._resume_at - time.monotonic())
+
+    def wait(self) -> float:
+        """如果处于退避期则阻塞到退避结束，返回等待的秒数"""
+        wait_time = self.remaining()
+        if wait_time > 0:
+            time.sleep(wait_time)
+            return wait_time
+        return 0.0
+
+    def failure(self, retry_after: float = None, unavailable: bool = False):
+        """记录一次限流/服务端错误，`retry_after` 为服务端建议的等待秒数，`unavailable` 表示服务不可用（非限流）"""
+        with self._lock:
+            self.delay = min(self.max_delay, max(self.base_delay, self.delay * 2))
+            delay = max(self.delay, retry_after or 0.0)
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            if unavailable:
+                self.unavailable_streak += 1
+
+    def record_error(self, error: Exception) -> bool:
+        """如果异常与具体请求内容无关，记录一次失败并返回 True：
+
+        429/5xx/401/403 响应（requests 或 httpx 的 HTTP 错误），以及连接失败、超时等传输错误。
+        其余错误（如 400、响应无法解析）返回 False，由调用方按单个请求的失败处理。
+        """
+        if is_transport_error(error):
+            self.failure(unavailable=True)
+            return True
+
+        response = getattr(error, 'response', None)
+        status_code = getattr(response, 'status_code', None)
+        if status_code is None or (status_code not in (401, 403, 429) and status_code < 500):
+            return False
+
+        retry_after = None
+        try:
+            retry_after = float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            pass
+        self.failure(retry_after, unavailable=status_code != 429)
+        return True
+
+    def success(self):
+        """记录一次成功请求"""
+        with self._lock:
+            if self.delay:
+                self.delay = self.delay / 2 if self.delay / 2 >= self.base_delay else 0.0
+            self.unavailable_streak = 0
+
+
+# 按名称共享的限流器：同一进程内所有服务实例、所有线程共用一个令牌桶
+_rate_limiters: Dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, capacity: float = 1.0) -> TokenBucket:
+    """获取按名称共享的 `TokenBucket`
+
+    首次调用时创建；之后的调用返回同一个实例，`rate`/`capacity` 变化时（如测试中调整了
+    请求间隔）就地更新，避免出现多个各自计数的令牌桶。
+    注意：这只保证单个进程内的限流，多个进程各自持有自己的令牌桶。
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(name)
+        if limiter is None:
+            limiter = TokenBucket(rate=rate, capacity=capacity)
+            _rate_limiters[name] = limiter
+        elif limiter.rate != rate or limiter.capacity != capacity:
+            with limiter._lock:
+                limiter._refill()
+                limiter.rate = rate
+                limiter.capacity = capacity
+                limiter._tokens = min(limiter._tokens, capacity)
+        return limiter
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config import Config
+from utils.database import DatabaseManager
+
+
+class StatusHub:
+    """评估进度状态
+
+    `pending`（待评估）、`recommended_unseen`（推荐队列）与 `eval_failed`（多次评估失败）读取自触发器维护的 paper_stats 计数，
+    `evaluating` / `crawling` / `last_run` / `last_evaluated_count` 读取自 jobs 表（任务可能在其他 worker 进程中执行），
+    爬虫、后台评估、任务执行、用户反馈和批量操作写入后调用 `refresh()` 同步（代价与论文数量无关）。
+    每次变化递增版本号并唤醒 `wait_for_change()` 的等待者（SSE 推送使用）。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._values = {
+            'pending': 0,
+            'recommended_unseen': 0,
+            'eval_failed': 0,
+            'evaluating': False,
+            'crawling': False,
+            'last_run': None,
+            'last_evaluated_count': 0,
+        }
+        self._version = 0
+        self._refreshed_at = None
+
+    def _ensure_fresh(self):
+        # 其他进程（独立 worker）写入的计数与任务状态最多 `Config.STATS_CACHE_TTL` 秒后可见
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= Config.STATS_CACHE_TTL:
+            self.refresh()
+
+    def refresh(self):
+        """从 paper_stats 与 jobs 表读取最新状态，有变化时通知等待者"""
+        db = DatabaseManager()
+        stats = db.get_paper_stats()
+        values = {'pending': stats['pending'], 'recommended_unseen': stats['unread'],
+                  'eval_failed': stats['eval_failed']}
+        values.update(db.get_job_activity())
+        with self._cond:
+            self._refreshed_at = time.monotonic()
+            self._apply(values)
+
+    def _apply(self, values: Dict):
+        changed = {key: value for key, value in values.items() if self._values.get(key) != value}
+        if changed:
+            self._values.update(changed)
+            self._version += 1
+            self._cond.notify_all()
+
+    def snapshot(self) -> Tuple[int, Dict]:
+        """返回 (版本号, 当前状态)"""
+        self._ensure_fresh()
+        with self._cond:
+            return self._version, dict(self._values)
+
+    def wait_for_change(self, version: int, timeout: float) -> Tuple[int, Optional[Dict]]:
+        """等待版本号超过 `version`，超时返回 (version, None)。
+
+        等待期间每隔 `Config.STATS_CACHE_TTL` 秒重新读取状态，以发现其他进程写入的论文与执行的任务。
+        """
+        self._ensure_fresh()
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            with self._cond:
+                if self._cond.wait_for(lambda: self._version != version,
+                                       timeout=max(0.0, min(remaining, Config.STATS_CACHE_TTL))):
+                    return self._version, dict(self._values)
+            if remaining <= Config.STATS_CACHE_TTL:
+                return version, None
+            self.refresh()
+
+
+# 进程内共享的实例
+status_hub = StatusHub()
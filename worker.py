@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+后台任务 worker：从 jobs 表领取并执行爬取、评估、翻译、总结任务
+
+用法：
+    python worker.py                                # 启动 Config.WORKER_PROCESSES 个进程
+    python worker.py --processes 4 --types evaluate,translate
+    python worker.py --no-scheduler                 # 不在本进程中运行定时爬取调度器
+
+多进程部署 Web 服务时将 Config.EMBEDDED_WORKER 设为 False，由本脚本执行所有后台任务，
+并由主进程按 arXiv 公告时间添加定时爬取任务（Config.CRAWL_SCHEDULE_ENABLED）。
+收到 SIGINT/SIGTERM 后各进程完成当前任务再退出；意外退出的进程会被重新启动。
+"""
+
+import argparse
+import multiprocessing
+import signal
+import time
+
+from config import Config
+from services.crawl_scheduler import start_crawl_scheduler
+from services.job_service import JobService
+
+
+def run_process(index, stop_event, job_types):
+    """子进程入口：信号由主进程统一处理，子进程只看 stop_event"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    print(f"worker-{index} 已启动")
+    JobService().run_worker(stop_event, job_types=job_types)
+    print(f"worker-{index} 已退出")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='执行 jobs 表中的后台任务')
+    parser.add_argument('--processes', type=int, default=Config.WORKER_PROCESSES, help='worker 进程数')
+    parser.add_argument('--types', default='', help=f'只执行这些类型的任务（逗号分隔），可选: {",".join(JobService.JOB_TYPES)}')
+    parser.add_argument('--no-scheduler', action='store_true', help='不运行定时爬取调度器')
+    args = parser.parse_args()
+
+    job_types = [t.strip() for t in args.types.split(',') if t.strip()] or None
+    unknown = set(job_types or ()) - set(JobService.JOB_TYPES)
+    if unknown:
+        parser.error(f"不支持的任务类型: {', '.join(sorted(unknown))}")
+
+    # 使用 spawn 启动子进程：主进程中调度器线程持有数据库连接，fork 可能复制处于加锁状态的连接
+    ctx = multiprocessing.get_context('spawn')
+    stop_event = ctx.Event()
+    stopping = []
+
+    def handle_signal(signum, frame):
+        # 不在信号处理函数中调用 stop_event.set()：主线程可能正持有 Event 的内部锁，会死锁
+        stopping.append(signum)
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    def spawn(index):
+        process = ctx.Process(target=run_process, args=(index, stop_event, job_types), name=f'worker-{index}')
+        process.start()
+        return process
+
+    processes = [spawn(i) for i in range(max(1, args.processes))]
+    scheduler = None
+    if Config.CRAWL_SCHEDULE_ENABLED and not args.no_scheduler:
+        scheduler = start_crawl_scheduler(JobService())
+    while not stopping:
+        for i, process in enumerate(processes):
+            if not process.is_alive():
+                print(f"worker-{i} 意外退出（exitcode={process.exitcode}），重新启动")
+                processes[i] = spawn(i)
+        time.sleep(1)
+
+    print("收到停止信号，等待进行中的任务完成...")
+    if scheduler is not None:
+        scheduler[0].set()
+    stop_event.set()
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    main()